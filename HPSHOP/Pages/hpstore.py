@@ -140,59 +140,158 @@ class HPStorePage:
         self.driver.save_screenshot("console_output.png")
 """
 
+import time
+from collections import Counter
+
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-import time
 import allure
-from selenium.webdriver.support.ui import WebDriverWait
-class HPStorePage:
-    def __init__(self, driver, wait):
+from base.base_driver import BaseDriver
+from selinum.utils import event_log, popup, product_index, session_state
+from selinum.utils.http_cart import HttpCart
+from selinum.utils.tracing import traced
+
+STORE_URL = "https://store.hp.com/in-en/default/personal-laptops.html"
+PRODUCT_LINK_CSS = "a[class*='product-item-link']"
+
+# Reads every product tile in one round trip and returns plain records
+PRODUCT_TILES_JS = """
+var links = document.querySelectorAll(arguments[0]);
+return Array.prototype.map.call(links, function (a, i) {
+    var tile = a.closest('.product-item, .product-item-info, li') || a.parentElement;
+    function text(sel) {
+        var el = tile && tile.querySelector(sel);
+        return el ? (el.innerText || el.textContent || '').trim() : null;
+    }
+    return {
+        name: (a.innerText || a.textContent || '').trim(),
+        href: a.href,
+        price: text('[data-price-type="finalPrice"] .price, .price'),
+        availability: text('.stock, .availability, [class*="stock"]'),
+        position: i + 1
+    };
+});
+"""
+
+# Candidate locators per page element, in priority order. resolve_first()
+# checks them all in one poll and remembers the winner for the next run.
+COOKIE_ACCEPT_LOCATORS = [
+    (By.XPATH, "//button[contains(text(),'Accept All Cookies')]"),
+    (By.ID, "onetrust-accept-btn-handler"),
+]
+PRODUCT_TITLE_LOCATORS = [
+    (By.TAG_NAME, "h1"),
+    (By.CSS_SELECTOR, "h1.page-title"),
+    (By.CSS_SELECTOR, "span.base"),
+    (By.XPATH, "//h1[contains(@class,'page-title')]"),
+    (By.XPATH, "//h1[contains(@class,'title')]"),
+]
+ADD_TO_CART_LOCATORS = [
+    (By.ID, "product-addtocart-button"),
+    (By.CSS_SELECTOR, "#product_addtocart_form button.tocart"),
+    (By.XPATH, "//button[@title='Add to Cart']"),
+]
+VIEW_CART_LOCATORS = [
+    (By.XPATH, "//button[contains(@class,'view-cart')]"),
+    (By.CSS_SELECTOR, "a.action.viewcart"),
+    (By.XPATH, "//a[contains(@class,'view-cart')]"),
+]
+
+# Only the dark overlay: the full popup sweep would also click the close button
+# of the add-to-cart confirmation that holds "View cart"
+CART_OVERLAY_POPUPS = [p for p in popup.KNOWN_POPUPS if p["name"] == "top_navigate_overlay"]
+
+
+CART_NAMES_JS = """
+var snap = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var names = [];
+for (var i = 0; i < snap.snapshotLength; i++) { names.push((snap.snapshotItem(i).innerText || '').trim()); }
+return names;
+"""
+
+
+@traced
+class HPStorePage(BaseDriver):
+    def __init__(self, driver, wait=None, url=STORE_URL, timeout=10):
+        super().__init__(driver)
         self.driver = driver
+        # Kept for callers that still pass a WebDriverWait; page waits use self.timeout
         self.wait = wait
-        self.logs = []
+        self.timeout = timeout
+        self.url = url
+        self.timeout_scope = session_state.origin_of(url)
+        # Consent state restored from an earlier test (see selinum/utils/session_state.py)
+        self.restored_state = None
+        # Hybrid mode's HTTP client (add_to_cart_over_http)
+        self.http_cart = None
+        self.events = event_log.for_test()
+
+    @property
+    def logs(self):
+        # Older callers read the plain message list
+        return self.events.messages()
 
     @allure.step("Opening HP Store website")
     def open_site(self):
-        self.driver.get("https://store.hp.com/in-en/default/personal-laptops.html")
-        self.logs.append("Opened HP Store Website")
+        if session_state.ENABLED:
+            self.restored_state = session_state.restore(self.driver, self.url)
+        self.driver.get(self.url)
+        self.install_network_tracker()
+        if popup.PREVENT:
+            popup.prevent_known_popups(self.driver)
+        if self.restored_state and not session_state.verify(self.driver, self.restored_state):
+            self.events.warning("Restoring cookie consent failed; handling the banner again.")
+            self.restored_state = None
+        self.events.info("Opened HP Store Website")
 
     def accept_cookies(self):
+        if self.restored_state:
+            self.events.info("Cookie consent restored from session state.")
+            return
+        start = time.perf_counter()
         try:
-            accept_cookies = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Accept All Cookies')]"))
+            accept_cookies, _, _ = self.resolve_first(
+                "cookie_accept", COOKIE_ACCEPT_LOCATORS, timeout=self.timeout, clickable=True
             )
             accept_cookies.click()
-            self.logs.append("Accepted cookies.")
+            self.events.info("Accepted cookies.")
+            # The consent cookie is set asynchronously; only a settled consent is worth keeping
+            if session_state.ENABLED and session_state.wait_for_consent(self.driver, self.timeout):
+                session_state.snapshot(self.driver, self.url, time.perf_counter() - start)
         except:
-            self.logs.append("Cookie popup not found or already handled.")
+            self.events.warning("Cookie popup not found or already handled.")
 
     def verify_title(self, expected_title):
         actual_title = self.driver.title
-        self.logs.append(f"Actual title: {actual_title}")
+        self.events.info(f"Actual title: {actual_title}")
         assert expected_title in actual_title, "Title does not match!"
-        self.logs.append("Title verified!")
+        self.events.info("Title verified!")
 
     def click_shop_now(self):
-        time.sleep(2)
+        self.wait_for_document_ready(required=False)
         try:
-            shop_now = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[@class='c-button stack white-c']"))
+            shop_now = self.wait_for_element_to_be_clickable(
+                By.XPATH, "//button[@class='c-button stack white-c']", self.timeout
             )
             shop_now.click()
-            self.logs.append("Clicked 'Shop Now'.")
+            self.events.info("Clicked 'Shop Now'.")
         except:
-            self.logs.append("'Shop Now' button not found. Proceeding to search directly.")
+            self.events.warning("'Shop Now' button not found. Proceeding to search directly.")
 
     def search_product(self, product_name):
         try:
-            search_box = self.wait.until(EC.element_to_be_clickable((By.ID, "search")))
+            search_box = self.wait_for_element_to_be_clickable(By.ID, "search", self.timeout)
             search_box.clear()
             search_box.send_keys(product_name)
+            old_url = self.driver.current_url
             search_box.submit()
-            self.logs.append(f"Searched for product: {product_name}")
-            time.sleep(3)  # Wait for search results to load
+            self.events.info(f"Searched for product: {product_name}")
+            # Wait for search results to load
+            self.wait_for_url_change(old_url)
+            self.wait_for_document_ready(required=False)
+            self.wait_for_network_idle()
         except Exception as e:
-            self.logs.append(f"Unable to search for product. Error: {e}")
+            self.events.error(f"Unable to search for product. Error: {e}")
 
     # ------------------------------------------------------------
     # ✅ FIXED VERSION — ONLY THIS FUNCTION UPDATED
@@ -202,52 +301,49 @@ class HPStorePage:
             # Scroll down so GitHub Actions loads products
             try:
                 self.driver.execute_script("window.scrollTo(0, 1500);")
-                time.sleep(2)
+                self.wait_for_network_idle()
             except:
                 pass
 
-            # Increase wait time for CI (slow VM)
-            wait = WebDriverWait(self.driver, 25)
-
-            # Wait for any product link to appear
-            wait.until(
-                lambda d: d.find_elements(By.XPATH, "//a[contains(@class,'product-item-link')]")
+            # Increase wait time for CI (slow VM); each poll reads every tile at once
+            products = self.wait_until(
+                "product_tiles",
+                lambda d: d.execute_script(PRODUCT_TILES_JS, PRODUCT_LINK_CSS),
+                timeout=25,
+                key="product_tiles",
             )
 
-            products = self.driver.find_elements(By.XPATH, "//a[contains(@class,'product-item-link')]")
-
             if not products:
                 raise Exception("No products found on the page.")
 
-            self.logs.append(f"Number of products found: {len(products)}")
+            self.events.info(f"Number of products found: {len(products)}")
             return products
 
         except Exception as e:
-            self.logs.append(f"Could not load products. Error: {e}")
+            self.events.error(f"Could not load products. Error: {e}")
             self.driver.save_screenshot("error_products_not_found.png")
             raise
 
     def select_first_product(self, products):
         product = products[0]
+        name = product["name"]
 
-        # Get product name (fallback if .text is empty)
-        name = product.text.strip()
-        if not name:
-            name = product.get_attribute("innerText") or ""
-            name = name.strip()
-
-        # Scroll into view (headless CI needs this)
-        try:
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", product)
-        except Exception:
-            pass
+        # Only the tile we click needs a live element; scroll it into view on the way
+        link = self.driver.execute_script(
+            "var a = document.querySelectorAll(arguments[0])[arguments[1] - 1];"
+            "if (a) { a.scrollIntoView({block: 'center'}); } return a || null;",
+            PRODUCT_LINK_CSS, product["position"],
+        )
 
         # Try normal click
         try:
-            product.click()
+            link.click()
         except Exception:
-            # Headless fallback – force JS click
-            self.driver.execute_script("arguments[0].click();", product)
+            # Headless fallback – force JS click, or go straight to the link
+            try:
+                self.driver.execute_script("arguments[0].click();", link)
+            except Exception:
+                self.driver.get(product["href"])
 
         return name if name else "Unknown Product"
 
@@ -256,27 +352,10 @@ class HPStorePage:
         self.driver.switch_to.window(windows[-1])
 
     def get_product_name_detail_page(self):
-        # Try multiple safe locators for product title
-        locators = [
-            (By.TAG_NAME, "h1"),
-            (By.CSS_SELECTOR, "h1.page-title"),
-            (By.CSS_SELECTOR, "span.base"),
-            (By.XPATH, "//h1[contains(@class,'page-title')]"),
-            (By.XPATH, "//h1[contains(@class,'title')]"),
-        ]
-
-        title_text = ""
-
-        for locator in locators:
-            try:
-                elem = WebDriverWait(self.driver, 20).until(
-                    EC.visibility_of_element_located(locator)
-                )
-                title_text = elem.text.strip()
-                if title_text:
-                    break
-            except:
-                continue
+        # All title locators are raced in one poll; the first with text wins
+        _, title_text, _ = self.resolve_first(
+            "product_title", PRODUCT_TITLE_LOCATORS, timeout=20, text=True, required=False
+        )
 
         # Last fallback: use innerText
         if not title_text:
@@ -287,7 +366,7 @@ class HPStorePage:
                 title_text = ""
 
         # Log result
-        self.logs.append(f"Product Name on Product Page: {title_text}")
+        self.events.info(f"Product Name on Product Page: {title_text}")
 
         # Prevent assertion failure later
         if not title_text:
@@ -295,97 +374,173 @@ class HPStorePage:
 
         return title_text
 
+    def open_product(self, product_name):
+        """Get to the detail page for product_name and return the selected product's name.
+
+        Goes straight to the URL recorded in the product index when the detail
+        title still matches; otherwise runs search -> listing -> detail page and
+        records where it led (see selinum/utils/product_index.py)."""
+        if product_index.usable():
+            entry = product_index.lookup(self.url, product_name)
+            if entry:
+                start = time.perf_counter()
+                self.driver.get(entry["url"])
+                title = self.get_product_name_detail_page()
+                if title == entry["title"]:
+                    product_index.hit(entry, time.perf_counter() - start)
+                    self.events.info(f"Opened '{product_name}' from the product index: {entry['url']}")
+                    return entry["name"]
+                product_index.invalidate(self.url, product_name, f"title changed ('{entry['title']}' -> '{title}')")
+                self.events.warning(f"Product index entry for '{product_name}' is stale; searching again.")
+
+        start = time.perf_counter()
+        self.search_product(product_name)
+        selected = self.select_first_product(self.get_products())
+        self.switch_to_product_window()
+        self.remember_product(product_name, selected, self.get_product_name_detail_page(),
+                              time.perf_counter() - start)
+        return selected
+
+    def remember_product(self, product_name, selected, title, search_seconds):
+        """Record the detail page the search for product_name ended on, for open_product next time."""
+        if product_index.ENABLED and title != "UNKNOWN":
+            product_index.record(self.url, product_name, self.driver.current_url, selected, title, search_seconds)
+
     def add_to_cart(self):
         # Scroll deep so CI loads everything
         try:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            self.wait_for_network_idle()
         except:
             pass
 
         # HP website takes long to activate button → wait up to 30 sec
         try:
-            add_to_cart_button = WebDriverWait(self.driver, 30).until(
-                EC.element_to_be_clickable((By.ID, "product-addtocart-button"))
+            add_to_cart_button, _, _ = self.resolve_first(
+                "add_to_cart", ADD_TO_CART_LOCATORS, timeout=30, clickable=True
             )
             self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", add_to_cart_button)
-            time.sleep(2)
+            self.wait_for_element_stable(add_to_cart_button)
             add_to_cart_button.click()
-            self.logs.append("Clicked add to cart.")
+            self.events.info("Clicked add to cart.")
         except Exception:
             # JS fallback click
             try:
-                btn = self.driver.find_element(By.ID, "product-addtocart-button")
+                btn, _, _ = self.resolve_first("add_to_cart", ADD_TO_CART_LOCATORS, timeout=2, visible=False)
                 self.driver.execute_script("arguments[0].click();", btn)
-                self.logs.append("Clicked add to cart using JS fallback.")
+                self.events.warning("Clicked add to cart using JS fallback.")
             except:
                 self.driver.save_screenshot("add_to_cart_failed.png")
                 raise Exception("Unable to click Add to Cart button in CI")
 
     def open_cart(self):
-        time.sleep(3)
+        # Let the add-to-cart request finish before looking for the popup
+        self.wait_for_network_idle()
 
-        # Remove the dark overlay that blocks the button
-        try:
-            self.driver.execute_script("""
-                let el = document.querySelector('.topNavigate_overlay_bg');
-                if (el) el.parentNode.removeChild(el);
-            """)
-            time.sleep(1)
-        except:
-            pass
+        # Clear the dark overlay that blocks the button
+        dismissed = popup.dismiss_known_popups(self.driver, popups=CART_OVERLAY_POPUPS)
+        if dismissed["handled"]:
+            self.events.info(f"Dismissed popups: {', '.join(h['name'] for h in dismissed['handled'])} "
+                             f"in {dismissed['seconds']:.2f}s", popups=dismissed["handled"])
+        self.wait_for_overlay_gone()
 
         # Try clicking normally with long wait (CI slow)
         try:
-            button = WebDriverWait(self.driver, 20).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//button[contains(@class,'view-cart')]")
-                )
-            )
+            button, _, _ = self.resolve_first("view_cart", VIEW_CART_LOCATORS, timeout=20, clickable=True)
             self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", button)
-            time.sleep(1)
+            self.wait_for_element_stable(button)
             button.click()
-            self.logs.append("Opened cart (normal click).")
+            self.events.info("Opened cart (normal click).")
             return
         except Exception:
             pass
 
         # Fallback JS click (always works in CI)
         try:
-            btn = self.driver.find_element(By.XPATH, "//button[contains(@class,'view-cart')]")
+            btn, _, _ = self.resolve_first("view_cart", VIEW_CART_LOCATORS, timeout=2, visible=False)
             self.driver.execute_script("arguments[0].click();", btn)
-            self.logs.append("Opened cart (JS fallback).")
+            self.events.warning("Opened cart (JS fallback).")
             return
         except:
             self.driver.save_screenshot("open_cart_failed.png")
             raise Exception("Unable to open cart (overlay or CI block)")
 
+    def add_to_cart_over_http(self, product_name):
+        """Hybrid mode: search and add to cart over HTTP in the browser's session."""
+        self.http_cart = HttpCart.from_driver(self.driver)
+        selected = self.http_cart.add_product(product_name)
+        self.http_cart.write_back(self.driver)
+        spent = sum(seconds for _, seconds in self.http_cart.timings)
+        self.events.info(f"Added '{selected}' to cart over HTTP in {spent:.2f}s "
+                         f"({len(self.http_cart.timings)} requests)")
+        return selected
+
+    def open_cart_page(self):
+        self.driver.get((self.http_cart or HttpCart(self.url)).cart_url())
+        self.wait_for_document_ready(required=False)
+        self.events.info("Opened cart page.")
+
     def verify_cart_product(self, expected_name):
-        cart_text = self.wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[@class='stellar-title__small text-primary']")))
-        self.logs.append(f"Product in cart: {cart_text[0].text}")
+        cart_xpath = "//a[@class='stellar-title__small text-primary']"
+        self.wait_for_presence_of_element_located(By.XPATH, cart_xpath, self.timeout)
+        cart_text = self.driver.find_elements(By.XPATH, cart_xpath)
+        self.events.info(f"Product in cart: {cart_text[0].text}")
         assert cart_text[0].text.strip() == expected_name.strip(), \
             " Product name in cart does not match the selected product."
-        self.logs.append("Product name in cart matches the selected product.")
+        self.events.info("Product name in cart matches the selected product.")
+
+    def add_products_to_cart(self, product_names, over_http=False):
+        """Add several products in this session; a failing product does not stop the rest.
+
+        Returns one entry per name, in order: {"selected": name} or {"error": message}."""
+        added = []
+        for product_name in product_names:
+            try:
+                if over_http:
+                    selected = self.add_to_cart_over_http(product_name)
+                else:
+                    selected = self.open_product(product_name)
+                    self.add_to_cart()
+                    # The add request has to land before the next search navigates away
+                    self.wait_for_network_idle()
+                added.append({"selected": selected})
+            except Exception as e:
+                self.events.error(f"Could not add '{product_name}' to cart. Error: {e}")
+                added.append({"error": str(e)})
+        return added
+
+    def get_cart_product_names(self):
+        cart_xpath = "//a[@class='stellar-title__small text-primary']"
+        self.wait_for_presence_of_element_located(By.XPATH, cart_xpath, self.timeout)
+        return self.driver.execute_script(CART_NAMES_JS, cart_xpath)
+
+    def verify_cart_products(self, expected_names):
+        """Check many names in one pass over the cart page.
+
+        Returns {"matched": [...], "missing": [...], "cart": [names in cart]};
+        a name expected twice has to be in the cart twice."""
+        try:
+            cart = self.get_cart_product_names()
+        except Exception:
+            cart = []
+        remaining = Counter(cart)
+        matched, missing = [], []
+        for name in expected_names:
+            if remaining[name.strip()] > 0:
+                remaining[name.strip()] -= 1
+                matched.append(name)
+            else:
+                missing.append(name)
+        self.events.info(f"Cart check: {len(matched)} matched, {len(missing)} missing", missing=missing)
+        return {"matched": matched, "missing": missing, "cart": cart}
 
     def inject_logs_and_screenshot(self):
-        self.logs.append("Bye!")
+        for step, seconds, ok in self.wait_timings:
+            self.events.debug(f"Waited {step}: {seconds:.2f}s{'' if ok else ' (timed out)'}",
+                              wait=step, seconds=round(seconds, 3), met=ok)
+        self.events.info("Bye!")
         self.driver.save_screenshot("final_page.png")
-        js_code = f'''
-        var logDiv = document.createElement('pre');
-        logDiv.style.fontSize = '16px';
-        logDiv.style.color = 'black';
-        logDiv.style.background = 'white';
-        logDiv.style.position = 'absolute';
-        logDiv.style.top = '0';
-        logDiv.style.left = '0';
-        logDiv.style.zIndex = '999999';
-        logDiv.style.padding = '20px';
-        logDiv.style.width = '100%';
-        logDiv.style.height = '100%';
-        logDiv.style.overflow = 'auto';
-        logDiv.innerText = `{chr(10).join(self.logs)}`;
-        document.body.innerHTML = '';
-        document.body.appendChild(logDiv);
-        '''
-        self.driver.execute_script(js_code)
-        self.driver.save_screenshot("console_output.png")
+        # The summary is rendered from the event log file, not drawn into the page
+        summary = self.events.render()
+        allure.attach(summary, name="event_log", attachment_type=allure.attachment_type.TEXT)
+        return summary
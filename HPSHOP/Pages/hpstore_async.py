@@ -0,0 +1,209 @@
+"""asyncio variant of HPStorePage for running many cart flows in one browser.
+
+Each AsyncHPStorePage drives its own tab in its own browser context (see
+selinum/utils/async_browser.py), so cookies and carts stay isolated while
+all flows share one Chrome. Steps mirror HPStorePage and reuse its
+locators. Each step is one awaited CDP call that waits in the page (push
+wait) and then acts on the element it found.
+
+    async with AsyncBrowser.for_driver(driver) as browser:
+        results = await run_flows(browser, url, ["HP X200", "HP 150"], concurrency=4)
+"""
+import asyncio
+import time
+
+from selenium.webdriver.common.by import By
+
+from base.base_driver import PUSH_WAIT_JS, RESOLVE_FIRST_FN
+from Pages.hpstore import (
+    ADD_TO_CART_LOCATORS, COOKIE_ACCEPT_LOCATORS, PRODUCT_LINK_CSS, PRODUCT_TILES_JS, PRODUCT_TITLE_LOCATORS,
+    STORE_URL, VIEW_CART_LOCATORS,
+)
+from selinum.utils.event_log import EventLog
+
+CART_ITEM_XPATH = "//a[@class='stellar-title__small text-primary']"
+SEARCH_LOCATORS = [(By.ID, "search")]
+
+# Waits for a locator like resolve_first(), then clicks it or fills and submits it
+ACT_FN = """
+function (locators, opts, action, value, timeoutMs) {
+    return new Promise(function (resolve) {
+        (function () {
+%s
+        }).apply(null, [[locators, opts], timeoutMs, function (match) {
+            if (!match) { resolve(null); return; }
+            var el = match[1];
+            if (action === 'click') {
+                el.scrollIntoView({block: 'center'});
+                el.click();
+            } else if (action === 'submit') {
+                el.value = value;
+                if (el.form) { el.form.submit(); }
+            }
+            resolve({index: match[0], text: match[2]});
+        }]);
+    });
+}
+""" % (PUSH_WAIT_JS % RESOLVE_FIRST_FN)
+
+
+def _wait_fn(check_fn):
+    """Promise-returning form of push_wait() for a condition function."""
+    return """
+function (args, timeoutMs) {
+    return new Promise(function (resolve) {
+        (function () {
+%s
+        }).apply(null, [args, timeoutMs, resolve]);
+    });
+}
+""" % (PUSH_WAIT_JS % check_fn)
+
+
+PRODUCT_TILES_WAIT_FN = _wait_fn(
+    "function (css) { var tiles = (function () {%s}).apply(null, [css]); return tiles.length ? tiles : null; }"
+    % PRODUCT_TILES_JS
+)
+
+# Clicks the product tile like HPStorePage.select_first_product. A tile that
+# would open a new window is opened in this tab instead: new windows are not
+# part of the tab's CDP session.
+CLICK_TILE_FN = """
+function (css, position) {
+    var a = document.querySelectorAll(css)[position - 1];
+    if (!a) { return false; }
+    a.removeAttribute('target');
+    a.scrollIntoView({block: 'center'});
+    a.click();
+    return true;
+}
+"""
+
+CART_NAMES_WAIT_FN = _wait_fn("""
+function (xpath) {
+    var snap = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var names = [];
+    for (var i = 0; i < snap.snapshotLength; i++) { names.push(snap.snapshotItem(i).innerText.trim()); }
+    return names.length ? names : null;
+}
+""")
+
+
+class AsyncHPStorePage:
+    def __init__(self, tab, url=STORE_URL, timeout=10):
+        self.tab = tab
+        self.url = url
+        self.timeout = timeout
+        self.events = EventLog()
+
+    @classmethod
+    async def open(cls, browser, url=STORE_URL, timeout=10):
+        return cls(await browser.new_tab(), url, timeout)
+
+    async def _act(self, locators, action="none", value=None, timeout=None, clickable=False, text=False,
+                   required=True):
+        timeout = timeout or self.timeout
+        opts = {"visible": True, "enabled": clickable, "text": text}
+        match = await self.tab.evaluate(ACT_FN, [list(l) for l in locators], opts, action, value,
+                                        int(timeout * 1000), timeout=timeout)
+        if match is None and required:
+            raise TimeoutError(f"none of {locators} matched within {timeout}s")
+        return match
+
+    async def _wait(self, fn, args, timeout=None):
+        timeout = timeout or self.timeout
+        value = await self.tab.evaluate(fn, args, int(timeout * 1000), timeout=timeout)
+        if value is None:
+            raise TimeoutError(f"condition not met within {timeout}s")
+        return value
+
+    async def open_site(self):
+        await self.tab.navigate(self.url)
+        self.events.info("Opened HP Store Website")
+
+    async def accept_cookies(self):
+        if await self._act(COOKIE_ACCEPT_LOCATORS, "click", clickable=True, required=False):
+            self.events.info("Accepted cookies.")
+        else:
+            self.events.warning("Cookie popup not found or already handled.")
+
+    async def search_product(self, product_name):
+        load = self.tab.expect_load()
+        await self._act(SEARCH_LOCATORS, "submit", product_name, clickable=True)
+        await self.tab.wait(load, self.timeout * 2)
+        self.events.info(f"Searched for product: {product_name}")
+
+    async def get_products(self):
+        products = await self._wait(PRODUCT_TILES_WAIT_FN, [PRODUCT_LINK_CSS], timeout=25)
+        self.events.info(f"Number of products found: {len(products)}")
+        return products
+
+    async def select_first_product(self, products):
+        product = products[0]
+        load = self.tab.expect_load()
+        if await self.tab.evaluate(CLICK_TILE_FN, PRODUCT_LINK_CSS, product["position"]):
+            await self.tab.wait(load, self.timeout * 2)
+        else:
+            # The tile went away since get_products(); go straight to the link, as the sync page does
+            await self.tab.navigate(product["href"])
+        return product["name"] or "Unknown Product"
+
+    async def get_product_name_detail_page(self):
+        match = await self._act(PRODUCT_TITLE_LOCATORS, text=True, timeout=20, required=False)
+        title_text = match["text"] if match else ""
+        self.events.info(f"Product Name on Product Page: {title_text}")
+        return title_text or "UNKNOWN"
+
+    async def add_to_cart(self):
+        await self._act(ADD_TO_CART_LOCATORS, "click", clickable=True, timeout=30)
+        self.events.info("Clicked add to cart.")
+
+    async def open_cart(self):
+        load = self.tab.expect_load()
+        await self._act(VIEW_CART_LOCATORS, "click", clickable=True, timeout=20)
+        await self.tab.wait(load, self.timeout * 2)
+        self.events.info("Opened cart.")
+
+    async def verify_cart_product(self, expected_name):
+        names = await self._wait(CART_NAMES_WAIT_FN, [CART_ITEM_XPATH])
+        self.events.info(f"Product in cart: {names[0]}")
+        assert names[0].strip() == expected_name.strip(), " Product name in cart does not match the selected product."
+        return names
+
+    async def run_cart_flow(self, product_name):
+        """search -> first product -> add to cart -> verify, as in test_hp_store_cart_excel."""
+        await self.open_site()
+        await self.accept_cookies()
+        await self.search_product(product_name)
+        selected = await self.select_first_product(await self.get_products())
+        await self.get_product_name_detail_page()
+        await self.add_to_cart()
+        await self.open_cart()
+        await self.verify_cart_product(selected)
+        return selected
+
+    async def close(self):
+        await self.tab.close()
+
+
+async def run_flows(browser, url, product_names, concurrency=4, timeout=10):
+    """Run one cart flow per product, at most `concurrency` tabs at a time.
+
+    Returns one dict per product with the selected name, seconds and error."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(name):
+        async with gate:
+            start = time.perf_counter()
+            page = await AsyncHPStorePage.open(browser, url, timeout)
+            try:
+                selected = await page.run_cart_flow(name)
+                return {"product": name, "selected": selected, "seconds": time.perf_counter() - start,
+                        "error": None}
+            except Exception as e:
+                return {"product": name, "selected": None, "seconds": time.perf_counter() - start,
+                        "error": f"{type(e).__name__}: {e}"}
+            finally:
+                await page.close()
+
+    return await asyncio.gather(*(one(name) for name in product_names))
@@ -1,26 +1,379 @@
+import json
+import os
+import time
+
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from selinum.utils.locator_cache import get_locator_cache
+from selinum.utils import timeouts
+from selinum.utils.resource_policy import PATTERN_GROUPS
+from selinum.utils.tracing import traced
+
+
+# Analytics and ad hosts keep sending beacons on a live store; network idle
+# does not wait for them (same hosts the resource profiles block).
+IDLE_IGNORED_URLS = [p.strip("*").rstrip("/") for group in ("analytics", "ads")
+                     for p in PATTERN_GROUPS[group]]
+
+# Counts in-flight XHR/fetch requests so we can tell when the page went quiet.
+# Installed once per document (either on demand or through CDP for every new
+# document) and exposed as window.__hpNet = {inflight, last}.
+NETWORK_TRACKER_JS = """
+(function (ignored) {
+    if (window.__hpNet) { return; }
+    var net = window.__hpNet = {inflight: 0, last: performance.now(), ignored: ignored};
+    function skip(url) {
+        url = String(url || '');
+        return ignored.some(function (part) { return url.indexOf(part) !== -1; });
+    }
+    function start() { net.inflight += 1; net.last = performance.now(); }
+    function done() { net.inflight = Math.max(0, net.inflight - 1); net.last = performance.now(); }
+    var open = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__hpSkip = skip(url);
+        return open.apply(this, arguments);
+    };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        if (!this.__hpSkip) {
+            start();
+            this.addEventListener('loadend', done);
+        }
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function (input) {
+            if (skip(input && input.url ? input.url : input)) { return fetch.apply(this, arguments); }
+            start();
+            return fetch.apply(this, arguments).then(
+                function (r) { done(); return r; },
+                function (e) { done(); throw e; }
+            );
+        };
+    }
+})(%s);
+""" % json.dumps(IDLE_IGNORED_URLS)
+
+NETWORK_IDLE_JS = """
+var idleMs = arguments[0];
+var net = window.__hpNet;
+if (!net) { return null; }
+var now = performance.now();
+var last = net.last;
+performance.getEntriesByType('resource').forEach(function (e) {
+    if (e.initiatorType === 'beacon') { return; }
+    if (net.ignored.some(function (part) { return e.name.indexOf(part) !== -1; })) { return; }
+    if (e.responseEnd > last) { last = e.responseEnd; }
+});
+return net.inflight === 0 && (now - last) >= idleMs;
+"""
+
+ELEMENT_STABLE_JS = """
+var el = arguments[0], frames = arguments[1], done = arguments[arguments.length - 1];
+function box() {
+    var r = el.getBoundingClientRect();
+    return [r.top, r.left, r.width, r.height].join(',');
+}
+var first = box(), seen = 0;
+function tick() {
+    if (!el.isConnected || box() !== first) { done(false); return; }
+    seen += 1;
+    if (seen >= frames) { done(first !== '0,0,0,0'); return; }
+    requestAnimationFrame(tick);
+}
+requestAnimationFrame(tick);
+"""
+
+# DOM conditions are written as JS functions so the same check can be polled
+# with execute_script or pushed from a MutationObserver (see push_wait).
+# Each returns a truthy value once the condition holds.
+OVERLAY_GONE_FN = """
+function (selector) {
+    return !Array.prototype.some.call(document.querySelectorAll(selector), function (el) {
+        var s = window.getComputedStyle(el);
+        var r = el.getBoundingClientRect();
+        return s.display !== 'none' && s.visibility !== 'hidden' && s.opacity !== '0'
+            && r.width > 0 && r.height > 0;
+    });
+}
+"""
+
+URL_CONTAINS_FN = "function (part) { return location.href.indexOf(part) !== -1 ? location.href : null; }"
 
+URL_CHANGED_FN = "function (old) { return location.href !== old ? location.href : null; }"
 
+TITLE_IS_FN = "function (title) { return document.title === title; }"
+
+# Checks every candidate locator in one pass and returns the first usable
+# match in priority order as [index, element, text], or null.
+RESOLVE_FIRST_FN = """
+function (locators, opts) {
+function all(by, value) {
+    switch (by) {
+        case 'css selector': return Array.prototype.slice.call(document.querySelectorAll(value));
+        case 'id': var el = document.getElementById(value); return el ? [el] : [];
+        case 'name': return Array.prototype.slice.call(document.getElementsByName(value));
+        case 'class name': return Array.prototype.slice.call(document.getElementsByClassName(value));
+        case 'tag name': return Array.prototype.slice.call(document.getElementsByTagName(value));
+        case 'link text':
+        case 'partial link text':
+            return Array.prototype.filter.call(document.getElementsByTagName('a'), function (a) {
+                var t = (a.innerText || '').trim();
+                return by === 'link text' ? t === value : t.indexOf(value) !== -1;
+            });
+        case 'xpath':
+            var snap = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var out = [];
+            for (var i = 0; i < snap.snapshotLength; i++) { out.push(snap.snapshotItem(i)); }
+            return out;
+    }
+    return [];
+}
+function usable(el) {
+    var r = el.getBoundingClientRect(), s = window.getComputedStyle(el);
+    if (opts.visible && (r.width === 0 || r.height === 0 || s.visibility === 'hidden' || s.display === 'none')) {
+        return false;
+    }
+    if (opts.enabled && el.disabled) { return false; }
+    return true;
+}
+for (var i = 0; i < locators.length; i++) {
+    var found;
+    try { found = all(locators[i][0], locators[i][1]); } catch (e) { continue; }
+    for (var j = 0; j < found.length; j++) {
+        var text = (found[j].innerText || found[j].textContent || '').trim();
+        if (usable(found[j]) && (!opts.text || text)) { return [i, found[j], text]; }
+    }
+}
+return null;
+}
+"""
+
+POLL_JS = "return (%s).apply(null, arguments[0]);"
+
+# Runs a condition function once, then again on every DOM mutation, history
+# change or finished transition, and calls back as soon as it holds. A slow
+# in-page timer covers changes no observer sees (e.g. a stylesheet finishing).
+# Calls back with null after timeoutMs so the caller can re-arm it.
+PUSH_WAIT_JS = """
+var check = (%s), args = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+function attempt() { try { return check.apply(null, args); } catch (e) { return null; } }
+var first = attempt();
+if (first) { done(first); return; }
+var finished = false, observer, timer, ticker;
+function finish(value) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    clearInterval(ticker);
+    ['popstate', 'hashchange'].forEach(function (e) { window.removeEventListener(e, changed); });
+    ['transitionend', 'animationend'].forEach(function (e) { document.removeEventListener(e, changed, true); });
+    done(value);
+}
+function changed() { var value = attempt(); if (value) { finish(value); } }
+observer = new MutationObserver(changed);
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+['popstate', 'hashchange'].forEach(function (e) { window.addEventListener(e, changed); });
+['transitionend', 'animationend'].forEach(function (e) { document.addEventListener(e, changed, true); });
+ticker = setInterval(changed, 250);
+timer = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+# Overlays the HP store (Magento) puts over the page while it is busy. Not
+# .modals-overlay: that is also the backdrop of the add-to-cart confirmation,
+# which stays open until its View cart button is clicked.
+OVERLAY_SELECTORS = ".topNavigate_overlay_bg, .loading-mask"
+
+# HPSHOP_PUSH_WAITS=0 goes back to polling over the WebDriver protocol
+PUSH_WAITS = os.environ.get("HPSHOP_PUSH_WAITS", "1") != "0"
+# Longest single async script call; stays below chromedriver's default 30s script timeout
+PUSH_CHUNK = 10
+
+
+@traced
 class BaseDriver:
     def __init__(self,driver):
         self.driver = driver
+        # (step, seconds blocked, condition met) for every wait issued through this object
+        self.wait_timings = []
+        # Learned timeouts are kept per scope (the store origin), see selinum/utils/timeouts.py
+        self.timeout_scope = None
 
     # function for waiting for the title of the page
-    def wait_for_title(self,title):
-        wait = WebDriverWait(self.driver, 20)
-        wait.until(EC.title_is(title))
+    def wait_for_title(self,title,timeout=20):
+        self.push_wait("title", TITLE_IS_FN, [title], timeout)
 
     #Function for waiting for visibility of element
-    def wait_for_visibility_of_element_located(self,locator_type,locator):
-        wait = WebDriverWait(self.driver, 20)
-        wait.until(EC.visibility_of_element_located((locator_type,locator)))
+    def wait_for_visibility_of_element_located(self,locator_type,locator,timeout=20):
+        return self._wait_for_locator("visibility", locator_type, locator, timeout, {"visible": True})
+
+    def wait_for_presence_of_element_located(self,locator_type,locator,timeout=20):
+        return self._wait_for_locator("presence", locator_type, locator, timeout, {})
+
+    def wait_for_element_to_be_clickable(self,locator_type,locator,timeout=20):
+        return self._wait_for_locator("clickable", locator_type, locator, timeout, {"visible": True, "enabled": True})
 
-    def wait_for_Url(self,url):
-        wait = WebDriverWait(self.driver, 20)
-        wait.until(EC.url_contains(url))
+    def wait_for_Url(self,url,timeout=20):
+        return self.push_wait("url", URL_CONTAINS_FN, [url], timeout)
+
+    def _wait_for_locator(self, step, locator_type, locator, timeout, opts):
+        match = self.push_wait(step, RESOLVE_FIRST_FN, [[[locator_type, locator]], opts], timeout,
+                               key=f"{step}:{locator}")
+        return match[1]
 
     def find_element(self,locator_type,locator):
         element = self.driver.find_element(locator_type,locator)
-        return element
\ No newline at end of file
+        return element
+
+    # ------------------------------------------------------------
+    # Condition-driven wait engine: every wait returns as soon as its
+    # condition holds and records how long it actually blocked.
+    # ------------------------------------------------------------
+    def wait_until(self, step, condition, timeout=20, poll=0.1, required=True, key=None):
+        """Wait for `condition` and record the time spent under `step`.
+
+        Returns the condition's value, or None when `required` is False
+        and the timeout expired. With a `key`, `timeout` is only the ceiling
+        and the timeout oracle picks the actual value (selinum/utils/timeouts.py)."""
+        ceiling, timeout = timeout, self._adaptive_timeout(key, timeout, required)
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=poll).until(condition)
+            ok = True
+            return result
+        except TimeoutException:
+            if required:
+                raise
+            return None
+        finally:
+            self._record_wait(step, key, time.perf_counter() - start, ok, timeout, ceiling)
+
+    def push_wait(self, step, condition_fn, args, timeout=20, required=True, key=None):
+        """Wait for a JS condition function without polling over the wire.
+
+        The condition runs in the page and re-checks itself on every DOM
+        mutation, so one async script call returns as soon as it holds. A
+        navigation ends the call early; it is then re-armed on the new
+        document. If async scripts keep failing, the remaining time is spent
+        polling the same function like wait_until() would."""
+        if not PUSH_WAITS:
+            return self.wait_until(step, lambda d: d.execute_script(POLL_JS % condition_fn, args),
+                                   timeout, required=required, key=key)
+        ceiling, timeout = timeout, self._adaptive_timeout(key, timeout, required)
+        start = time.perf_counter()
+        deadline = start + timeout
+        script = PUSH_WAIT_JS % condition_fn
+        failures = 0
+        ok = False
+        try:
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutException(f"{step}: condition not met after {timeout}s")
+                if failures >= 3:
+                    result = WebDriverWait(self.driver, remaining, poll_frequency=0.1).until(
+                        lambda d: d.execute_script(POLL_JS % condition_fn, args))
+                else:
+                    try:
+                        result = self.driver.execute_async_script(script, args, int(min(remaining, PUSH_CHUNK) * 1000))
+                        failures = 0
+                    except WebDriverException:
+                        # Document unloaded mid-wait, or no async script support
+                        failures += 1
+                        continue
+                if result:
+                    ok = True
+                    return result
+        except TimeoutException:
+            if required:
+                raise
+            return None
+        finally:
+            self._record_wait(step, key, time.perf_counter() - start, ok, timeout, ceiling)
+
+    def _adaptive_timeout(self, key, timeout, required=True):
+        if key is None or not timeouts.ENABLED:
+            return timeout
+        return timeouts.get_oracle().timeout(key, timeout, scope=self.timeout_scope, required=required)
+
+    def _record_wait(self, step, key, seconds, ok, timeout, ceiling):
+        self.wait_timings.append((step, seconds, ok))
+        if key is not None and timeouts.ENABLED:
+            timeouts.get_oracle().observe(key, seconds, ok, timeout, ceiling, scope=self.timeout_scope)
+
+    def wait_report(self):
+        """Human readable lines describing how long each wait blocked."""
+        return [
+            f"{step}: {seconds:.2f}s{'' if ok else ' (timed out)'}"
+            for step, seconds, ok in self.wait_timings
+        ]
+
+    def install_network_tracker(self):
+        # Register for every future document when CDP is available, and
+        # install into the current one right away.
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_JS})
+        except Exception:
+            pass
+        self.driver.execute_script(NETWORK_TRACKER_JS)
+
+    def wait_for_document_ready(self, timeout=20, required=True):
+        return self.wait_until(
+            "document_ready",
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            timeout,
+            required=required,
+        )
+
+    def wait_for_network_idle(self, idle_ms=500, timeout=8, required=False):
+        def idle(d):
+            state = d.execute_script(NETWORK_IDLE_JS, idle_ms)
+            if state is None:
+                # New document without the tracker yet
+                d.execute_script(NETWORK_TRACKER_JS)
+                return False
+            return state
+
+        return self.wait_until("network_idle", idle, timeout, required=required)
+
+    def wait_for_element_stable(self, element, frames=3, timeout=10, required=False):
+        """Wait until the element's bounding box stays put across `frames` animation frames."""
+        return self.wait_until(
+            "element_stable",
+            lambda d: d.execute_async_script(ELEMENT_STABLE_JS, element, frames) and element,
+            timeout,
+            required=required,
+        )
+
+    def wait_for_overlay_gone(self, selector=OVERLAY_SELECTORS, timeout=10, required=False):
+        return self.push_wait("overlay_gone", OVERLAY_GONE_FN, [selector], timeout, required=required)
+
+    def wait_for_url_change(self, old_url, timeout=10, required=False):
+        return self.push_wait("url_change", URL_CHANGED_FN, [old_url], timeout, required=required)
+
+    def resolve_first(self, page_type, locators, timeout=20, visible=True, clickable=False, text=False,
+                      required=True):
+        """Race several (By, value) candidates in one in-page check.
+
+        Returns (element, text, locator) for the first candidate, in priority
+        order, that is present (and visible / enabled / non-empty as asked).
+        The winner is remembered per page_type and tried first next time.
+        Returns (None, "", None) when nothing matched and required is False."""
+        cache = get_locator_cache()
+        ordered = cache.order(page_type, [tuple(l) for l in locators])
+        opts = {"visible": visible or clickable, "enabled": clickable, "text": text}
+        # A hidden-button probe and a clickable wait on the same locators learn separately
+        key = page_type if opts["visible"] else f"{page_type}:present"
+        match = self.push_wait(page_type, RESOLVE_FIRST_FN, [[list(l) for l in ordered], opts], timeout,
+                               required=required, key=key)
+        if not match:
+            return None, "", None
+        index, element, found_text = match
+        cache.record(page_type, ordered[index])
+        return element, found_text, ordered[index]
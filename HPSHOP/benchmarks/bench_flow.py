@@ -0,0 +1,88 @@
+"""Benchmark every HPStorePage step and the whole search -> add -> cart flow.
+
+Runs against the local stub store (deterministic: no jitter, fixed seed) with
+the cross-run state switched off (benchmark.isolate_state), so numbers only
+move when the page object or the browser setup changes:
+
+    python -m benchmarks.bench_flow [--runs 20] [--update-baseline] [--threshold 0.2]
+
+Exits with status 1 when a step's p50 or p95 regressed past the threshold
+against the saved baseline (selinum/utils/benchmark.py).
+"""
+import argparse
+import sys
+
+from Pages.hpstore import HPStorePage
+from selinum.utils import benchmark
+from selinum.utils.driver_factory import create_driver
+from selinum.utils.stub_store import StubStore
+
+QUERY = "HP X200"
+
+STEPS = [
+    ("open_site", lambda hp, ctx: hp.open_site()),
+    ("accept_cookies", lambda hp, ctx: hp.accept_cookies()),
+    ("search_product", lambda hp, ctx: hp.search_product(QUERY)),
+    ("get_products", lambda hp, ctx: ctx.update(products=hp.get_products())),
+    ("select_first_product", lambda hp, ctx: ctx.update(selected=hp.select_first_product(ctx["products"]))),
+    ("switch_to_product_window", lambda hp, ctx: hp.switch_to_product_window()),
+    ("get_product_name_detail_page", lambda hp, ctx: hp.get_product_name_detail_page()),
+    ("add_to_cart", lambda hp, ctx: hp.add_to_cart()),
+    ("open_cart", lambda hp, ctx: hp.open_cart()),
+    ("verify_cart_product", lambda hp, ctx: hp.verify_cart_product(ctx["selected"])),
+]
+
+
+def run_flow(driver, url, recorder):
+    # A fresh stub session per run: no cookie consent, empty cart
+    driver.delete_all_cookies()
+    hp = HPStorePage(driver, url=url, timeout=10)
+    ctx = {}
+    start = benchmark.browser_metrics(driver)
+    total = 0.0
+    for name, step in STEPS:
+        # Metrics are read outside the timed block so they do not skew the latency
+        before = benchmark.browser_metrics(driver)
+        with recorder.measure(name):
+            step(hp, ctx)
+        total += recorder.samples[name][-1]
+        recorder.add_resources(name, before, benchmark.browser_metrics(driver))
+    recorder.samples["flow"].append(total)
+    recorder.add_resources("flow", start, benchmark.browser_metrics(driver))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--threshold", type=float, default=benchmark.THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    benchmark.isolate_state()
+
+    recorder = benchmark.Recorder()
+    with StubStore(seed=1) as store:
+        driver = create_driver()
+        try:
+            for _ in range(args.warmup):
+                run_flow(driver, store.url, benchmark.Recorder())
+            for _ in range(args.runs):
+                run_flow(driver, store.url, recorder)
+        finally:
+            driver.quit()
+
+    results = recorder.results()
+    baseline = benchmark.load_baseline()
+    print("\n".join(benchmark.format_results(results, baseline)))
+    if args.update_baseline or not baseline:
+        benchmark.save_baseline(results)
+        print(f"baseline written to {benchmark.BASELINE_FILE}")
+        return 0
+    found = benchmark.regressions(results, baseline, args.threshold)
+    for line in found:
+        print(f"REGRESSION {line}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Flows per minute against memory: one browser per flow vs. many tabs in one browser.
+
+    python -m benchmarks.bench_multitab [--flows 16] [--concurrency 1,2,4,8]
+
+"browsers" runs the synchronous HPStorePage flow with one Chrome per
+concurrent flow (the current model). "tabs" runs AsyncHPStorePage flows in
+isolated browser contexts of a single Chrome. Peak memory is the PSS of the
+chromedriver/Chrome process trees, sampled while the flows run.
+"""
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Pages.hpstore import HPStorePage
+from Pages.hpstore_async import run_flows
+from selinum.utils.async_browser import AsyncBrowser
+from selinum.utils import benchmark
+from selinum.utils.benchmark import process_tree_mb
+from selinum.utils.driver_factory import create_driver
+from selinum.utils.stub_store import DEFAULT_PRODUCTS, StubStore
+
+QUERIES = [p["name"] for p in DEFAULT_PRODUCTS if p["in_stock"]]
+
+
+class MemorySampler:
+    def __init__(self, drivers, interval=0.25):
+        self.drivers = drivers
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            pids = [d.service.process.pid for d in list(self.drivers)]
+            self.peak = max(self.peak, process_tree_mb(*pids))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def sync_flow(driver, url, query):
+    driver.delete_all_cookies()
+    hp = HPStorePage(driver, url=url, timeout=10)
+    hp.open_site()
+    hp.accept_cookies()
+    hp.search_product(query)
+    selected = hp.select_first_product(hp.get_products())
+    hp.get_product_name_detail_page()
+    hp.add_to_cart()
+    hp.open_cart()
+    hp.verify_cart_product(selected)
+
+
+def bench_browsers(url, queries, concurrency):
+    drivers = [create_driver() for _ in range(concurrency)]
+    free = list(drivers)
+    lock = threading.Lock()
+
+    def one(query):
+        with lock:
+            driver = free.pop()
+        try:
+            sync_flow(driver, url, query)
+            return True
+        except Exception:
+            return False
+        finally:
+            with lock:
+                free.append(driver)
+
+    try:
+        with MemorySampler(drivers) as sampler:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                ok = sum(pool.map(one, queries))
+            wall = time.perf_counter() - start
+    finally:
+        for d in drivers:
+            d.quit()
+    return ok, wall, sampler.peak
+
+
+def bench_tabs(url, queries, concurrency):
+    driver = create_driver()
+
+    async def flows():
+        async with AsyncBrowser.for_driver(driver) as browser:
+            return await run_flows(browser, url, queries, concurrency)
+
+    try:
+        with MemorySampler([driver]) as sampler:
+            start = time.perf_counter()
+            results = asyncio.run(flows())
+            wall = time.perf_counter() - start
+    finally:
+        driver.quit()
+    return sum(1 for r in results if r["error"] is None), wall, sampler.peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", type=int, default=16)
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    args = parser.parse_args(argv)
+    benchmark.isolate_state()
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.flows)]
+
+    print(f"{'model':9s} {'conc':>4s} {'ok':>5s} {'flows/min':>9s} {'peak MB':>8s} {'flows/min/GB':>12s}")
+    with StubStore(seed=1) as store:
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            for model, bench in (("browsers", bench_browsers), ("tabs", bench_tabs)):
+                ok, wall, peak = bench(store.url, queries, concurrency)
+                per_min = ok / wall * 60
+                per_gb = per_min / (peak / 1024) if peak else 0.0
+                print(f"{model:9s} {concurrency:4d} {ok:2d}/{len(queries):<2d} {per_min:9.1f} {peak:8.0f} {per_gb:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Step latency of push waits against WebDriverWait polling.
+
+Runs against the local stub store, so it needs Chrome but no network:
+
+    python -m benchmarks.bench_waits [trials]
+
+Every trial schedules an element to appear after a random delay and measures
+how long after that moment each wait strategy returns ("overshoot").
+"""
+import random
+import statistics
+import sys
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+from base.base_driver import BaseDriver
+from selinum.utils.driver_factory import create_driver
+from selinum.utils.stub_store import StubStore
+
+APPEAR_JS = """
+var old = document.getElementById('bench-target');
+if (old) { old.remove(); }
+setTimeout(function () {
+    var el = document.createElement('button');
+    el.id = 'bench-target';
+    el.textContent = 'ready';
+    document.body.appendChild(el);
+}, arguments[0]);
+"""
+
+
+def poll_wait(driver):
+    WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.ID, "bench-target")))
+
+
+def push_wait(driver):
+    BaseDriver(driver).wait_for_visibility_of_element_located(By.ID, "bench-target", timeout=10)
+
+
+STRATEGIES = {"webdriverwait (500 ms poll)": poll_wait, "push_wait": push_wait}
+
+
+def run(driver, wait, trials, rng):
+    overshoot = []
+    for _ in range(trials):
+        delay = rng.uniform(0.2, 1.0)
+        start = time.perf_counter()
+        driver.execute_script(APPEAR_JS, int(delay * 1000))
+        wait(driver)
+        overshoot.append((time.perf_counter() - start - delay) * 1000)
+    return overshoot
+
+
+def main(trials=30):
+    rng = random.Random(7)
+    with StubStore() as store:
+        driver = create_driver()
+        try:
+            driver.get(store.url)
+            for name, wait in STRATEGIES.items():
+                run(driver, wait, 2, rng)  # warm up
+                ms = sorted(run(driver, wait, trials, rng))
+                p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+                print(f"{name:28s} overshoot mean {statistics.mean(ms):6.1f} ms, "
+                      f"p50 {statistics.median(ms):6.1f} ms, p95 {p95:6.1f} ms")
+        finally:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
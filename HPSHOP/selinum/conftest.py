@@ -1,29 +1,277 @@
 import pytest
-from selenium import webdriver
-from selinum.utils.screenshot import take_screenshot
+from selinum.utils.screenshot import attach_screenshots, take_screenshot, get_writer
+from selinum.utils.browser_pool import BrowserPool, POOL_ENABLED
+from selinum.utils.driver_factory import create_driver
+from selinum.utils.locator_cache import save_locator_cache
+from selinum.utils.stub_store import StubStore, ENDPOINTS
+from selinum.utils import http_cache
+from selinum.utils import resource_policy
+from selinum.utils import report
+from selinum.utils import tracing, commands, command_profiler
+from selinum.utils import event_log, chrome_profile, session_state, batch_cart, product_index, timeouts, flow
+import allure
 import os, sys
+from urllib.parse import urlsplit
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 
-@pytest.fixture(scope="function")
-def driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
+@pytest.fixture(scope="session")
+def browser_pool():
+    pool = BrowserPool()
+    yield pool
+    pool.close()
+    if pool.cold_starts:
+        report.add_section("browser pool", pool.summary())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def locator_cache_writer():
+    yield
+    # Winners are kept in memory during the run and merged into the file once
+    save_locator_cache()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def startup_report():
+    yield
+    lines = chrome_profile.summary()
+    if lines:
+        report.add_section("browser startup", lines)
+
 
-    # ⭐ REQUIRED FOR GITHUB ACTIONS (DO NOT REMOVE)
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+@pytest.fixture(scope="function")
+def driver(browser_pool):
+    # HPSHOP_BROWSER_POOL=0 falls back to a fresh browser per test
+    if not POOL_ENABLED:
+        drv = create_driver()
+        yield drv
+        try:
+            drv.quit()
+        except Exception:
+            pass
+        return
 
-    drv = webdriver.Chrome(options=options)
+    drv = browser_pool.acquire()
     yield drv
-    try:
-        drv.quit()
-    except Exception:
-        pass
+    browser_pool.release(drv)
+
+
+@pytest.fixture(scope="session")
+def http_cache_store():
+    store = http_cache.HttpCacheStore()
+    yield store
+    lines = store.test_summaries
+    if http_cache.MODE == "record":
+        store.save()
+        lines.append(f"new objects: {store.new_objects}, deduplicated bodies: {store.deduplicated}")
+    if lines:
+        report.add_section(f"http cache ({http_cache.MODE})", lines)
+
+
+@pytest.fixture(autouse=True)
+def http_cache_session(request):
+    """Record or replay the browser's traffic when HPSHOP_HTTP_CACHE is set."""
+    if http_cache.MODE not in ("record", "replay") or "driver" not in request.fixturenames:
+        yield None
+        return
+    store = request.getfixturevalue("http_cache_store")
+    cache = http_cache.HttpCache(request.getfixturevalue("driver"), store).start()
+    yield cache
+    cache.stop()
+    store.test_summaries.append(f"{request.node.nodeid}: {cache.summary()}")
+
+
+_resource_lines = []
+
+
+@pytest.fixture(autouse=True)
+def resource_monitor(request):
+    """Apply HPSHOP_RESOURCE_PROFILE to the browser and report what it saved."""
+    if not resource_policy.PROFILE or "driver" not in request.fixturenames:
+        yield None
+        return
+    first_party = ["hp.com", urlsplit(request.getfixturevalue("store_url")).hostname]
+    policy = resource_policy.ResourcePolicy.from_profile(resource_policy.PROFILE, first_party=first_party)
+    monitor = resource_policy.ResourceMonitor(request.getfixturevalue("driver"), policy).start()
+    yield monitor
+    monitor.stop()
+    _resource_lines.append(resource_policy.describe(request.node.nodeid, policy.name, monitor.stats()))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def resource_report():
+    yield
+    if _resource_lines:
+        report.add_section(f"resource policy ({resource_policy.PROFILE})", _resource_lines)
+
+
+@pytest.fixture(autouse=True)
+def step_trace(request):
+    """Trace page-object steps into a Chrome trace file (HPSHOP_TRACE=0 turns it off)."""
+    if not tracing.TRACE_ENABLED or "driver" not in request.fixturenames:
+        yield None
+        return
+    drv = request.getfixturevalue("driver")
+    tracer = tracing.Tracer(request.node.nodeid)
+    commands.add_listener(drv, tracer.on_command)
+    tracer.activate()
+    yield tracer
+    tracer.deactivate()
+    commands.remove_listener(drv, tracer.on_command)
+    tracing.finish(tracer)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def trace_report():
+    yield
+    lines = tracing.session_summary()
+    if lines:
+        path = tracing.write_session_trace()
+        report.add_section("step timings", lines + ([f"trace: {path}"] if path else []))
+
+
+@pytest.fixture(autouse=True)
+def command_profile(request):
+    """Count WebDriver round trips per test and step (HPSHOP_COMMAND_PROFILE=0 turns it off)."""
+    if not command_profiler.PROFILE_ENABLED or "driver" not in request.fixturenames:
+        yield None
+        return
+    drv = request.getfixturevalue("driver")
+    profile = command_profiler.CommandProfile(request.node.nodeid)
+    # Commands are attributed through the active tracer's step stack
+    steps = None if tracing.TRACE_ENABLED else tracing.Tracer(request.node.nodeid).activate()
+    commands.add_listener(drv, profile.on_command)
+    yield profile
+    commands.remove_listener(drv, profile.on_command)
+    if steps is not None:
+        steps.deactivate()
+    command_profiler.finish(profile)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def command_report():
+    yield
+    lines = command_profiler.session_summary()
+    if lines:
+        report.add_section("webdriver commands", lines)
+
+
+@pytest.fixture(autouse=True)
+def events(request):
+    """Per-test JSONL event log that page objects created in the test write to."""
+    if "driver" not in request.fixturenames:
+        yield None
+        return
+    log = event_log.start_test_log(request.node.nodeid)
+    yield log
+    event_log.end_test_log(log)
+    if log.count:
+        try:
+            allure.attach.file(str(log.path), name="events.jsonl", attachment_type=allure.attachment_type.TEXT)
+        except Exception:
+            pass
+
+
+@pytest.fixture(scope="session", autouse=True)
+def session_state_report():
+    yield
+    lines = session_state.summary()
+    if lines:
+        report.add_section("session state", lines)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def product_index_report():
+    yield
+    lines = product_index.summary()
+    if lines:
+        report.add_section("product index", lines)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def timeout_report():
+    yield
+    lines = timeouts.session_summary()
+    if lines:
+        report.add_section("adaptive timeouts", lines)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def flow_report():
+    yield
+    lines = flow.session_summary()
+    if lines:
+        report.add_section("flow checkpoints", lines)
+
+
+@pytest.fixture(scope="session")
+def cart_batch(request, browser_pool, store_url):
+    """Shared batch run for HPSHOP_BATCH=1; each product test reads its own result."""
+    from Pages.hpstore import HPStorePage
+
+    def acquire():
+        return browser_pool.acquire() if POOL_ENABLED else create_driver()
+
+    def release(drv):
+        if POOL_ENABLED:
+            browser_pool.release(drv)
+            return
+        try:
+            drv.quit()
+        except Exception:
+            pass
+
+    batch = batch_cart.CartBatch(acquire, release,
+                                 lambda drv: HPStorePage(drv, url=store_url, timeout=10))
+    yield batch
+    lines = batch.summary()
+    if lines:
+        report.add_section("batch cart", lines)
+
+
+def _stub_latency():
+    # HPSHOP_STUB_LATENCY="search=0.5,product=0.3"
+    latency = {}
+    for part in os.environ.get("HPSHOP_STUB_LATENCY", "").split(","):
+        name, _, seconds = part.partition("=")
+        if name.strip() in ENDPOINTS and seconds:
+            latency[name.strip()] = float(seconds)
+    return latency
+
+
+@pytest.fixture(scope="session")
+def stub_store():
+    store = StubStore(
+        latency=_stub_latency(),
+        jitter=float(os.environ.get("HPSHOP_STUB_JITTER", "0")),
+        lazy_products=os.environ.get("HPSHOP_STUB_LAZY") == "1",
+    )
+    store.start()
+    yield store
+    store.stop()
+
+
+@pytest.fixture(scope="session")
+def store_url(request):
+    """Entry URL for HPStorePage: the live store, or the local stand-in with HPSHOP_OFFLINE=1."""
+    if os.environ.get("HPSHOP_OFFLINE") == "1":
+        return request.getfixturevalue("stub_store").url
+    from Pages.hpstore import STORE_URL
+    return STORE_URL
+
+
+@pytest.fixture(scope="session", autouse=True)
+def screenshot_writer():
+    writer = get_writer()
+    yield writer
+    # Everything captured during the run must be on disk before allure reads it
+    writer.flush()
+    writer.store.enforce_retention()
+    if writer.written or writer.failed:
+        report.add_section("screenshots", writer.summary())
 
 
 @pytest.fixture(scope="function")
@@ -50,3 +298,5 @@ def pytest_runtest_makereport(item, call):
                 take_screenshot(driver_fixture, item.nodeid, "final_state", seq=999)
             except Exception:
                 pass
+        # Still inside the test as far as allure is concerned
+        attach_screenshots()
@@ -0,0 +1,129 @@
+"""asyncio access to one Chrome: many isolated tabs over a single CDP connection.
+
+Every Tab lives in its own browser context (Target.createBrowserContext), the
+headless equivalent of an incognito window: cookies, storage and cache are
+not shared between tabs, so each one has its own store session and cart.
+All tabs share one browser process and one websocket; commands are awaited
+on the event loop (CDPSession.send_async), so one thread drives them all.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from selinum.utils.cdp import CDPError, CDPSession
+
+
+class AsyncBrowser:
+    def __init__(self, cdp):
+        self.cdp = cdp
+        self._waiters = defaultdict(list)  # event method -> [(session_id, loop, future)]
+        self._lock = threading.Lock()
+        self.tabs = []
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Share the browser a selenium driver started."""
+        return cls(CDPSession.for_driver(driver, workers=2))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        return await self.cdp.send_async(method, params, session_id, timeout)
+
+    # -- events ------------------------------------------------------------
+    def expect(self, method, session_id=None):
+        """Future for the next `method` event of `session_id`; create it before triggering the event."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if method not in self._waiters:
+                self.cdp.on(method, lambda params, sid: self._dispatch(method, params, sid))
+            self._waiters[method].append((session_id, loop, future))
+        return future
+
+    def _dispatch(self, method, params, session_id):
+        with self._lock:
+            waiting = self._waiters[method]
+            matched = [w for w in waiting if w[0] in (None, session_id)]
+            self._waiters[method] = [w for w in waiting if w not in matched]
+        for _, loop, future in matched:
+            loop.call_soon_threadsafe(_resolve, future, params)
+
+    # -- tabs --------------------------------------------------------------
+    async def new_tab(self):
+        context = (await self.send("Target.createBrowserContext", {"disposeOnDetach": True}))["browserContextId"]
+        target = (await self.send("Target.createTarget", {"url": "about:blank", "browserContextId": context}))
+        session = (await self.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True}))
+        tab = Tab(self, context, target["targetId"], session["sessionId"])
+        await tab.send("Page.enable")
+        self.tabs.append(tab)
+        return tab
+
+    async def close(self):
+        for tab in list(self.tabs):
+            await tab.close()
+        self.cdp.close()
+
+
+def _resolve(future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+class Tab:
+    def __init__(self, browser, context_id, target_id, session_id):
+        self.browser = browser
+        self.context_id = context_id
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.browser.send(method, params, self.session_id, timeout)
+
+    def expect_load(self):
+        return self.browser.expect("Page.loadEventFired", self.session_id)
+
+    @staticmethod
+    async def wait(future, timeout, required=True):
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            if required:
+                raise
+            return None
+
+    async def navigate(self, url, timeout=30):
+        load = self.expect_load()
+        result = await self.send("Page.navigate", {"url": url}, timeout)
+        if result.get("errorText"):
+            raise CDPError(f"navigation to {url} failed: {result['errorText']}")
+        await self.wait(load, timeout)
+
+    async def evaluate(self, fn, *args, timeout=30):
+        """Call a JS function expression with JSON arguments; promises are awaited."""
+        result = await self.send("Runtime.evaluate", {
+            "expression": f"({fn}).apply(null, {json.dumps(list(args))})",
+            "returnByValue": True,
+            "awaitPromise": True,
+        }, timeout + 5)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text"))
+        return result["result"].get("value")
+
+    async def cookies(self):
+        result = await self.browser.send("Storage.getCookies", {"browserContextId": self.context_id})
+        return result["cookies"]
+
+    async def close(self):
+        if self in self.browser.tabs:
+            self.browser.tabs.remove(self)
+            try:
+                await self.browser.send("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+            except CDPError:
+                pass
@@ -0,0 +1,99 @@
+"""Batch-cart mode: many products per browser session.
+
+Instead of one full open -> consent -> search -> add -> cart flow per sheet
+row, CartBatch adds up to HPSHOP_BATCH_SIZE products to one cart in a single
+session and then checks all of them in one pass over the cart page
+(HPStorePage.verify_cart_products). The per-product tests read their own
+outcome from the cached result, so pass/fail is still reported per
+product. Results are kept per sheet row, so duplicate rows each get their
+own outcome. Turned on with HPSHOP_BATCH=1.
+
+Batch mode is off inside a parallel worker (selinum/utils/parallel.py):
+every worker is its own pytest session and would add the whole sheet again.
+Workers run the per-row test instead.
+"""
+import os
+import threading
+import time
+
+from selinum.utils import http_cart
+from selinum.utils.parallel import WORKER_ENV
+
+BATCH = os.environ.get("HPSHOP_BATCH") == "1" and WORKER_ENV not in os.environ
+BATCH_SIZE = int(os.environ.get("HPSHOP_BATCH_SIZE", "10"))
+
+
+def run_cart_batch(page, product_names):
+    """One session: add every product, open the cart once, check them all.
+
+    Returns one {"selected", "status", "detail"} per name, in order, with
+    status "matched", "missing" or "error" (the product could not be added)."""
+    page.open_site()
+    page.accept_cookies()
+    added = page.add_products_to_cart(product_names, over_http=http_cart.HYBRID)
+    selected = [r["selected"] for r in added if "selected" in r]
+    page.open_cart_page()
+    check = page.verify_cart_products(selected)
+    matched = list(check["matched"])
+
+    results = []
+    for outcome in added:
+        if "error" in outcome:
+            results.append({"selected": None, "status": "error", "detail": outcome["error"]})
+        elif outcome["selected"] in matched:
+            matched.remove(outcome["selected"])
+            results.append({"selected": outcome["selected"], "status": "matched", "detail": ""})
+        else:
+            results.append({"selected": outcome["selected"], "status": "missing",
+                            "detail": f"'{outcome['selected']}' not in cart {check['cart']}"})
+    return results
+
+
+class CartBatch:
+    def __init__(self, acquire, release, page_factory, size=BATCH_SIZE):
+        self.acquire = acquire
+        self.release = release
+        self.page_factory = page_factory
+        self.size = max(1, size)
+        self.results = None
+        self.sessions = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def result_for(self, row, all_products):
+        """Outcome for sheet row `row`; the first call runs the batches for the whole sheet."""
+        with self._lock:
+            if self.results is None:
+                self.run(all_products)
+        return self.results.get(row, {"selected": None, "status": "error",
+                                      "detail": "row was not part of the batch"})
+
+    def run(self, product_names):
+        """Results keyed by row index, so duplicate sheet rows keep separate outcomes."""
+        self.results = {}
+        start = time.perf_counter()
+        for i in range(0, len(product_names), self.size):
+            chunk = product_names[i:i + self.size]
+            driver = self.acquire()
+            self.sessions += 1
+            try:
+                for offset, result in enumerate(run_cart_batch(self.page_factory(driver), chunk)):
+                    self.results[i + offset] = result
+            except Exception as e:
+                for offset in range(len(chunk)):
+                    self.results.setdefault(i + offset, {"selected": None, "status": "error",
+                                                         "detail": f"batch failed: {e}"})
+            finally:
+                self.release(driver)
+        self.seconds = time.perf_counter() - start
+        return self.results
+
+    def summary(self):
+        if not self.results:
+            return []
+        counts = {}
+        for r in self.results.values():
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        return [f"{len(self.results)} products in {self.sessions} browser sessions "
+                f"(batch size {self.size}) in {self.seconds:.1f}s",
+                ", ".join(f"{status}: {n}" for status, n in sorted(counts.items()))]
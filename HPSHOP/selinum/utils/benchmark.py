@@ -0,0 +1,165 @@
+"""Helpers for the benchmark suite in benchmarks/.
+
+Latency samples are summarised into distributions (milliseconds), browser
+CPU and memory are read through CDP Performance.getMetrics, and results are
+compared with a baseline JSON: a step regresses when its p50 or p95 grows by
+more than THRESHOLD and by more than the noise floor.
+"""
+import os
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from selinum.utils import locator_cache, product_index, session_state, timeouts
+from selinum.utils.state import STATE_DIR, load_json, save_json
+from selinum.utils.tracing import percentile
+
+BASELINE_FILE = Path(os.environ.get("HPSHOP_BENCH_BASELINE", STATE_DIR / "benchmark-baseline.json"))
+THRESHOLD = float(os.environ.get("HPSHOP_BENCH_THRESHOLD", "0.20"))
+NOISE_MS = float(os.environ.get("HPSHOP_BENCH_NOISE_MS", "20"))
+GATED = ("p50", "p95")
+
+
+def isolate_state():
+    """Switch off everything the page object learns and keeps across runs.
+
+    Consent snapshots, the product index, learned timeouts and locator
+    rankings would otherwise make every run a little different from the
+    last, and the numbers would drift without any code change."""
+    session_state.ENABLED = False
+    product_index.ENABLED = False
+    timeouts.ENABLED = False
+    os.environ["HPSHOP_LOCATOR_CACHE"] = "0"
+    locator_cache._cache = None
+
+
+def summarize(seconds):
+    ms = [s * 1000 for s in seconds]
+    return {
+        "n": len(ms),
+        "mean": statistics.mean(ms),
+        "stdev": statistics.stdev(ms) if len(ms) > 1 else 0.0,
+        "min": min(ms),
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "max": max(ms),
+    }
+
+
+def browser_metrics(driver):
+    """Renderer CPU seconds and JS heap in MB so far, or {} without CDP."""
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+    except Exception:
+        return {}
+    return {"cpu_s": metrics.get("TaskDuration", 0.0), "heap_mb": metrics.get("JSHeapUsedSize", 0.0) / 2 ** 20}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.resources = defaultdict(list)
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        yield
+        self.samples[name].append(time.perf_counter() - start)
+
+    def add_resources(self, name, before, after):
+        if before and after:
+            self.resources[name].append({"cpu_s": after["cpu_s"] - before["cpu_s"], "heap_mb": after["heap_mb"]})
+
+    def results(self):
+        results = {name: summarize(samples) for name, samples in self.samples.items()}
+        for name, readings in self.resources.items():
+            results.setdefault(name, {}).update(
+                cpu_ms=statistics.mean(r["cpu_s"] for r in readings) * 1000,
+                heap_mb=max(r["heap_mb"] for r in readings),
+            )
+        return results
+
+
+def load_baseline(path=BASELINE_FILE):
+    return load_json(path, {})
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    save_json(path, results)
+
+
+def regressions(results, baseline, threshold=THRESHOLD, noise_ms=NOISE_MS):
+    """Lines describing every step that got slower than the baseline allows."""
+    found = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in GATED:
+            if metric not in stats or metric not in base:
+                continue
+            old, new = base[metric], stats[metric]
+            if new > old * (1 + threshold) and new - old > noise_ms:
+                found.append(f"{name} {metric}: {old:.0f} -> {new:.0f} ms (+{(new / old - 1) * 100 if old else 0:.0f}%)")
+    return found
+
+
+def format_results(results, baseline=None):
+    baseline = baseline or {}
+    lines = []
+    for name, s in results.items():
+        line = (f"{name:34s} n={s.get('n', 0):3d} p50 {s.get('p50', 0):7.1f} p95 {s.get('p95', 0):7.1f} "
+                f"p99 {s.get('p99', 0):7.1f} ms")
+        if "cpu_ms" in s:
+            line += f" | cpu {s['cpu_ms']:6.1f} ms, heap {s['heap_mb']:5.1f} MB"
+        if name in baseline and "p50" in baseline[name]:
+            line += f" | baseline p50 {baseline[name]['p50']:.1f} ms"
+        lines.append(line)
+    return lines
+
+
+def _children():
+    parents = defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # the command name may contain spaces; ppid follows the closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        parents[ppid].append(int(entry))
+    return parents
+
+
+def _memory_kb(pid):
+    # PSS splits shared pages between Chrome's processes instead of counting them in each
+    for name, key in (("smaps_rollup", "Pss:"), ("status", "VmRSS:")):
+        try:
+            with open(f"/proc/{pid}/{name}") as f:
+                for line in f:
+                    if line.startswith(key):
+                        return int(line.split()[1])
+        except OSError:
+            continue
+    return 0
+
+
+def process_tree_mb(*pids):
+    """Memory of the given processes and all their descendants, in MB (Linux /proc only)."""
+    if not os.path.isdir("/proc"):
+        return 0.0
+    children = _children()
+    seen, todo = set(), list(pids)
+    while todo:
+        pid = todo.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        todo.extend(children.get(pid, ()))
+    return sum(_memory_kb(pid) for pid in seen) / 1024
@@ -0,0 +1,121 @@
+import os
+import time
+
+from selinum.utils.driver_factory import create_driver, HIDE_WEBDRIVER_JS
+
+POOL_ENABLED = os.environ.get("HPSHOP_BROWSER_POOL", "1") != "0"
+POOL_SIZE = int(os.environ.get("HPSHOP_BROWSER_POOL_SIZE", "1"))
+# Off by default: a plain driver does not hide navigator.webdriver either
+HIDE_WEBDRIVER = os.environ.get("HPSHOP_HIDE_WEBDRIVER") == "1"
+# Everything an origin keeps between tests except the HTTP cache, which is what
+# makes a reused browser warm. Cookies are cleared for all origins at once.
+RESET_STORAGE_TYPES = "local_storage,indexeddb,websql,file_systems,cache_storage,service_workers"
+
+
+class BrowserPool:
+    """Keeps warm browsers alive across tests.
+
+    acquire() hands out a healthy browser (starting one only when none is
+    idle), release() wipes its state and parks it for the next test."""
+
+    def __init__(self, factory=create_driver, size=POOL_SIZE, init_scripts=None):
+        self.factory = factory
+        self.size = size
+        if init_scripts is None:
+            init_scripts = [HIDE_WEBDRIVER_JS] if HIDE_WEBDRIVER else []
+        self.init_scripts = list(init_scripts)
+        self.idle = []
+        self.cold_starts = 0
+        self.startup_seconds = 0.0
+        self.reuses = 0
+        self.recycled = 0
+        self.reset_seconds = 0.0
+
+    def _start(self):
+        start = time.perf_counter()
+        drv = self.factory()
+        self.startup_seconds += time.perf_counter() - start
+        self.cold_starts += 1
+        self._apply_init_scripts(drv)
+        return drv
+
+    def _apply_init_scripts(self, drv):
+        for source in self.init_scripts:
+            drv.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+
+    @staticmethod
+    def _quit(drv):
+        try:
+            drv.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def is_healthy(drv):
+        try:
+            return drv.execute_script("return 1") == 1 and len(drv.window_handles) > 0
+        except Exception:
+            return False
+
+    def acquire(self):
+        while self.idle:
+            drv = self.idle.pop()
+            if self.is_healthy(drv):
+                self.reuses += 1
+                return drv
+            self.recycled += 1
+            self._quit(drv)
+        return self._start()
+
+    def reset(self, drv):
+        """Bring a used browser back to a blank state, keeping its HTTP cache.
+
+        Work happens in a fresh tab so sessionStorage and per-tab CDP
+        scripts from the previous test go away with the old tabs."""
+        origins = set()
+        for handle in list(drv.window_handles):
+            drv.switch_to.window(handle)
+            origin = drv.execute_script("return window.location.origin")
+            if origin and origin.startswith("http"):
+                origins.add(origin)
+        old_handles = list(drv.window_handles)
+        drv.switch_to.new_window("tab")
+        fresh = drv.current_window_handle
+        for handle in old_handles:
+            drv.switch_to.window(handle)
+            drv.close()
+        drv.switch_to.window(fresh)
+
+        drv.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in origins:
+            drv.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": RESET_STORAGE_TYPES})
+        self._apply_init_scripts(drv)
+
+    def release(self, drv):
+        start = time.perf_counter()
+        try:
+            self.reset(drv)
+        except Exception:
+            # Anything that fails to reset cleanly is not worth reusing
+            self.recycled += 1
+            self._quit(drv)
+            return
+        finally:
+            self.reset_seconds += time.perf_counter() - start
+        if len(self.idle) < self.size:
+            self.idle.append(drv)
+        else:
+            self._quit(drv)
+
+    def close(self):
+        while self.idle:
+            self._quit(self.idle.pop())
+
+    def summary(self):
+        avg = self.startup_seconds / self.cold_starts if self.cold_starts else 0.0
+        saved = self.reuses * avg - self.reset_seconds
+        return [
+            f"cold starts: {self.cold_starts} ({self.startup_seconds:.1f}s, {avg:.2f}s each)",
+            f"reused: {self.reuses}, recycled: {self.recycled}, reset time: {self.reset_seconds:.1f}s",
+            f"startup seconds saved: {saved:.1f}s",
+        ]
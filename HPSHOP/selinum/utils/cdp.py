@@ -0,0 +1,175 @@
+"""Minimal Chrome DevTools Protocol client.
+
+`driver.execute_cdp_cmd` can send commands but never sees events, which rules
+out request interception (Fetch.requestPaused) and anything else that reacts
+to the page. CDPSession opens its own websocket to the browser chromedriver
+started and dispatches events to callbacks on a small thread pool.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import websocket
+
+
+class CDPError(Exception):
+    pass
+
+
+class _FutureEvent:
+    """Stands in for threading.Event on a pending command awaited from asyncio."""
+
+    def __init__(self, loop, future):
+        self.loop = loop
+        self.future = future
+
+    def set(self):
+        self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class CDPSession:
+    def __init__(self, ws_url, workers=4):
+        self._ws = websocket.create_connection(ws_url, suppress_origin=True, enable_multithread=True)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._handlers = defaultdict(list)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @staticmethod
+    def debugger_address(driver):
+        return driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+
+    @classmethod
+    def for_driver(cls, driver, **kwargs):
+        """Browser-level session on the Chrome instance behind a selenium driver."""
+        address = cls.debugger_address(driver)
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as resp:
+            ws_url = json.load(resp)["webSocketDebuggerUrl"]
+        return cls(ws_url, **kwargs)
+
+    # -- commands ----------------------------------------------------------
+    def _post(self, method, params, session_id, event):
+        msg_id = next(self._ids)
+        slot = {"event": event}
+        with self._lock:
+            self._pending[msg_id] = slot
+        message = {"id": msg_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        self._ws.send(json.dumps(message))
+        return msg_id, slot
+
+    def _result(self, method, slot):
+        if "error" in slot:
+            raise CDPError(f"{method}: {slot['error'].get('message')}")
+        return slot["result"]
+
+    def send(self, method, params=None, session_id=None, timeout=30):
+        done = threading.Event()
+        msg_id, slot = self._post(method, params, session_id, done)
+        if not done.wait(timeout):
+            with self._lock:
+                self._pending.pop(msg_id, None)
+            raise CDPError(f"{method} timed out after {timeout}s")
+        return self._result(method, slot)
+
+    async def send_async(self, method, params=None, session_id=None, timeout=30):
+        """send() for asyncio code: the reply resolves a future instead of blocking a thread."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        msg_id, slot = self._post(method, params, session_id, _FutureEvent(loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._pending.pop(msg_id, None)
+            raise CDPError(f"{method} timed out after {timeout}s")
+        return self._result(method, slot)
+
+    def on(self, method, callback):
+        """Call callback(params, session_id) for every `method` event."""
+        self._handlers[method].append(callback)
+
+    def _read_loop(self):
+        while not self._closed:
+            try:
+                message = json.loads(self._ws.recv())
+            except Exception:
+                break
+            if "id" in message:
+                with self._lock:
+                    slot = self._pending.pop(message["id"], None)
+                if slot is not None:
+                    if "error" in message:
+                        slot["error"] = message["error"]
+                    slot["result"] = message.get("result", {})
+                    slot["event"].set()
+                continue
+            for callback in self._handlers.get(message.get("method"), ()):
+                self._executor.submit(self._safe_call, callback, message.get("params", {}), message.get("sessionId"))
+        # Wake up anyone still waiting for an answer
+        with self._lock:
+            for slot in self._pending.values():
+                slot["error"] = {"message": "connection closed"}
+                slot["event"].set()
+            self._pending.clear()
+
+    @staticmethod
+    def _safe_call(callback, params, session_id):
+        try:
+            callback(params, session_id)
+        except Exception:
+            pass
+
+    # -- targets -----------------------------------------------------------
+    def attach_all_pages(self, on_attach):
+        """Run on_attach(session_id, target_info) once for every open page and every page opened later.
+
+        New targets are held until on_attach has run, so nothing the page
+        loads can slip past (e.g. before Fetch.enable)."""
+        attached = {}
+
+        def on_attached(params, _session):
+            session_id = params["sessionId"]
+            target = params["targetInfo"]
+            try:
+                if target["type"] != "page":
+                    return
+                with self._lock:
+                    duplicate = target["targetId"] in attached
+                    attached.setdefault(target["targetId"], session_id)
+                if duplicate:
+                    # Auto-attach and the explicit attach below raced for this page
+                    self.send("Target.detachFromTarget", {"sessionId": session_id})
+                    return
+                on_attach(session_id, target)
+            finally:
+                if params.get("waitingForDebugger"):
+                    self.send("Runtime.runIfWaitingForDebugger", session_id=session_id)
+
+        self.on("Target.attachedToTarget", on_attached)
+        self.send("Target.setAutoAttach", {"autoAttach": True, "waitForDebuggerOnStart": True, "flatten": True})
+        for target in self.send("Target.getTargets")["targetInfos"]:
+            if target["type"] == "page" and target["targetId"] not in attached:
+                self.send("Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})
+        return attached
+
+    def close(self):
+        self._closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+        self._executor.shutdown(wait=False)
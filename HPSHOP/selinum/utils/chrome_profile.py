@@ -0,0 +1,158 @@
+"""Fast browser startup: a pre-warmed profile template plus lean startup flags.
+
+With HPSHOP_FAST_STARTUP=1 the first browser of the session builds a profile
+template: one headless launch that gets through Chrome's first-run setup
+(and optionally loads HPSHOP_PROFILE_WARMUP_URL to warm the HTTP, font and
+shader caches). Every browser after that starts from a copy of the template.
+The copy uses reflinks (copy-on-write) where the filesystem supports them
+and a plain copy otherwise. STARTUP_FLAGS switch off background work a test
+browser does not need.
+
+Launch and first-navigation times are recorded for every browser and kept
+in .hpshop/startup-history.json so cold-start cost can be followed across
+runs.
+"""
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from selinum.utils import commands
+from selinum.utils.state import STATE_DIR, load_json, save_json
+from selinum.utils.tracing import percentile
+
+FAST_STARTUP = os.environ.get("HPSHOP_FAST_STARTUP") == "1"
+WARMUP_URL = os.environ.get("HPSHOP_PROFILE_WARMUP_URL")
+HISTORY_FILE = STATE_DIR / "startup-history.json"
+HISTORY_SIZE = 20
+
+STARTUP_FLAGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--password-store=basic",
+    "--use-mock-keychain",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,InterestFeedContentSuggestions",
+]
+
+# Per-process files that must not be carried from the template into a copy
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile")
+
+startup_stats = []  # {"launch": s, "first_nav": s or None, "fast": bool}
+_template = None
+_template_seconds = 0.0
+_lock = threading.Lock()
+
+
+def clone_tree(src, dst):
+    """Copy a directory tree, sharing blocks copy-on-write when the filesystem can."""
+    src, dst = str(src), str(dst)
+    flags = ["-c", "-R"] if sys.platform == "darwin" else ["-a", "--reflink=auto"]
+    try:
+        subprocess.run(["cp", *flags, src + "/.", dst], check=True, capture_output=True)
+        return
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True, ignore=shutil.ignore_patterns(*LOCK_FILES))
+
+
+def _strip_locks(profile_dir):
+    for name in LOCK_FILES:
+        path = Path(profile_dir) / name
+        if path.is_symlink() or path.exists():
+            path.unlink()
+
+
+def template_dir(launch):
+    """Build the session's profile template once; `launch(options)` starts a browser."""
+    global _template, _template_seconds
+    with _lock:
+        if _template is None:
+            start = time.perf_counter()
+            path = Path(tempfile.mkdtemp(prefix="hpshop-profile-template-"))
+            atexit.register(shutil.rmtree, path, True)
+            drv = launch(str(path))
+            try:
+                drv.get(WARMUP_URL or "about:blank")
+            finally:
+                drv.quit()
+            _strip_locks(path)
+            _template = path
+            _template_seconds = time.perf_counter() - start
+        return _template
+
+
+def new_profile_dir(launch):
+    """A private copy of the template for one browser."""
+    template = template_dir(launch)
+    path = Path(tempfile.mkdtemp(prefix="hpshop-profile-"))
+    clone_tree(template, path)
+    _strip_locks(path)
+    return path
+
+
+def apply(options, profile_dir):
+    for flag in STARTUP_FLAGS:
+        options.add_argument(flag)
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    return options
+
+
+def track(driver, launch_seconds, profile_dir=None):
+    """Record launch time now and first-navigation time on the driver's first get()."""
+    entry = {"launch": launch_seconds, "first_nav": None, "fast": profile_dir is not None}
+    startup_stats.append(entry)
+
+    def first_get(command, params, seconds):
+        if command == "get":
+            entry["first_nav"] = seconds
+            commands.remove_listener(driver, first_get)
+
+    commands.add_listener(driver, first_get)
+    if profile_dir is not None:
+        quit = driver.quit
+
+        def quit_and_clean():
+            try:
+                quit()
+            finally:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+
+        driver.quit = quit_and_clean
+    return driver
+
+
+def summary():
+    if not startup_stats:
+        return []
+    launches = [s["launch"] for s in startup_stats]
+    navs = [s["first_nav"] for s in startup_stats if s["first_nav"] is not None]
+    mode = "fast (profile template)" if FAST_STARTUP else "default"
+    current = {"ts": time.time(), "mode": mode, "browsers": len(launches),
+               "launch_p50": percentile(launches, 50), "first_nav_p50": percentile(navs, 50) if navs else None}
+    lines = [f"mode: {mode}, browsers: {len(launches)}",
+             f"launch p50 {current['launch_p50'] * 1000:.0f} ms, max {max(launches) * 1000:.0f} ms"]
+    if navs:
+        lines.append(f"first navigation p50 {current['first_nav_p50'] * 1000:.0f} ms")
+    if _template is not None:
+        lines.append(f"profile template built in {_template_seconds:.2f}s")
+    history = load_json(HISTORY_FILE, [])
+    previous = [h for h in history if h["mode"] != mode]
+    if previous:
+        other = previous[-1]
+        lines.append(f"last {other['mode']} run: launch p50 {other['launch_p50'] * 1000:.0f} ms")
+    save_json(HISTORY_FILE, (history + [current])[-HISTORY_SIZE:])
+    return lines
@@ -0,0 +1,107 @@
+"""Counts and times every WebDriver command per test and per page-object step.
+
+Each command is attributed to the outermost traced step that is running
+(see tracing.py), e.g. "HPStorePage.get_products". Step names come from the
+thread's active Tracer, so with HPSHOP_TRACE=0 the command_profile fixture
+activates a Tracer of its own that only tracks the step stack (it writes no
+trace file). Two chatty patterns are flagged:
+
+- N+1: the same element command (getElementText, clickElement, ...) issued
+  on many different elements within one step, e.g. one call per product tile;
+- redundant lookups: the same locator looked up again and again in one step.
+
+HPSHOP_COMMAND_PROFILE=0 turns it off.
+"""
+import os
+import threading
+from collections import Counter, defaultdict
+
+from selinum.utils import tracing
+
+PROFILE_ENABLED = os.environ.get("HPSHOP_COMMAND_PROFILE", "1") != "0"
+N_PLUS_ONE_MIN = int(os.environ.get("HPSHOP_N_PLUS_ONE_MIN", "5"))
+REDUNDANT_MIN = int(os.environ.get("HPSHOP_REDUNDANT_LOOKUP_MIN", "3"))
+
+LOOKUP_COMMANDS = ("findElement", "findElements", "findChildElement", "findChildElements")
+NO_STEP = "(test body)"
+
+_tests = []
+_lock = threading.Lock()
+
+
+class CommandProfile:
+    def __init__(self, name):
+        self.name = name
+        self.tid = threading.get_ident()
+        self.count = 0
+        self.seconds = 0.0
+        self.by_command = Counter()
+        self.time_by_command = defaultdict(float)
+        self.by_step = Counter()
+        self._elements = defaultdict(set)  # (step, command) -> element ids
+        self._lookups = Counter()  # (step, using, value) -> count
+
+    def on_command(self, command, params, seconds):
+        if threading.get_ident() != self.tid:
+            return
+        params = params or {}
+        step = tracing.current_step(NO_STEP)
+        self.count += 1
+        self.seconds += seconds
+        self.by_command[command] += 1
+        self.time_by_command[command] += seconds
+        self.by_step[step] += 1
+        if command in LOOKUP_COMMANDS and "using" in params:
+            self._lookups[(step, params["using"], params.get("value"))] += 1
+        element_id = params.get("id")
+        if element_id:
+            self._elements[(step, command)].add(element_id)
+
+    def findings(self):
+        """(kind, step, detail, count) for every flagged pattern."""
+        found = []
+        for (step, command), ids in self._elements.items():
+            if len(ids) >= N_PLUS_ONE_MIN:
+                found.append(("N+1", step, f"{command} on {len(ids)} different elements", len(ids)))
+        for (step, using, value), n in self._lookups.items():
+            if n >= REDUNDANT_MIN:
+                found.append(("redundant lookup", step, f"{using} '{value}' looked up {n} times", n))
+        return found
+
+    def summary(self):
+        return f"{self.name}: {self.count} commands, {self.seconds:.2f}s in round trips"
+
+
+def finish(profile):
+    if profile.count:
+        with _lock:
+            _tests.append(profile)
+
+
+def session_summary(top=10):
+    if not _tests:
+        return []
+    steps = Counter()
+    commands = Counter()
+    command_time = defaultdict(float)
+    findings = []
+    for profile in _tests:
+        steps.update(profile.by_step)
+        commands.update(profile.by_command)
+        for command, seconds in profile.time_by_command.items():
+            command_time[command] += seconds
+        findings.extend((profile.name,) + f for f in profile.findings())
+
+    total = sum(p.count for p in _tests)
+    lines = [f"{total} commands in {len(_tests)} tests, "
+             f"{sum(p.seconds for p in _tests):.2f}s in round trips"]
+    lines.append("busiest steps:")
+    lines += [f"  {step}: {n} commands" for step, n in steps.most_common(top)]
+    lines.append("busiest commands:")
+    lines += [f"  {command}: {n} calls, {command_time[command] * 1000 / n:.1f} ms avg"
+              for command, n in commands.most_common(top)]
+    if findings:
+        lines.append("chatty patterns:")
+        findings.sort(key=lambda f: f[4], reverse=True)
+        lines += [f"  [{kind}] {step} in {test}: {detail}" for test, kind, step, detail, _ in findings[:top]]
+    return lines
@@ -0,0 +1,36 @@
+"""Listeners on every WebDriver command a driver sends.
+
+Selenium funnels all commands (including WebElement ones) through
+driver.execute, so one wrapper per driver instance sees them all. Pooled
+drivers outlive a test, hence listeners are added and removed per test.
+"""
+import time
+
+
+def add_listener(driver, listener):
+    """Call listener(command, params, seconds) after every command `driver` sends."""
+    listeners = driver.__dict__.get("_hpshop_command_listeners")
+    if listeners is None:
+        listeners = driver._hpshop_command_listeners = []
+        execute = driver.execute
+
+        def timed_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                seconds = time.perf_counter() - start
+                for fn in list(listeners):
+                    try:
+                        fn(driver_command, params, seconds)
+                    except Exception:
+                        pass
+
+        driver.execute = timed_execute
+    listeners.append(listener)
+
+
+def remove_listener(driver, listener):
+    listeners = driver.__dict__.get("_hpshop_command_listeners") or []
+    if listener in listeners:
+        listeners.remove(listener)
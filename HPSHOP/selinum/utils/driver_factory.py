@@ -0,0 +1,46 @@
+import shutil
+import time
+
+from selenium import webdriver
+
+from selinum.utils import chrome_profile
+from selinum.utils.resource_policy import PROFILE, ResourcePolicy
+
+# Remove navigator.webdriver=true
+HIDE_WEBDRIVER_JS = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+"""
+
+
+def chrome_options():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+
+    # ⭐ REQUIRED FOR GITHUB ACTIONS (DO NOT REMOVE)
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    if PROFILE:
+        options.add_experimental_option("prefs", ResourcePolicy.from_profile(PROFILE).chrome_prefs())
+    return options
+
+
+def _launch_template_browser(profile_dir):
+    return webdriver.Chrome(options=chrome_profile.apply(chrome_options(), profile_dir))
+
+
+def create_driver(options=None):
+    # HPSHOP_FAST_STARTUP=1 starts from a copy of a pre-warmed profile (see chrome_profile.py)
+    profile_dir = None
+    if chrome_profile.FAST_STARTUP and options is None:
+        profile_dir = chrome_profile.new_profile_dir(_launch_template_browser)
+        options = chrome_profile.apply(chrome_options(), profile_dir)
+    start = time.perf_counter()
+    try:
+        drv = webdriver.Chrome(options=options or chrome_options())
+    except Exception:
+        if profile_dir is not None:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    return chrome_profile.track(drv, time.perf_counter() - start, profile_dir)
@@ -0,0 +1,109 @@
+"""Structured, bounded event log for page objects.
+
+Every event is a record {ts, level, step, message, ...}. Only the last
+BUFFER_SIZE records stay in memory; all of them are appended to a JSONL file
+per test as they happen, so a long session keeps flat memory and a crashed
+run still leaves its log behind. render() builds the readable summary from
+that file. HPSHOP_LOG_BUFFER sets the buffer size.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from selinum.utils import tracing
+from selinum.utils.state import STATE_DIR
+
+LOG_DIR = STATE_DIR / "logs"
+BUFFER_SIZE = int(os.environ.get("HPSHOP_LOG_BUFFER", "200"))
+LEVELS = ("debug", "info", "warning", "error")
+
+_local = threading.local()
+
+
+class EventLog:
+    def __init__(self, path=None, maxlen=BUFFER_SIZE):
+        self.records = deque(maxlen=maxlen)
+        self.path = path
+        self.count = 0
+        self._file = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+
+    def log(self, message, level="info", step=None, **fields):
+        record = {"ts": time.time(), "level": level, "step": step or tracing.current_step(),
+                  "message": str(message)}
+        record.update(fields)
+        self.records.append(record)
+        self.count += 1
+        if self._file is not None:
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+        return record
+
+    def debug(self, message, **fields):
+        return self.log(message, "debug", **fields)
+
+    def info(self, message, **fields):
+        return self.log(message, "info", **fields)
+
+    def warning(self, message, **fields):
+        return self.log(message, "warning", **fields)
+
+    def error(self, message, **fields):
+        return self.log(message, "error", **fields)
+
+    def messages(self):
+        return [r["message"] for r in self.records]
+
+    def __iter__(self):
+        return iter(list(self.records))
+
+    def __len__(self):
+        return len(self.records)
+
+    def iter_all(self):
+        """Every record of the log: from the sink when there is one, else the buffer."""
+        if self.path is None or not self.path.exists():
+            yield from self.records
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def render(self, min_level="debug"):
+        floor = LEVELS.index(min_level)
+        lines = []
+        for r in self.iter_all():
+            if LEVELS.index(r.get("level", "info")) < floor:
+                continue
+            stamp = time.strftime("%H:%M:%S", time.localtime(r["ts"])) + f".{int(r['ts'] * 1000) % 1000:03d}"
+            step = f" {r['step']}:" if r.get("step") else ""
+            lines.append(f"{stamp} [{r['level'].upper()}]{step} {r['message']}")
+        return "\n".join(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def start_test_log(nodeid):
+    """Open the JSONL sink for a test; page objects created on this thread log into it."""
+    name = nodeid.replace("/", "_").replace("::", "_").replace(" ", "_")
+    _local.log = EventLog(LOG_DIR / f"{name}.jsonl")
+    return _local.log
+
+
+def end_test_log(log):
+    log.close()
+    if getattr(_local, "log", None) is log:
+        _local.log = None
+
+
+def for_test():
+    """The running test's log, or an in-memory one outside a test."""
+    return getattr(_local, "log", None) or EventLog()
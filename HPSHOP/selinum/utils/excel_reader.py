@@ -1,17 +1,151 @@
-import openpyxl
+import datetime
+import hashlib
+import json
+import os
+import time
 from pathlib import Path
 
+import openpyxl
+
+# One entry per load: which file, whether the sidecar cache answered, and timings
+load_stats = []
+
+
+def _sidecar(file_path):
+    file_path = Path(file_path)
+    return file_path.with_name(file_path.name + ".cache.json")
+
+
+def _file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_rows(file_path, sheet_name='Sheet1', min_row=1):
+    """Stream rows as tuples of cell values without loading the whole workbook."""
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from wb[sheet_name].iter_rows(min_row=min_row, values_only=True)
+    finally:
+        wb.close()
+
+
+def _parse_columns(file_path, sheet_name, cols, header):
+    start = 2 if header else 1
+    rows = []
+    for row in iter_rows(file_path, sheet_name, start):
+        vals = [row[c - 1] if c - 1 < len(row) else None for c in cols]
+        if all(v is None for v in vals):
+            continue
+        rows.append([None if v is None else str(v).strip() for v in vals])
+    return rows
+
+
+def _jsonable(value):
+    # Dates would not survive the JSON sidecar otherwise
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def _parse_records(file_path, sheet_name):
+    rows = iter_rows(file_path, sheet_name)
+    names = [str(h).strip() if h is not None else f"col{i + 1}" for i, h in enumerate(next(rows, ()))]
+    records = []
+    for row in rows:
+        if all(v is None for v in row):
+            continue
+        records.append({n: _jsonable(v) for n, v in zip(names, row)})
+    return records
+
+
+def cached_load(file_path, key, parse):
+    """Return parse() for `file_path`, memoised in a sidecar JSON file.
+
+    The cache is valid while the file's mtime and size are unchanged; if they
+    changed, the content hash decides (a touch or a checkout alone does not
+    invalidate it). The result has to be JSON-serialisable."""
+    file_path = Path(file_path)
+    sidecar = _sidecar(file_path)
+    start = time.perf_counter()
+    st = file_path.stat()
+    try:
+        with open(sidecar, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    fresh = cache.get("mtime_ns") == st.st_mtime_ns and cache.get("size") == st.st_size
+    if not fresh and cache.get("sha256"):
+        fresh = cache["sha256"] == _file_hash(file_path)
+        if fresh:
+            cache.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+            _write_sidecar(sidecar, cache)
+    if not fresh:
+        cache = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": _file_hash(file_path), "entries": {}}
+
+    entry = cache["entries"].get(key)
+    if entry is not None:
+        load_stats.append({"file": file_path.name, "key": key, "cached": True,
+                           "seconds": time.perf_counter() - start, "parse_seconds": entry["parse_seconds"]})
+        return entry["value"]
+
+    parse_start = time.perf_counter()
+    value = parse()
+    parse_seconds = time.perf_counter() - parse_start
+    cache["entries"][key] = {"value": value, "parse_seconds": parse_seconds}
+    _write_sidecar(sidecar, cache)
+    load_stats.append({"file": file_path.name, "key": key, "cached": False,
+                       "seconds": time.perf_counter() - start, "parse_seconds": parse_seconds})
+    return value
+
+
+def _write_sidecar(sidecar, cache):
+    try:
+        tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp, sidecar)
+    except OSError:
+        pass  # read-only checkout: just parse every time
+
+
 def read_column(file_path, sheet_name='Sheet1', col=1, header=False):
     """Read a column from Excel and return list of values.
     file_path can be Path or str.
     If header=True, skip the first row."""
-    wb = openpyxl.load_workbook(file_path, data_only=True)
-    sheet = wb[sheet_name]
-    start = 2 if header else 1
-    vals = []
-    for row in sheet.iter_rows(min_row=start, values_only=True):
-        v = row[col-1]
-        if v is None:
-            continue
-        vals.append(str(v).strip())
-    return vals
\ No newline at end of file
+    rows = read_columns(file_path, sheet_name, (col,), header)
+    return [r[0] for r in rows]
+
+
+def read_columns(file_path, sheet_name='Sheet1', cols=(1,), header=False):
+    """Read several columns at once; returns one list of strings (or None) per row."""
+    key = f"columns:{sheet_name}:{','.join(map(str, cols))}:{int(header)}"
+    return cached_load(file_path, key, lambda: _parse_columns(file_path, sheet_name, cols, header))
+
+
+def read_records(file_path, sheet_name='Sheet1', types=None):
+    """Read a sheet as dicts keyed by its header row.
+
+    types maps a column name to a converter, e.g. {"quantity": int}; it is
+    applied after the cache so converters do not have to be serialisable."""
+    records = cached_load(file_path, f"records:{sheet_name}", lambda: _parse_records(file_path, sheet_name))
+    for name, convert in (types or {}).items():
+        for record in records:
+            if record.get(name) is not None:
+                record[name] = convert(record[name])
+    return records
+
+
+def describe_load_stats():
+    lines = []
+    for s in load_stats:
+        if s["cached"]:
+            lines.append(f"{s['file']} ({s['key']}): sidecar cache {s['seconds'] * 1000:.1f} ms "
+                         f"instead of {s['parse_seconds'] * 1000:.1f} ms parse")
+        else:
+            lines.append(f"{s['file']} ({s['key']}): parsed in {s['parse_seconds'] * 1000:.1f} ms, cache written")
+    return lines
@@ -0,0 +1,178 @@
+"""The cart flow as resumable steps.
+
+CartFlow runs open_site -> accept_cookies -> open_product -> add_to_cart ->
+open_cart -> verify_cart on an HPStorePage. After every step that succeeds
+it takes a checkpoint: the URL, the cookies (which carry the cart session),
+the products put in the cart so far and the selected product name.
+
+When a step fails, the browser is put back on the last good checkpoint and
+only that step runs again, up to HPSHOP_STEP_RETRIES times per step.
+Nothing from open_site onwards is repeated. Retries are made idempotent:
+
+* add_to_cart first asks the cart (over HTTP) whether the earlier click
+  landed after all.
+* open_cart goes straight to the cart URL, because the popup with the
+  "view cart" button is gone once the page is reloaded.
+
+The report shows how long the skipped steps took, which is the time saved
+compared with rerunning the whole test. HPSHOP_STEP_RETRIES=0 (the default)
+keeps the plain single-pass test.
+"""
+import os
+import threading
+import time
+
+from selinum.utils.http_cart import HttpCart
+
+RETRIES = int(os.environ.get("HPSHOP_STEP_RETRIES", "0"))
+ENABLED = RETRIES > 0
+
+# Keys of a get_cookies() entry that add_cookie() takes back
+COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+stats = {"flows": 0, "retries": 0, "skipped": 0, "saved_seconds": 0.0, "failed_steps": {}}
+_lock = threading.Lock()
+
+
+class Step:
+    def __init__(self, name, run, retry=None, done=None):
+        self.name = name
+        self.run = run
+        # What a repeat attempt does instead of run, when the first way cannot work twice
+        self.retry = retry or run
+        # Returns True when a failed attempt had its effect anyway
+        self.done = done
+
+
+class CartFlow:
+    def __init__(self, page, product_name, retries=RETRIES, on_step=None):
+        self.page = page
+        self.driver = page.driver
+        self.product_name = product_name
+        self.retries = retries
+        self.on_step = on_step
+        self.state = {"product": None, "cart": []}
+        self.checkpoints = []
+        self.attempts = {}
+        self.step_seconds = {}
+        self.saved_seconds = 0.0
+        self.steps = [
+            Step("open_site", page.open_site),
+            Step("accept_cookies", page.accept_cookies),
+            Step("open_product", self._open_product),
+            Step("add_to_cart", self._add_to_cart, done=self._added),
+            Step("open_cart", page.open_cart, retry=page.open_cart_page),
+            Step("verify_cart", self._verify_cart),
+        ]
+
+    def _open_product(self):
+        self.state["product"] = self.page.open_product(self.product_name)
+
+    def _add_to_cart(self):
+        self.page.add_to_cart()
+        # The add request has to land before the checkpoint reads the cookies
+        self.page.wait_for_network_idle()
+        self.state["cart"].append(self.state["product"])
+
+    def _added(self):
+        try:
+            items = HttpCart.from_driver(self.driver).cart_items()
+        except Exception:
+            return False
+        if items.count(self.state["product"]) > self.state["cart"].count(self.state["product"]):
+            self.state["cart"].append(self.state["product"])
+            return True
+        return False
+
+    def _verify_cart(self):
+        self.page.verify_cart_product(self.state["product"])
+
+    def checkpoint(self, step):
+        return {
+            "step": step,
+            "url": self.driver.current_url,
+            "cookies": self.driver.get_cookies(),
+            "cart": list(self.state["cart"]),
+            "product": self.state["product"],
+        }
+
+    def restore(self, checkpoint):
+        """Put the browser back where checkpoint was taken; None means there is nothing to go back to."""
+        if checkpoint is None:
+            return
+        self.driver.get(checkpoint["url"])
+        present = {(c["name"], c["value"]) for c in self.driver.get_cookies()}
+        lost = [c for c in checkpoint["cookies"] if (c["name"], c["value"]) not in present]
+        for cookie in lost:
+            self.driver.add_cookie(restorable(cookie))
+        if lost:
+            self.driver.refresh()
+        self.state["cart"] = list(checkpoint["cart"])
+        self.state["product"] = checkpoint["product"]
+
+    def run(self):
+        with _lock:
+            stats["flows"] += 1
+        i = 0
+        while i < len(self.steps):
+            step = self.steps[i]
+            attempt = self.attempts[step.name] = self.attempts.get(step.name, 0) + 1
+            start = time.perf_counter()
+            try:
+                if attempt > 1 and step.done and step.done():
+                    self.page.events.info(f"Step '{step.name}' had already taken effect; not repeating it.")
+                    with _lock:
+                        stats["skipped"] += 1
+                else:
+                    (step.retry if attempt > 1 else step.run)()
+            except Exception as e:
+                if attempt > self.retries:
+                    with _lock:
+                        stats["failed_steps"][step.name] = stats["failed_steps"].get(step.name, 0) + 1
+                    raise
+                self._resume(i, step, e)
+                continue
+            self.step_seconds[step.name] = time.perf_counter() - start
+            self.checkpoints.append(self.checkpoint(step.name))
+            if self.on_step:
+                self.on_step(step.name)
+            i += 1
+        return self.state
+
+    def _resume(self, index, step, error):
+        last = self.checkpoints[-1] if self.checkpoints else None
+        self.page.events.warning(
+            f"Step '{step.name}' failed ({error}); retrying from checkpoint "
+            f"'{last['step'] if last else 'start'}' (attempt {self.attempts[step.name] + 1}).")
+        start = time.perf_counter()
+        self.restore(last)
+        # A full rerun would have repeated every step before this one
+        saved = sum(self.step_seconds[s.name] for s in self.steps[:index]) - (time.perf_counter() - start)
+        self.saved_seconds += max(0.0, saved)
+        with _lock:
+            stats["retries"] += 1
+            stats["saved_seconds"] += max(0.0, saved)
+
+
+def restorable(cookie):
+    """A get_cookies() entry as add_cookie() should get it back: same domain, expiry and flags.
+
+    A host-only cookie is reported with its bare host as domain; passing that
+    back would turn it into a domain cookie next to the original, so only
+    real domain cookies (".hp.com") keep the key."""
+    restored = {k: v for k, v in cookie.items() if k in COOKIE_FIELDS}
+    if not str(restored.get("domain", "")).startswith("."):
+        restored.pop("domain", None)
+    if restored.get("expiry") is not None:
+        restored["expiry"] = int(restored["expiry"])
+    return restored
+
+
+def session_summary():
+    if not stats["retries"]:
+        return []
+    lines = [f"{stats['flows']} flows, {stats['retries']} step retries resumed from checkpoints, "
+             f"{stats['skipped']} repeated steps found already done",
+             f"time saved versus full reruns: {stats['saved_seconds']:.1f}s"]
+    lines += [f"gave up on {name}: {n}" for name, n in sorted(stats["failed_steps"].items())]
+    return lines
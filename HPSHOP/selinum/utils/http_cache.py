@@ -0,0 +1,172 @@
+"""Record/replay HTTP cache driven by CDP Fetch interception.
+
+HPSHOP_HTTP_CACHE=record  every response the browser receives is stored
+HPSHOP_HTTP_CACHE=replay  requests are fulfilled from the store; misses go to
+                          the network unless HPSHOP_HTTP_CACHE_STRICT=1
+
+Bodies are stored once per content hash (zlib-compressed) under
+.hpshop/http-cache/objects; index.json maps a request key (method, URL
+without cache-busting params, request body) to status, headers and the body
+hash, so identical assets served from many URLs share a single object.
+"""
+import base64
+import hashlib
+import os
+import threading
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from selinum.utils.cdp import CDPSession
+from selinum.utils.state import STATE_DIR, load_json, locked, save_json
+
+CACHE_DIR = STATE_DIR / "http-cache"
+MODE = os.environ.get("HPSHOP_HTTP_CACHE", "off")
+STRICT = os.environ.get("HPSHOP_HTTP_CACHE_STRICT") == "1"
+
+# Query parameters that only exist to defeat caches. Names that often carry real
+# values (t, ts, timestamp) stay in the key; HPSHOP_HTTP_CACHE_IGNORE_PARAMS="_,cb"
+# replaces this set for a store that needs a different list.
+DEFAULT_IGNORED_PARAMS = {"_", "cb", "cachebuster", "nocache"}
+IGNORED_PARAMS = ({p.strip() for p in os.environ["HPSHOP_HTTP_CACHE_IGNORE_PARAMS"].split(",") if p.strip()}
+                  if "HPSHOP_HTTP_CACHE_IGNORE_PARAMS" in os.environ else DEFAULT_IGNORED_PARAMS)
+# The stored body is already decoded, so these no longer describe it
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def request_key(method, url, post_data=None, ignored=None):
+    ignored = IGNORED_PARAMS if ignored is None else ignored
+    parts = urlsplit(url)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k not in ignored))
+    normalized = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+    digest = hashlib.sha256(f"{method} {normalized}\n".encode())
+    if post_data:
+        digest.update(post_data.encode() if isinstance(post_data, str) else post_data)
+    return digest.hexdigest()
+
+
+class HttpCacheStore:
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self.index_path = root / "index.json"
+        self.index = load_json(self.index_path, {})
+        self.lock = threading.Lock()
+        self.new_objects = 0
+        self.deduplicated = 0
+        # "<test>: <hit/miss summary>" lines for the end-of-run report
+        self.test_summaries = []
+
+    def _object_path(self, sha):
+        return self.root / "objects" / sha[:2] / sha
+
+    def put(self, key, url, status, headers, body):
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha)
+        with self.lock:
+            if path.exists():
+                self.deduplicated += 1
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_bytes(zlib.compress(body, 6))
+                os.replace(tmp, path)
+                self.new_objects += 1
+            self.index[key] = {"url": url, "status": status, "headers": headers, "sha": sha}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.index.get(key)
+        if entry is None:
+            return None
+        try:
+            return entry, zlib.decompress(self._object_path(entry["sha"]).read_bytes())
+        except (OSError, zlib.error):
+            return None
+
+    def save(self):
+        # Other workers may have recorded into the same store meanwhile
+        with self.lock, locked(self.index_path):
+            merged = load_json(self.index_path, {})
+            merged.update(self.index)
+            self.index = merged
+            save_json(self.index_path, merged)
+
+
+class HttpCache:
+    """Attach record or replay interception to one browser for one test."""
+
+    def __init__(self, driver, store, mode=MODE, strict=STRICT):
+        self.driver = driver
+        self.store = store
+        self.mode = mode
+        self.strict = strict
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.cdp = None
+
+    def start(self):
+        self.cdp = CDPSession.for_driver(self.driver)
+        self.cdp.on("Fetch.requestPaused", self._paused)
+        stage = "Response" if self.mode == "record" else "Request"
+        self.cdp.attach_all_pages(lambda session_id, _target: self.cdp.send(
+            "Fetch.enable", {"patterns": [{"urlPattern": "*", "requestStage": stage}]}, session_id))
+        return self
+
+    def stop(self):
+        if self.cdp:
+            self.cdp.close()
+            self.cdp = None
+
+    def _paused(self, params, session_id):
+        request = params["request"]
+        key = request_key(request["method"], request["url"], request.get("postData"))
+        if self.mode == "record":
+            self._record(params, session_id, key)
+        else:
+            self._replay(params, session_id, key)
+
+    def _record(self, params, session_id, key):
+        request_id = params["requestId"]
+        status = params.get("responseStatusCode")
+        try:
+            if status is not None:
+                body = b""
+                # Redirects have no body to fetch; the Location header is enough to replay them
+                if not 300 <= status < 400:
+                    result = self.cdp.send("Fetch.getResponseBody", {"requestId": request_id}, session_id)
+                    body = result["body"]
+                    body = base64.b64decode(body) if result.get("base64Encoded") else body.encode("utf-8")
+                headers = [h for h in params.get("responseHeaders", [])
+                           if h["name"].lower() not in DROPPED_HEADERS]
+                self.store.put(key, params["request"]["url"], status, headers, body)
+                self.recorded += 1
+        finally:
+            self.cdp.send("Fetch.continueRequest", {"requestId": request_id}, session_id)
+
+    def _replay(self, params, session_id, key):
+        request_id = params["requestId"]
+        cached = self.store.get(key)
+        if cached is not None:
+            entry, body = cached
+            self.hits += 1
+            self.cdp.send("Fetch.fulfillRequest", {
+                "requestId": request_id,
+                "responseCode": entry["status"],
+                "responseHeaders": entry["headers"],
+                "body": base64.b64encode(body).decode("ascii"),
+            }, session_id)
+            return
+        self.misses += 1
+        if self.strict:
+            self.cdp.send("Fetch.failRequest", {"requestId": request_id, "errorReason": "InternetDisconnected"},
+                          session_id)
+        else:
+            self.cdp.send("Fetch.continueRequest", {"requestId": request_id}, session_id)
+
+    def summary(self):
+        if self.mode == "record":
+            return f"recorded {self.recorded} responses"
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({rate:.0f}% hit rate)"
@@ -0,0 +1,232 @@
+"""Hybrid UI/HTTP mode: fill the cart over HTTP, assert through the browser.
+
+HttpCart takes over the browser's identity (its cookies: session, form_key,
+consent), runs search -> product page -> add-to-cart form POST with a pooled
+urllib3 client and writes the cookies the store set back into the driver.
+The browser then only opens the cart page, where verify_cart_product does
+the real UI assertion. HPSHOP_HYBRID=1 switches test_hp_store_cart_excel
+to this path.
+"""
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import urllib3
+
+HYBRID = os.environ.get("HPSHOP_HYBRID") == "1"
+
+# Same paths on the live store and the stub (selinum/utils/stub_store.py)
+STORE_PREFIX = "/in-en/default"
+SEARCH_PATH = f"{STORE_PREFIX}/catalogsearch/result/"
+CART_PATH = f"{STORE_PREFIX}/checkout/cart/"
+ADD_TO_CART_FORM_ID = "product_addtocart_form"
+
+# Shared by every HttpCart of the process: keep-alive connections per host
+_pool = urllib3.PoolManager(
+    num_pools=4, maxsize=8,
+    retries=urllib3.Retry(total=2, backoff_factor=0.2, allowed_methods=["GET"]),
+    timeout=urllib3.Timeout(connect=5, read=30),
+)
+
+
+class HttpCartError(Exception):
+    pass
+
+
+def parse_set_cookie(header, now=None):
+    """A Set-Cookie header as a WebDriver cookie dict (name, value and the attributes it carried)."""
+    pair, *attributes = header.split(";")
+    name, _, value = pair.partition("=")
+    cookie = {"name": name.strip(), "value": value.strip(), "path": "/"}
+    expires = max_age = None
+    for attribute in attributes:
+        key, _, val = attribute.strip().partition("=")
+        key, val = key.lower(), val.strip()
+        if key == "path" and val:
+            cookie["path"] = val
+        elif key == "domain" and val:
+            # Any Domain attribute makes a domain cookie; the leading dot marks it as one for WebDriver
+            cookie["domain"] = "." + val.lstrip(".")
+        elif key == "secure":
+            cookie["secure"] = True
+        elif key == "httponly":
+            cookie["httpOnly"] = True
+        elif key == "samesite" and val:
+            cookie["sameSite"] = val.capitalize()
+        elif key == "max-age":
+            try:
+                max_age = int(val)
+            except ValueError:
+                pass
+        elif key == "expires":
+            try:
+                expires = int(parsedate_to_datetime(val).timestamp())
+            except (TypeError, ValueError):
+                pass
+    # Max-Age wins over Expires, as in browsers
+    if max_age is not None:
+        cookie["expiry"] = int(now if now is not None else time.time()) + max_age
+    elif expires is not None:
+        cookie["expiry"] = expires
+    return cookie
+
+
+class _PageParser(HTMLParser):
+    """Product links, the add-to-cart form, the product title and cart rows of a store page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.products = []
+        self.form = None
+        self.title = ""
+        self.cart = []
+        self._link = None
+        self._cart_row = None
+        self._in_form = False
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = attrs.get("class") or ""
+        if tag == "a" and "product-item-link" in classes:
+            self._link = {"name": "", "href": attrs.get("href"), "position": len(self.products) + 1}
+        elif tag == "a" and "stellar-title__small" in classes.split():
+            self._cart_row = ""
+        elif tag == "form" and attrs.get("id") == ADD_TO_CART_FORM_ID:
+            self.form = {"action": attrs.get("action"), "fields": {}}
+            self._in_form = True
+        elif tag == "input" and self._in_form and attrs.get("name"):
+            self.form["fields"][attrs["name"]] = attrs.get("value") or ""
+        elif tag == "span" and "base" in classes.split():
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._link is not None:
+            self._link["name"] = self._link["name"].strip()
+            self.products.append(self._link)
+            self._link = None
+        elif tag == "a" and self._cart_row is not None:
+            self.cart.append(self._cart_row.strip())
+            self._cart_row = None
+        elif tag == "form":
+            self._in_form = False
+        elif tag == "span":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._link["name"] += data
+        if self._cart_row is not None:
+            self._cart_row += data
+        if self._in_title:
+            self.title += data
+
+
+def _parse(html):
+    parser = _PageParser()
+    parser.feed(html)
+    return parser
+
+
+class HttpCart:
+    def __init__(self, base_url, cookies=None, user_agent=None, search_url=None, pool=None):
+        self.base_url = base_url
+        self.origin = "{0.scheme}://{0.netloc}".format(urlsplit(base_url))
+        self.search_url = search_url or urljoin(self.origin, SEARCH_PATH)
+        self.cookies = dict(cookies or {})
+        # name -> the cookie as the store last set it, attributes included (see write_back)
+        self.set_cookies = {}
+        self.changed = set()
+        self.headers = {"User-Agent": user_agent} if user_agent else {}
+        self.pool = pool or _pool
+        self.timings = []
+
+    @classmethod
+    def from_driver(cls, driver):
+        """Continue the browser's session: same cookies, user agent and search form."""
+        info = driver.execute_script(
+            "var f = document.getElementById('search_mini_form');"
+            "return {ua: navigator.userAgent, search: f ? f.action : null};"
+        )
+        cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
+        return cls(driver.current_url, cookies, info.get("ua"), info.get("search"))
+
+    def _request(self, method, url, fields=None, headers=None):
+        start = time.perf_counter()
+        url = urljoin(self.base_url, url)
+        all_headers = dict(self.headers, **(headers or {}))
+        if self.cookies:
+            all_headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        body = None
+        if fields is not None:
+            body = urlencode(fields)
+            all_headers["Content-Type"] = "application/x-www-form-urlencoded"
+        resp = self.pool.request(method, url, body=body, headers=all_headers)
+        for header in resp.headers.getlist("Set-Cookie"):
+            cookie = parse_set_cookie(header)
+            name = cookie["name"]
+            self.set_cookies[name] = cookie
+            if self.cookies.get(name) != cookie["value"]:
+                self.cookies[name] = cookie["value"]
+                self.changed.add(name)
+        self.timings.append((f"{method} {urlsplit(url).path}", time.perf_counter() - start))
+        return resp
+
+    def search(self, query):
+        resp = self._request("GET", f"{self.search_url}?{urlencode({'q': query})}")
+        products = _parse(resp.data.decode("utf-8", "replace")).products
+        if not products:
+            raise HttpCartError(f"No products in the search page for '{query}'")
+        return products
+
+    def add_to_cart(self, href):
+        """Post the product page's add-to-cart form; returns the product name."""
+        page = _parse(self._request("GET", href).data.decode("utf-8", "replace"))
+        if page.form is None:
+            raise HttpCartError(f"No add-to-cart form on {href}")
+        fields = dict(page.form["fields"])
+        # Magento checks the form key against the session's cookie
+        fields.setdefault("form_key", self.cookies.get("form_key", ""))
+        resp = self._request("POST", page.form["action"] or href, fields, {"X-Requested-With": "XMLHttpRequest"})
+        try:
+            result = json.loads(resp.data.decode("utf-8"))
+        except ValueError:
+            result = {}
+        if resp.status >= 400 or result.get("success") is False:
+            raise HttpCartError(f"Add to cart failed ({resp.status}): {result.get('message', '')}")
+        return page.title.strip()
+
+    def add_product(self, query):
+        """search -> first product -> add to cart; returns the name shown in the listing."""
+        product = self.search(query)[0]
+        self.add_to_cart(product["href"])
+        return product["name"]
+
+    def cart_items(self):
+        """Product names in the session's cart, read over HTTP without touching the browser."""
+        return _parse(self._request("GET", self.cart_url()).data.decode("utf-8", "replace")).cart
+
+    def write_back(self, driver):
+        """Copy cookies the store set over HTTP into the browser (it must be on the same site).
+
+        Domain, path, expiry and flags come from the Set-Cookie header, so a
+        cookie set on a parent domain replaces the browser's copy instead of
+        sitting next to it as a host-only duplicate."""
+        now = time.time()
+        for name in sorted(self.changed):
+            cookie = self.set_cookies[name]
+            if cookie.get("expiry") is not None and cookie["expiry"] <= now:
+                # The store deleted it
+                self.cookies.pop(name, None)
+                driver.delete_cookie(name)
+            else:
+                driver.add_cookie(dict(cookie))
+        written = len(self.changed)
+        self.changed.clear()
+        return written
+
+    def cart_url(self):
+        return urljoin(self.origin, CART_PATH)
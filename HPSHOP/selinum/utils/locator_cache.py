@@ -0,0 +1,79 @@
+import atexit
+import os
+import threading
+
+from selinum.utils.state import STATE_DIR, load_json, locked, save_json
+
+LOCATOR_CACHE_FILE = STATE_DIR / "locators.json"
+
+
+class LocatorCache:
+    """Remembers which candidate locator matched per page type, across runs.
+
+    order() puts the last winner first so the resolver prefers it when
+    several candidates match at once. record() only updates memory; save()
+    writes once (at session end) and merges with what other workers saved
+    in the meantime."""
+
+    def __init__(self, path=LOCATOR_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = load_json(path, {}) if os.environ.get("HPSHOP_LOCATOR_CACHE", "1") != "0" else None
+        # page_type -> (winning locator, wins recorded since the last save)
+        self.pending = {}
+
+    def order(self, page_type, locators):
+        if self.data is None:
+            return list(locators)
+        winner = self.data.get(page_type, {}).get("locator")
+        ranked = [l for l in locators if list(l) == winner]
+        return ranked + [l for l in locators if list(l) != winner]
+
+    def record(self, page_type, locator):
+        if self.data is None:
+            return
+        with self.lock:
+            entry = self.data.get(page_type, {})
+            if entry.get("locator") == list(locator):
+                entry["wins"] = entry.get("wins", 0) + 1
+            else:
+                entry = {"locator": list(locator), "wins": 1}
+            self.data[page_type] = entry
+            previous, wins = self.pending.get(page_type, (None, 0))
+            self.pending[page_type] = (list(locator), wins + 1 if previous == list(locator) else 1)
+
+    def save(self):
+        """Merge this process's wins into the file; a page type whose winner changed here takes ours."""
+        if self.data is None:
+            return
+        # Re-read under a file lock so parallel workers merge their wins instead of overwriting them
+        with self.lock, locked(self.path):
+            if not self.pending:
+                return
+            on_disk = load_json(self.path, {})
+            for page_type, (locator, wins) in self.pending.items():
+                entry = on_disk.get(page_type, {})
+                if entry.get("locator") == locator:
+                    entry["wins"] = entry.get("wins", 0) + wins
+                else:
+                    entry = {"locator": locator, "wins": wins}
+                on_disk[page_type] = entry
+            save_json(self.path, on_disk)
+            self.pending.clear()
+            self.data = on_disk
+
+
+_cache = None
+
+
+def get_locator_cache():
+    global _cache
+    if _cache is None:
+        _cache = LocatorCache()
+        atexit.register(_cache.save)
+    return _cache
+
+
+def save_locator_cache():
+    if _cache is not None:
+        _cache.save()
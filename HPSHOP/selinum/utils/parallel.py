@@ -0,0 +1,236 @@
+"""Parallel runner for the Excel-parametrized cart test.
+
+    python -m selinum.utils.parallel -n 4 [pytest args...]
+
+The coordinator collects the test ids, orders them longest-first using the
+durations recorded by earlier runs and hands them out to N pytest worker
+processes (each with its own browser). A worker that runs out of work steals
+from the tail of the busiest queue. Per-test results are merged into
+.hpshop/parallel-report.json; screenshots and allure results already land in
+shared directories (pass --alluredir as usual).
+"""
+import argparse
+import collections
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+
+from selinum.utils.state import BASE_DIR, STATE_DIR, load_json, save_json
+
+DURATIONS_FILE = STATE_DIR / "durations.json"
+REPORT_FILE = STATE_DIR / "parallel-report.json"
+ADDR_ENV = "HPSHOP_PARALLEL_ADDR"
+KEY_ENV = "HPSHOP_PARALLEL_KEY"
+WORKER_ENV = "HPSHOP_WORKER_ID"
+COLLECT_ENV = "HPSHOP_PARALLEL_COLLECT"
+
+
+class Scheduler:
+    """Longest-processing-time-first assignment with work stealing."""
+
+    def __init__(self, items, durations, workers, default=None):
+        known = [durations[i] for i in items if i in durations]
+        # Unknown tests are assumed to be as slow as the average known one
+        self.default = default if default is not None else (sum(known) / len(known) if known else 1.0)
+        self.estimate = {i: durations.get(i, self.default) for i in items}
+        self.queues = [collections.deque() for _ in range(workers)]
+        loads = [0.0] * workers
+        for item in sorted(items, key=lambda i: -self.estimate[i]):
+            w = loads.index(min(loads))
+            self.queues[w].append(item)
+            loads[w] += self.estimate[item]
+        self.results = {}
+        self.steals = 0
+        self.lock = threading.Lock()
+
+    def remaining(self, worker):
+        return sum(self.estimate[i] for i in self.queues[worker])
+
+    def next(self, worker):
+        with self.lock:
+            if self.queues[worker]:
+                return self.queues[worker].popleft()
+            victim = max(range(len(self.queues)), key=self.remaining)
+            if not self.queues[victim]:
+                return None
+            self.steals += 1
+            return self.queues[victim].pop()
+
+    def record(self, nodeid, outcome, duration, worker):
+        with self.lock:
+            self.results[nodeid] = {"outcome": outcome, "duration": duration, "worker": worker}
+
+    def get_results(self):
+        with self.lock:
+            return dict(self.results), self.steals
+
+
+class _Manager(BaseManager):
+    pass
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BASE_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def collect(pytest_args):
+    # The ids come from the collection hook, not from parsing output that -q/-v change
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "items.json"
+        env = _env()
+        env[COLLECT_ENV] = str(out)
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-p", "selinum.utils.parallel", *pytest_args],
+            capture_output=True, text=True, env=env,
+        )
+        return load_json(out, [])
+
+
+def run(workers, pytest_args):
+    items = collect(pytest_args)
+    if not items:
+        print("No tests collected.")
+        return 5
+    if os.environ.get("HPSHOP_BATCH") == "1":
+        # Each worker is its own session and would run the whole sheet (see batch_cart.py)
+        print("HPSHOP_BATCH=1 is ignored under the parallel runner; rows run one per test.")
+    durations = load_json(DURATIONS_FILE, {})
+    workers = max(1, min(workers, len(items)))
+    scheduler = Scheduler(items, durations, workers)
+
+    # Serve the scheduler from a thread of this process so the workers all
+    # talk to the same in-memory queues.
+    _Manager.register("scheduler", callable=lambda: scheduler)
+    key = secrets.token_bytes(16)
+    server = _Manager(address=("127.0.0.1", 0), authkey=key).get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    env = _env()
+    env[ADDR_ENV] = "%s:%d" % server.address
+    env[KEY_ENV] = key.hex()
+
+    start = time.perf_counter()
+    procs = []
+    for w in range(workers):
+        env[WORKER_ENV] = str(w)
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "pytest", "-p", "selinum.utils.parallel", "-q", *pytest_args],
+            env=dict(env),
+        ))
+    codes = [p.wait() for p in procs]
+    wall = time.perf_counter() - start
+
+    results, steals = scheduler.get_results()
+
+    for nodeid, res in results.items():
+        if res["outcome"] != "error":
+            durations[nodeid] = res["duration"]
+    save_json(DURATIONS_FILE, durations)
+
+    total = sum(r["duration"] for r in results.values())
+    failed = sorted(n for n, r in results.items() if r["outcome"] in ("failed", "error"))
+    missing = sorted(set(items) - set(results))
+    save_json(REPORT_FILE, {
+        "workers": workers,
+        "wall_seconds": wall,
+        "test_seconds": total,
+        "steals": steals,
+        "results": results,
+        "not_run": missing,
+    })
+
+    print(f"\n{len(results)} tests on {workers} workers in {wall:.1f}s "
+          f"(serial estimate {total:.1f}s, speedup {total / wall if wall else 0:.2f}x, steals {steals})")
+    for nodeid in failed:
+        print(f"{results[nodeid]['outcome'].upper()} {nodeid}")
+    for nodeid in missing:
+        print(f"NOT RUN {nodeid}")
+    print(f"merged report: {REPORT_FILE}")
+    return 1 if failed or missing or any(c not in (0, 5) for c in codes) else 0
+
+
+# ------------------------------------------------------------
+# Plugin side: loaded with `-p selinum.utils.parallel` into collect() and each worker
+# ------------------------------------------------------------
+_scheduler = None
+_outcomes = {}
+_durations = collections.defaultdict(float)
+
+
+def _connect():
+    host, port = os.environ[ADDR_ENV].rsplit(":", 1)
+    _Manager.register("scheduler")
+    manager = _Manager(address=(host, int(port)), authkey=bytes.fromhex(os.environ[KEY_ENV]))
+    manager.connect()
+    return manager.scheduler()
+
+
+def pytest_configure(config):
+    global _scheduler
+    if ADDR_ENV in os.environ:
+        _scheduler = _connect()
+
+
+def pytest_collection_finish(session):
+    # Coordinator's collect(): report the ids this pytest run would execute
+    if COLLECT_ENV in os.environ:
+        save_json(Path(os.environ[COLLECT_ENV]), [item.nodeid for item in session.items])
+
+
+def pytest_runtestloop(session):
+    if _scheduler is None:
+        return None
+    worker = int(os.environ[WORKER_ENV])
+    items = {item.nodeid: item for item in session.items}
+
+    def fetch():
+        while True:
+            nodeid = _scheduler.next(worker)
+            if nodeid is None or nodeid in items:
+                return items.get(nodeid)
+            # Deselected here, or parametrized differently than in the coordinator
+            print(f"\nworker {worker}: {nodeid} was not collected by this worker", file=sys.stderr)
+            _scheduler.record(nodeid, "error", 0.0, worker)
+
+    # Only one test is fetched ahead, so the rest of the queue stays stealable;
+    # knowing the next test lets pytest keep the fixtures both of them share.
+    item = fetch()
+    while item is not None:
+        nextitem = fetch()
+        item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+        if session.shouldfail or session.shouldstop:
+            break
+        item = nextitem
+    return True
+
+
+def pytest_runtest_logreport(report):
+    if _scheduler is None:
+        return
+    _durations[report.nodeid] += report.duration
+    if report.failed:
+        _outcomes[report.nodeid] = "failed"
+    elif report.when != "teardown" and _outcomes.get(report.nodeid) != "failed":
+        _outcomes[report.nodeid] = report.outcome
+    if report.when == "teardown":
+        _scheduler.record(report.nodeid, _outcomes.pop(report.nodeid, "passed"),
+                          _durations.pop(report.nodeid), int(os.environ[WORKER_ENV]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 1)
+    args, pytest_args = parser.parse_known_args(argv)
+    return run(args.workers, pytest_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,86 @@
+import json
+import os
+import time
+
 from selenium.common.exceptions import NoAlertPresentException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+# Every popup/overlay we know how to get rid of: click its close control, or
+# remove it from the DOM. One sweep checks them all (see dismiss_known_popups).
+KNOWN_POPUPS = [
+    {"name": "modal_close", "by": By.CSS_SELECTOR, "selector": ".modal-close", "action": "click"},
+    {"name": "close_btn", "by": By.CSS_SELECTOR, "selector": ".close-btn", "action": "click"},
+    {"name": "cookie_consent_close", "by": By.CSS_SELECTOR, "selector": ".cookie-consent__close", "action": "click"},
+    {"name": "popup_close", "by": By.CSS_SELECTOR, "selector": ".popup-close", "action": "click"},
+    {"name": "no_thanks", "by": By.XPATH, "selector": "//button[contains(text(),'No thanks')]", "action": "click"},
+    {"name": "aria_close", "by": By.XPATH, "selector": "//button[contains(@aria-label,'close')]", "action": "click"},
+    {"name": "top_navigate_overlay", "by": By.CSS_SELECTOR, "selector": ".topNavigate_overlay_bg", "action": "remove"},
+]
+
+# Last resort of the old implementation; removes whole modals, so opt-in only
+GENERIC_OVERLAYS = ".popup, .modal, .overlay"
+
+# Hidden up front by the preventive mode: pure overlays that never carry anything a test needs
+PREVENTIVE_HIDE = [".topNavigate_overlay_bg"]
+PREVENT = os.environ.get("HPSHOP_PREVENT_POPUPS", "1") != "0"
+
+# Checks every known popup in the document and all same-origin frames in one
+# pass, acts on the visible ones and returns [{name, frame}] of what it handled.
+SWEEP_JS = """
+var popups = arguments[0], generic = arguments[1], handled = [];
+function find(doc, p) {
+    if (p.by === 'xpath') {
+        var snap = doc.evaluate(p.selector, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var out = [];
+        for (var i = 0; i < snap.snapshotLength; i++) { out.push(snap.snapshotItem(i)); }
+        return out;
+    }
+    return Array.prototype.slice.call(doc.querySelectorAll(p.selector));
+}
+function visible(el) {
+    var r = el.getBoundingClientRect(), s = el.ownerDocument.defaultView.getComputedStyle(el);
+    return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+}
+function sweep(doc, frame) {
+    popups.forEach(function (p) {
+        var els;
+        try { els = find(doc, p); } catch (e) { return; }
+        els.filter(visible).forEach(function (el) {
+            if (p.action === 'remove') { el.remove(); } else { el.click(); }
+            handled.push({name: p.name, frame: frame});
+        });
+    });
+    if (generic && !handled.length) {
+        var el = doc.querySelector(generic);
+        if (el) { el.remove(); handled.push({name: 'js_removed', frame: frame}); }
+    }
+    Array.prototype.forEach.call(doc.querySelectorAll('iframe, frame'), function (f, i) {
+        var child = null;
+        try { child = f.contentDocument; } catch (e) {}  // cross-origin: not ours to touch
+        if (child && child.documentElement) { sweep(child, frame === null ? String(i) : frame + '.' + i); }
+    });
+}
+sweep(document, null);
+return handled;
+"""
+
+# Injected into every new document: hides known overlays before they paint
+PREVENT_JS = """
+(function (css) {
+    function add() {
+        var style = document.createElement('style');
+        style.setAttribute('data-hpshop', 'prevent-popups');
+        style.textContent = css;
+        document.documentElement.appendChild(style);
+    }
+    if (document.documentElement) { add(); return; }
+    new MutationObserver(function (records, observer) {
+        if (document.documentElement) { observer.disconnect(); add(); }
+    }).observe(document, {childList: true});
+})(%s);
+"""
+
 
 def try_accept_alert(driver, timeout=1):
     try:
@@ -12,16 +90,6 @@ def try_accept_alert(driver, timeout=1):
     except NoAlertPresentException:
         return False
 
-def close_modal_by_close_button(driver, selectors):
-    for by, sel in selectors:
-        try:
-            btn = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((by, sel)))
-            btn.click()
-            return True
-        except Exception:
-            continue
-    return False
-
 def press_escape(driver):
     try:
         body = driver.find_element(By.TAG_NAME, "body")
@@ -36,42 +104,34 @@ def remove_element_by_js(driver, css_selector):
     except Exception:
         return False
 
-def dismiss_known_popups(driver):
+def dismiss_known_popups(driver, popups=None, remove_generic=False):
+    """Dismiss every known popup in the page and its same-origin frames in one script call.
+
+    Returns {"handled": [{"name", "frame"}], "seconds": float}; frame is None
+    for the main document, else the iframe index path ("0", "1.0", ...).
+    remove_generic=True also drops the first .popup/.modal/.overlay when no
+    known popup was found, as the old implementation did."""
+    start = time.perf_counter()
+    handled = []
     if try_accept_alert(driver):
-        return "alert_accepted"
-    close_selectors = [
-        (By.CSS_SELECTOR, ".modal-close"),
-        (By.CSS_SELECTOR, ".close-btn"),
-        (By.CSS_SELECTOR, ".cookie-consent__close"),
-        (By.CSS_SELECTOR, ".popup-close"),
-        (By.XPATH, "//button[contains(text(),'No thanks')]"),
-        (By.XPATH, "//button[contains(@aria-label,'close')]"),
-    ]
-    if close_modal_by_close_button(driver, close_selectors):
-        return "button_closed"
-    try:
-        iframes = driver.find_elements(By.TAG_NAME, "iframe")
-        for idx, fr in enumerate(iframes[:5]):
-            try:
-                driver.switch_to.frame(fr)
-                if close_modal_by_close_button(driver, close_selectors):
-                    driver.switch_to.default_content()
-                    return f"iframe_closed_idx_{idx}"
-            except Exception:
-                pass
-            finally:
-                try:
-                    driver.switch_to.default_content()
-                except Exception:
-                    pass
-    except Exception:
-        pass
+        handled.append({"name": "alert_accepted", "frame": None})
     try:
-        press_escape(driver)
+        handled += driver.execute_script(SWEEP_JS, popups or KNOWN_POPUPS,
+                                         GENERIC_OVERLAYS if remove_generic else None) or []
     except Exception:
         pass
+    return {"handled": handled, "seconds": time.perf_counter() - start}
+
+def prevent_known_popups(driver, selectors=None):
+    """Hide known overlays in every document the browser loads from now on (CDP only).
+
+    Returns False when the driver has no CDP, in which case callers keep
+    relying on dismiss_known_popups."""
+    css = ", ".join(selectors or PREVENTIVE_HIDE) + " { display: none !important; }"
+    source = PREVENT_JS % json.dumps(css)
     try:
-        remove_element_by_js(driver, ".popup, .modal, .overlay")
-        return "js_removed"
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        driver.execute_script(source)
+        return True
     except Exception:
-        return "not_handled"
\ No newline at end of file
+        return False
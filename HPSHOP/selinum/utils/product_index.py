@@ -0,0 +1,85 @@
+"""Persistent product query -> product page index.
+
+The first time a query goes through search -> listing -> detail page,
+record() keeps the resolved product URL, the listing name and the detail
+page title in .hpshop/product-index.json, keyed by store origin and the
+normalised query. Later runs navigate straight to the URL and only check
+that the detail page still shows the recorded title; an entry whose title
+no longer matches, or that is older than HPSHOP_PRODUCT_INDEX_TTL seconds,
+is dropped and the full search runs again.
+
+HPSHOP_FORCE_SEARCH=1 always takes the search path (and refreshes the
+entries); HPSHOP_PRODUCT_INDEX=0 turns the index off.
+"""
+import os
+import threading
+import time
+
+from selinum.utils.session_state import origin_of
+from selinum.utils.state import STATE_DIR, load_json, locked, save_json
+
+ENABLED = os.environ.get("HPSHOP_PRODUCT_INDEX", "1") != "0"
+FORCE_SEARCH = os.environ.get("HPSHOP_FORCE_SEARCH") == "1"
+TTL = float(os.environ.get("HPSHOP_PRODUCT_INDEX_TTL", "86400"))
+INDEX_FILE = STATE_DIR / "product-index.json"
+
+stats = {"hits": 0, "misses": 0, "recorded": 0, "invalidated": [], "saved_seconds": 0.0}
+_lock = threading.Lock()
+
+
+def query_key(query):
+    return " ".join(query.lower().split())
+
+
+def usable():
+    """Whether callers should consult the index at all."""
+    return ENABLED and not FORCE_SEARCH
+
+
+def lookup(store_url, query, now=None):
+    """The entry for query on store_url's origin, or None (expired entries are dropped)."""
+    entry = load_json(INDEX_FILE, {}).get(origin_of(store_url), {}).get(query_key(query))
+    if entry and (now or time.time()) - entry.get("ts", 0) > TTL:
+        invalidate(store_url, query, f"older than {TTL:.0f}s")
+        entry = None
+    if entry is None:
+        with _lock:
+            stats["misses"] += 1
+    return entry
+
+
+def record(store_url, query, url, name, title, search_seconds):
+    """Remember where the search for query led; search_seconds is what the search path cost."""
+    # Re-read under a file lock so parallel workers merge their entries instead of overwriting them
+    with _lock, locked(INDEX_FILE):
+        index = load_json(INDEX_FILE, {})
+        index.setdefault(origin_of(store_url), {})[query_key(query)] = {
+            "url": url, "name": name, "title": title, "search_seconds": search_seconds, "ts": time.time(),
+        }
+        save_json(INDEX_FILE, index)
+        stats["recorded"] += 1
+
+
+def hit(entry, seconds):
+    """A validated direct navigation; seconds is what it took."""
+    with _lock:
+        stats["hits"] += 1
+        stats["saved_seconds"] += max(0.0, entry.get("search_seconds", 0.0) - seconds)
+
+
+def invalidate(store_url, query, reason):
+    with _lock, locked(INDEX_FILE):
+        index = load_json(INDEX_FILE, {})
+        entries = index.get(origin_of(store_url), {})
+        if entries.pop(query_key(query), None) is not None:
+            save_json(INDEX_FILE, index)
+        stats["invalidated"].append(f"{query}: {reason}")
+
+
+def summary():
+    if not (stats["hits"] or stats["recorded"] or stats["invalidated"]):
+        return []
+    lines = [f"direct navigations: {stats['hits']}, searches: {stats['misses']}, recorded: {stats['recorded']}",
+             f"search round trips skipped, time saved: {stats['saved_seconds']:.2f}s"]
+    lines += [f"invalidated: {reason}" for reason in stats["invalidated"]]
+    return lines
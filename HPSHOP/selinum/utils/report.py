@@ -0,0 +1,17 @@
+# Summary sections printed at the end of the pytest run.
+# Session fixtures register their numbers here on teardown and
+# testcase/conftest.py prints them from pytest_terminal_summary.
+
+_sections = []
+
+
+def add_section(title, lines):
+    _sections.append((title, list(lines)))
+
+
+def write_sections(terminalreporter):
+    for title, lines in _sections:
+        terminalreporter.write_sep("-", title)
+        for line in lines:
+            terminalreporter.write_line(line)
+    _sections.clear()
@@ -0,0 +1,177 @@
+"""Declarative resource blocking for the browser under test.
+
+HPSHOP_RESOURCE_PROFILE picks one of PROFILES. URL patterns are blocked with
+Network.setBlockedURLs; resource types and third-party requests need Fetch
+interception. Every test then gets a line with requests/bytes loaded and
+blocked, and the change against the last full-fidelity run of the same test.
+"""
+import os
+import threading
+import time
+from fnmatch import fnmatch
+from urllib.parse import urlsplit
+
+from selinum.utils.cdp import CDPSession
+from selinum.utils.state import STATE_DIR, load_json, save_json
+
+PROFILE = os.environ.get("HPSHOP_RESOURCE_PROFILE")
+BASELINE_FILE = STATE_DIR / "resource-baseline.json"
+
+PATTERN_GROUPS = {
+    "analytics": [
+        "*google-analytics.com/*", "*googletagmanager.com/*", "*analytics.google.com/*",
+        "*omtrdc.net/*", "*demdex.net/*", "*adobedtm.com/*", "*hotjar.com/*",
+        "*clarity.ms/*", "*quantummetric.com/*", "*bat.bing.com/*", "*connect.facebook.net/*",
+    ],
+    "ads": [
+        "*doubleclick.net/*", "*googlesyndication.com/*", "*googleadservices.com/*",
+        "*adservice.google.*", "*criteo.com/*", "*criteo.net/*", "*taboola.com/*", "*outbrain.com/*",
+    ],
+    "fonts": ["*fonts.googleapis.com/*", "*fonts.gstatic.com/*", "*.woff", "*.woff2", "*.ttf", "*.otf"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3"],
+}
+
+PROFILES = {
+    "full-fidelity": {},
+    "functional-fast": {
+        "block_types": ["Image", "Media", "Font"],
+        "block_groups": ["analytics", "ads", "fonts", "media"],
+    },
+    "minimal": {
+        "block_types": ["Image", "Media", "Font", "Stylesheet"],
+        "block_groups": ["analytics", "ads", "fonts", "media"],
+        "block_third_party": True,
+    },
+}
+
+
+class ResourcePolicy:
+    def __init__(self, name="custom", block_types=(), block_groups=(), block_patterns=(),
+                 block_third_party=False, first_party=("hp.com",)):
+        self.name = name
+        self.block_types = set(block_types)
+        self.block_patterns = list(block_patterns)
+        for group in block_groups:
+            self.block_patterns.extend(PATTERN_GROUPS[group])
+        self.block_third_party = block_third_party
+        self.first_party = list(first_party)
+
+    @classmethod
+    def from_profile(cls, name, **overrides):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown resource profile '{name}'. Known: {', '.join(PROFILES)}")
+        settings = dict(PROFILES[name], **overrides)
+        return cls(name, **settings)
+
+    def chrome_prefs(self):
+        # Letting Chrome skip images outright is cheaper than intercepting them
+        return {"profile.managed_default_content_settings.images": 2 if "Image" in self.block_types else 1}
+
+    def is_first_party(self, url):
+        host = urlsplit(url).hostname or ""
+        return any(host == d or host.endswith("." + d) for d in self.first_party)
+
+    def should_block(self, url, resource_type):
+        if url.startswith(("data:", "blob:")):
+            return False
+        if resource_type in self.block_types:
+            return True
+        if self.block_third_party and resource_type != "Document" and not self.is_first_party(url):
+            return True
+        return any(fnmatch(url, p) for p in self.block_patterns)
+
+    @property
+    def needs_interception(self):
+        return bool(self.block_types or self.block_third_party)
+
+
+class ResourceMonitor:
+    """Applies a policy to every tab of one browser and measures what it saved."""
+
+    def __init__(self, driver, policy):
+        self.driver = driver
+        self.policy = policy
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.load_times = []
+        self._starts = {}
+        self._main_frames = {}
+        self._lock = threading.Lock()
+        self.cdp = None
+
+    def start(self):
+        self.cdp = CDPSession.for_driver(self.driver)
+        self.cdp.on("Network.requestWillBeSent", self._request)
+        self.cdp.on("Network.loadingFinished", self._finished)
+        self.cdp.on("Network.loadingFailed", self._failed)
+        self.cdp.on("Page.loadEventFired", self._loaded)
+        self.cdp.on("Fetch.requestPaused", self._paused)
+        self.cdp.attach_all_pages(self._setup_page)
+        return self
+
+    def stop(self):
+        if self.cdp:
+            self.cdp.close()
+            self.cdp = None
+
+    def _setup_page(self, session_id, target):
+        self._main_frames[session_id] = target["targetId"]
+        send = self.cdp.send
+        send("Network.enable", session_id=session_id)
+        send("Page.enable", session_id=session_id)
+        if self.policy.block_patterns:
+            send("Network.setBlockedURLs", {"urls": self.policy.block_patterns}, session_id)
+        if self.policy.needs_interception:
+            send("Fetch.enable", {"patterns": [{"urlPattern": "*", "requestStage": "Request"}]}, session_id)
+
+    def _paused(self, params, session_id):
+        request_id = params["requestId"]
+        if self.policy.should_block(params["request"]["url"], params.get("resourceType", "")):
+            self.cdp.send("Fetch.failRequest", {"requestId": request_id, "errorReason": "BlockedByClient"},
+                          session_id)
+        else:
+            self.cdp.send("Fetch.continueRequest", {"requestId": request_id}, session_id)
+
+    def _request(self, params, session_id):
+        with self._lock:
+            self.requests += 1
+            # A top-level document request starts a page load for that tab
+            if params.get("type") == "Document" and params.get("frameId") == self._main_frames.get(session_id):
+                self._starts[session_id] = time.perf_counter()
+
+    def _finished(self, params, _session_id):
+        with self._lock:
+            self.bytes += int(params.get("encodedDataLength", 0))
+
+    def _failed(self, params, _session_id):
+        if params.get("blockedReason") or params.get("errorText") == "net::ERR_BLOCKED_BY_CLIENT":
+            with self._lock:
+                self.blocked += 1
+
+    def _loaded(self, _params, session_id):
+        with self._lock:
+            start = self._starts.pop(session_id, None)
+            if start is not None:
+                self.load_times.append(time.perf_counter() - start)
+
+    def stats(self):
+        avg = sum(self.load_times) / len(self.load_times) if self.load_times else 0.0
+        return {"requests": self.requests - self.blocked, "blocked": self.blocked,
+                "bytes": self.bytes, "page_load": avg}
+
+
+def describe(nodeid, profile, stats):
+    """One report line; full-fidelity runs also become the baseline for later comparisons."""
+    baselines = load_json(BASELINE_FILE, {})
+    line = (f"{nodeid} [{profile}]: {stats['requests']} requests, {stats['bytes'] / 1024:.0f} KB, "
+            f"{stats['blocked']} blocked, page load {stats['page_load'] * 1000:.0f} ms")
+    if profile == "full-fidelity":
+        baselines[nodeid] = stats
+        save_json(BASELINE_FILE, baselines)
+    elif nodeid in baselines:
+        base = baselines[nodeid]
+        line += (f" | saved {base['requests'] - stats['requests']} requests, "
+                 f"{(base['bytes'] - stats['bytes']) / 1024:.0f} KB; "
+                 f"page load {base['page_load'] * 1000:.0f} -> {stats['page_load'] * 1000:.0f} ms")
+    return line
@@ -1,9 +1,19 @@
+import atexit
+import base64
+import os
+import queue
+import threading
 import time
 from pathlib import Path
+
 import allure
 
+from selinum.utils.screenshot_store import ScreenshotStore
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 SCREENSHOT_ROOT = BASE_DIR / "screenshots"
+# How many captured frames may wait for the writer before take_screenshot blocks
+QUEUE_SIZE = int(os.environ.get("HPSHOP_SCREENSHOT_QUEUE", "16"))
 
 def ensure_dir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
@@ -11,26 +21,129 @@ def ensure_dir(path: Path):
 def get_timestamp():
     return time.strftime("%Y%m%d_%H%M%S")
 
+# One folder per test per run, rather than one per capture
+RUN_STAMP = get_timestamp()
+
+ATTACHMENT_TYPES = {
+    "png": {"attachment_type": allure.attachment_type.PNG},
+    "jpeg": {"attachment_type": allure.attachment_type.JPG},
+    "webp": {"attachment_type": "image/webp", "extension": "webp"},
+}
+
+
+# Frames taken on this thread that still have to go into the allure report
+_pending = threading.local()
+
+
+class ScreenshotWriter:
+    """Background thread that decodes and writes captured frames.
+
+    The queue is bounded: when the disk falls behind, take_screenshot blocks
+    on put() instead of piling frames up in memory."""
+
+    def __init__(self, maxsize=QUEUE_SIZE, store=None):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.store = store or ScreenshotStore(SCREENSHOT_ROOT)
+        self.written = 0
+        self.failed = 0
+        self.blocked_seconds = 0.0
+        self.busy_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, png_b64, filepath):
+        start = time.perf_counter()
+        self.queue.put((png_b64, filepath))
+        self.blocked_seconds += time.perf_counter() - start
+
+    def _run(self):
+        while True:
+            png_b64, filepath = self.queue.get()
+            start = time.perf_counter()
+            try:
+                self._write(png_b64, filepath)
+                self.written += 1
+            except Exception:
+                self.failed += 1
+            finally:
+                self.busy_seconds += time.perf_counter() - start
+                self.queue.task_done()
+
+    def _write(self, png_b64, filepath):
+        self.store.save(base64.b64decode(png_b64), filepath)
+
+    def flush(self):
+        self.queue.join()
+
+    def summary(self):
+        return self.store.summary() + [
+            f"written: {self.written}, failed: {self.failed}",
+            f"test time blocked on a full queue: {self.blocked_seconds:.2f}s, "
+            f"writer busy: {self.busy_seconds:.2f}s",
+        ]
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ScreenshotWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def flush_screenshots():
+    if _writer is not None:
+        _writer.flush()
+
+
+def attach_screenshots():
+    """Attach this thread's frames to the running allure test once they are on disk.
+
+    allure keeps the running test per thread, so this runs on the test's
+    thread (conftest calls it at the end of every test); the frames are
+    written in the background until then. Frames the writer failed to save
+    are left out. Nothing is attached when allure is not reporting."""
+    frames = getattr(_pending, "frames", None)
+    if not frames:
+        return 0
+    _pending.frames = []
+    get_writer().flush()
+    attached = 0
+    for filepath, name, fmt in frames:
+        if not filepath.exists():
+            continue
+        try:
+            allure.attach.file(str(filepath), name=name, **ATTACHMENT_TYPES[fmt])
+            attached += 1
+        except Exception:
+            pass
+    return attached
+
+
 def take_screenshot(driver, test_name: str, step: str, seq: int = None, attach_allure: bool = True) -> str:
+    """Capture the page and hand the frame to the background writer.
+
+    Only the capture itself runs on the test's thread; the returned path is
+    written shortly after (call flush_screenshots() to wait for it) and goes
+    into the allure report with attach_screenshots()."""
+    writer = get_writer()
     safe_test = test_name.replace("/", "_").replace("::", "_")
-    folder = SCREENSHOT_ROOT / f"{safe_test}_{get_timestamp()}"
-    ensure_dir(folder)
+    folder = SCREENSHOT_ROOT / f"{safe_test}_{RUN_STAMP}"
     seq_part = f"_{seq:02d}" if seq is not None else ""
-    filename = f"{get_timestamp()}{seq_part}_{step}.png"
+    filename = f"{get_timestamp()}{seq_part}_{step}.{writer.store.ext}"
     filepath = folder / filename
     try:
-        driver.save_screenshot(str(filepath))
+        png_b64 = driver.get_screenshot_as_base64()
     except Exception:
-        try:
-            png = driver.get_screenshot_as_png()
-            with open(filepath, "wb") as f:
-                f.write(png)
-        except Exception:
-            pass
+        return str(filepath)
+    writer.submit(png_b64, filepath)
     if attach_allure:
-        try:
-            with open(filepath, "rb") as f:
-                allure.attach(f.read(), name=filename, attachment_type=allure.attachment_type.PNG)
-        except Exception:
-            pass
-    return str(filepath)
\ No newline at end of file
+        if not hasattr(_pending, "frames"):
+            _pending.frames = []
+        _pending.frames.append((filepath, filename, writer.store.fmt))
+    return str(filepath)
@@ -0,0 +1,209 @@
+"""Deduplicating storage for screenshots.
+
+Frames are stored once under screenshots/_blobs/<sha256>.<ext>; the per-test
+file is a hard link to the blob (or a small .ref file where links are not
+supported), so identical frames cost no extra disk. When Pillow is installed,
+frames can be downscaled and re-encoded as WebP or JPEG, and frames that look
+like the previous frame of the same test (perceptual hash) are counted in the
+summary. They are only stored as duplicates when HPSHOP_SCREENSHOT_PHASH_DISTANCE
+is set: a changed error message or cart line can be within a few hash bits
+of the frame before it. Retention keeps the tree, and its manifest, within a
+size and age budget.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # optional: exact dedup still works without it
+    Image = None
+
+FORMAT = os.environ.get("HPSHOP_SCREENSHOT_FORMAT", "png").lower()
+SCALE = float(os.environ.get("HPSHOP_SCREENSHOT_SCALE", "1.0"))
+QUALITY = int(os.environ.get("HPSHOP_SCREENSHOT_QUALITY", "70"))
+# Unset: only byte-identical frames are shared; set (e.g. 2) to also share near-identical ones
+PHASH_DISTANCE = (int(os.environ["HPSHOP_SCREENSHOT_PHASH_DISTANCE"])
+                  if os.environ.get("HPSHOP_SCREENSHOT_PHASH_DISTANCE") else None)
+# Frames this close to the previous one are reported as similar either way
+SIMILAR_DISTANCE = 2
+MAX_MB = float(os.environ.get("HPSHOP_SCREENSHOT_MAX_MB", "500"))
+MAX_AGE_DAYS = float(os.environ.get("HPSHOP_SCREENSHOT_MAX_AGE_DAYS", "7"))
+
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "jpg": "jpg", "webp": "webp"}
+
+
+def output_format():
+    """Format frames are stored in; re-encoding needs Pillow."""
+    if Image is None or FORMAT not in EXTENSIONS:
+        return "png"
+    return "jpeg" if FORMAT == "jpg" else FORMAT
+
+
+def dhash(image, size=8):
+    """64-bit difference hash: robust to re-encoding, sensitive to layout changes."""
+    small = image.convert("L").resize((size + 1, size))
+    pixels = small.tobytes()  # one byte per pixel in mode L
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+class ScreenshotStore:
+    def __init__(self, root, fmt=None, scale=SCALE, quality=QUALITY, phash_distance=PHASH_DISTANCE):
+        self.root = Path(root)
+        self.blobs = self.root / "_blobs"
+        self.fmt = fmt or output_format()
+        self.ext = EXTENSIONS[self.fmt]
+        self.scale = scale
+        self.quality = quality
+        self.phash_distance = phash_distance
+        self.manifest = self.root / "manifest.jsonl"
+        self._last = {}  # test folder -> (phash, blob) of its previous frame
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.duplicates = 0
+        self.similar = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _encode(self, png):
+        """Return (bytes to store, perceptual hash or None)."""
+        if Image is None:
+            return png, None
+        image = Image.open(io.BytesIO(png))
+        phash = dhash(image)
+        if self.fmt == "png" and self.scale >= 1.0:
+            return png, phash
+        if self.scale < 1.0:
+            image = image.resize((max(1, int(image.width * self.scale)), max(1, int(image.height * self.scale))))
+        out = io.BytesIO()
+        if self.fmt == "jpeg":
+            image.convert("RGB").save(out, "JPEG", quality=self.quality, optimize=True)
+        elif self.fmt == "webp":
+            image.save(out, "WEBP", quality=self.quality, method=4)
+        else:
+            image.save(out, "PNG", optimize=True)
+        return out.getvalue(), phash
+
+    def save(self, png, filepath):
+        """Store a PNG frame for `filepath` and return the bytes actually kept."""
+        filepath = Path(filepath)
+        data, phash = self._encode(png)
+        sha = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.frames += 1
+            self.raw_bytes += len(png)
+            previous = self._last.get(filepath.parent)
+            distance = None
+            if previous and phash is not None and previous[0] is not None:
+                distance = bin(previous[0] ^ phash).count("1")
+            similar = distance is not None and distance <= SIMILAR_DISTANCE
+            if similar:
+                self.similar += 1
+            dup_of = None
+            if distance is not None and self.phash_distance is not None and distance <= self.phash_distance:
+                blob = previous[1]
+                dup_of = "perceptual"
+            else:
+                blob = self.blobs / f"{sha}.{self.ext}"
+                if blob.exists():
+                    dup_of = "exact"
+            if dup_of:
+                self.duplicates += 1
+            else:
+                self.blobs.mkdir(parents=True, exist_ok=True)
+                blob.write_bytes(data)
+                self.stored_bytes += len(data)
+            self._last[filepath.parent] = (phash, blob)
+        self._link(blob, filepath)
+        self._log({"file": str(filepath.relative_to(self.root)), "blob": blob.name,
+                   "phash": f"{phash:016x}" if phash is not None else None, "duplicate": dup_of,
+                   "similar_to_previous": similar,
+                   "bytes": len(data), "ts": time.time()})
+        return blob.read_bytes() if dup_of == "perceptual" else data
+
+    @staticmethod
+    def _link(blob, filepath):
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob, filepath)
+        except FileExistsError:
+            pass
+        except OSError:
+            filepath.with_name(filepath.name + ".ref").write_text(os.path.relpath(blob, filepath.parent))
+
+    def _log(self, entry):
+        with self._lock:
+            with open(self.manifest, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    # -- retention ---------------------------------------------------------
+    def enforce_retention(self, max_mb=MAX_MB, max_age_days=MAX_AGE_DAYS):
+        """Drop per-test folders past the age limit, then the oldest until blobs fit the budget."""
+        if not self.root.exists():
+            return 0
+        folders = sorted((p for p in self.root.iterdir() if p.is_dir() and p != self.blobs),
+                         key=lambda p: p.stat().st_mtime)
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for folder in list(folders):
+            if folder.stat().st_mtime < cutoff:
+                shutil.rmtree(folder, ignore_errors=True)
+                folders.remove(folder)
+                removed += 1
+        self._drop_unreferenced()
+        budget = max_mb * 1024 * 1024
+        while folders and self._blob_bytes() > budget:
+            shutil.rmtree(folders.pop(0), ignore_errors=True)
+            removed += 1
+            self._drop_unreferenced()
+        if removed:
+            self._trim_manifest()
+        return removed
+
+    def _trim_manifest(self):
+        """Keep only the manifest lines whose frame is still on disk."""
+        if not self.manifest.exists():
+            return
+        kept = []
+        with self._lock:
+            with open(self.manifest, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    path = self.root / entry.get("file", "")
+                    if path.exists() or path.with_name(path.name + ".ref").exists():
+                        kept.append(line if line.endswith("\n") else line + "\n")
+            tmp = self.manifest.with_name(self.manifest.name + ".tmp")
+            tmp.write_text("".join(kept), encoding="utf-8")
+            os.replace(tmp, self.manifest)
+
+    def _blob_bytes(self):
+        return sum(p.stat().st_size for p in self.blobs.glob("*")) if self.blobs.exists() else 0
+
+    def _drop_unreferenced(self):
+        if not self.blobs.exists():
+            return
+        refs = {os.path.basename(p.read_text()) for p in self.root.rglob("*.ref")}
+        for blob in self.blobs.iterdir():
+            # st_nlink == 1: no per-test hard link points here any more
+            if blob.stat().st_nlink <= 1 and blob.name not in refs:
+                blob.unlink()
+
+    def summary(self):
+        saved = 100.0 * (1 - self.stored_bytes / self.raw_bytes) if self.raw_bytes else 0.0
+        return [f"frames: {self.frames}, duplicates: {self.duplicates}, "
+                f"similar to the previous frame: {self.similar}, format: {self.fmt}",
+                f"captured {self.raw_bytes / 1024:.0f} KB, stored {self.stored_bytes / 1024:.0f} KB ({saved:.0f}% saved)"]
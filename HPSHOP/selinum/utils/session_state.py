@@ -0,0 +1,216 @@
+"""Cookie-consent state reused across tests.
+
+Once a test has dealt with the consent banner, snapshot() keeps the cookies
+and local/session storage of the store origin in .hpshop/session-state.json.
+Later tests call restore() before their first navigation: cookies go in
+through Network.setCookies and storage through an init script, so the
+banner never shows and accept_cookies() has nothing to wait for.
+
+The consent cookie is set asynchronously after the click, so accept_cookies()
+waits for it (and for the banner to go away) before snapshotting, and a
+snapshot without a consent cookie is never written. verify() checks that the
+consent cookie is back and that the banner is not on the page.
+
+Session and cart state (PHPSESSID, form_key, Magento's section cache, the
+stub's session) is never captured, so carts stay per test. A snapshot is
+dropped when it is older than HPSHOP_SESSION_STATE_TTL seconds, when it
+belongs to another origin, or when a restore did not take.
+HPSHOP_SESSION_STATE=0 turns the cache off.
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from selinum.utils.state import STATE_DIR, load_json, save_json
+
+ENABLED = os.environ.get("HPSHOP_SESSION_STATE", "1") != "0"
+TTL = float(os.environ.get("HPSHOP_SESSION_STATE_TTL", "1800"))
+STATE_FILE = STATE_DIR / "session-state.json"
+
+EXCLUDE_COOKIES = {
+    "PHPSESSID", "form_key", "private_content_version", "mage-cache-sessid", "section_data_ids",
+    "persistent_shopping_cart", "mage-messages", "stub_session",
+}
+# Set by the consent banner (OneTrust) once the visitor has chosen
+CONSENT_COOKIES = {"OptanonAlertBoxClosed"}
+
+BANNER_VISIBLE_JS = """
+var el = document.getElementById('onetrust-banner-sdk') || document.getElementById('onetrust-accept-btn-handler');
+if (!el) { return false; }
+var r = el.getBoundingClientRect(), s = window.getComputedStyle(el);
+return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+"""
+
+EXCLUDE_STORAGE = {"mage-cache-storage", "mage-cache-storage-section-invalidation", "mage-cache-timeout"}
+
+READ_STORAGE_JS = """
+function dump(store) {
+    var out = {};
+    for (var i = 0; i < store.length; i++) { out[store.key(i)] = store.getItem(store.key(i)); }
+    return out;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# Seeds storage on every document of the origin without overwriting what the page set itself
+SEED_STORAGE_JS = """
+(function (origin, local, session) {
+    if (location.origin !== origin) { return; }
+    function seed(store, items) {
+        Object.keys(items).forEach(function (k) { if (store.getItem(k) === null) { store.setItem(k, items[k]); } });
+    }
+    try { seed(window.localStorage, local); seed(window.sessionStorage, session); } catch (e) {}
+})(%s, %s, %s);
+"""
+
+stats = {"snapshots": 0, "restores": 0, "failed": 0, "invalidated": [], "saved_seconds": 0.0}
+_lock = threading.Lock()
+
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def load(url, now=None):
+    """The stored snapshot for url's origin, or None (invalid ones are deleted)."""
+    snap = load_json(STATE_FILE)
+    if not snap:
+        return None
+    now = now or time.time()
+    reason = None
+    if snap.get("origin") != origin_of(url):
+        reason = f"origin changed ({snap.get('origin')} -> {origin_of(url)})"
+    elif now - snap.get("ts", 0) > TTL:
+        reason = f"older than {TTL:.0f}s"
+    if reason:
+        invalidate(reason)
+        return None
+    return snap
+
+
+def invalidate(reason):
+    with _lock:
+        stats["invalidated"].append(reason)
+    try:
+        STATE_FILE.unlink()
+    except OSError:
+        pass
+
+
+def banner_visible(driver):
+    try:
+        return bool(driver.execute_script(BANNER_VISIBLE_JS))
+    except Exception:
+        return False
+
+
+def has_consent(driver):
+    try:
+        return any(c["name"] in CONSENT_COOKIES for c in driver.get_cookies())
+    except Exception:
+        return False
+
+
+def wait_for_consent(driver, timeout=10, poll=0.1):
+    """After clicking accept: wait until the consent cookie is set and the banner is gone."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        if has_consent(driver) and not banner_visible(driver):
+            return True
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(poll)
+
+
+def snapshot(driver, url, consent_seconds):
+    """Save consent cookies and storage; consent_seconds is what handling the banner cost.
+
+    Nothing is saved unless the consent cookie is there: a snapshot without
+    it would restore into a page that still shows the banner."""
+    try:
+        cookies = [c for c in driver.get_cookies() if c["name"] not in EXCLUDE_COOKIES]
+        storage = driver.execute_script(READ_STORAGE_JS)
+    except Exception:
+        return False
+    if not any(c["name"] in CONSENT_COOKIES for c in cookies):
+        return False
+    local = {k: v for k, v in storage["local"].items() if k not in EXCLUDE_STORAGE}
+    session = {k: v for k, v in storage["session"].items() if k not in EXCLUDE_STORAGE}
+    save_json(STATE_FILE, {"origin": origin_of(url), "ts": time.time(), "consent_seconds": consent_seconds,
+                           "cookies": cookies, "local": local, "session": session})
+    with _lock:
+        stats["snapshots"] += 1
+    return True
+
+
+def _cdp_cookie(cookie, origin):
+    c = {"name": cookie["name"], "value": cookie["value"], "path": cookie.get("path", "/"),
+         "secure": cookie.get("secure", False), "httpOnly": cookie.get("httpOnly", False)}
+    if cookie.get("domain"):
+        c["domain"] = cookie["domain"]
+    else:
+        c["url"] = origin
+    if cookie.get("expiry"):
+        c["expires"] = cookie["expiry"]
+    if cookie.get("sameSite"):
+        c["sameSite"] = cookie["sameSite"]
+    return c
+
+
+def restore(driver, url):
+    """Apply the snapshot before the first navigation. Returns it, or None when there is nothing usable."""
+    snap = load(url)
+    if snap is None:
+        return None
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies",
+                               {"cookies": [_cdp_cookie(c, snap["origin"]) for c in snap["cookies"]]})
+        if snap["local"] or snap["session"]:
+            source = SEED_STORAGE_JS % (json.dumps(snap["origin"]), json.dumps(snap["local"]),
+                                        json.dumps(snap["session"]))
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+    except Exception:
+        return None
+    return snap
+
+
+def verify(driver, snap):
+    """After the first page load: did consent stick? A failed restore drops the snapshot.
+
+    The restored cookies (at least one consent cookie among them) must be in
+    the browser and the consent banner must not be showing."""
+    try:
+        present = {c["name"] for c in driver.get_cookies()}
+    except Exception:
+        present = set()
+    missing = [c["name"] for c in snap["cookies"] if c["name"] not in present]
+    reason = None
+    if missing:
+        reason = f"missing cookies: {', '.join(missing)}"
+    elif not present & CONSENT_COOKIES:
+        reason = "no consent cookie"
+    elif banner_visible(driver):
+        reason = "consent banner still shown"
+    with _lock:
+        if reason:
+            stats["failed"] += 1
+        else:
+            stats["restores"] += 1
+            stats["saved_seconds"] += snap.get("consent_seconds", 0.0)
+    if reason:
+        invalidate(f"restore failed, {reason}")
+        return False
+    return True
+
+
+def summary():
+    if not (stats["snapshots"] or stats["restores"] or stats["failed"] or stats["invalidated"]):
+        return []
+    lines = [f"snapshots: {stats['snapshots']}, restores: {stats['restores']}, failed restores: {stats['failed']}",
+             f"consent handling skipped, time saved: {stats['saved_seconds']:.2f}s"]
+    lines += [f"invalidated: {reason}" for reason in stats["invalidated"]]
+    return lines
@@ -0,0 +1,321 @@
+"""Local stand-in for store.hp.com.
+
+Serves listing, search, product detail, add-to-cart and cart pages that carry
+the same DOM hooks HPStorePage relies on (#search, product-item-link,
+#product-addtocart-button, view-cart, stellar-title__small, the cookie
+banner), so page-object timings can be measured without the network.
+
+Latency, jitter, lazy loading and overlays are plain attributes and are read
+on every request, so a test can change them while the server is running.
+"""
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+PREFIX = "/in-en/default"
+LISTING_PATH = f"{PREFIX}/personal-laptops.html"
+SEARCH_PATH = f"{PREFIX}/catalogsearch/result/"
+ADD_PATH = f"{PREFIX}/checkout/cart/add/"
+CART_PATH = f"{PREFIX}/checkout/cart/"
+API_PATH = f"{PREFIX}/stub/products.json"
+
+ENDPOINTS = ("listing", "search", "product", "add", "cart", "api")
+
+DEFAULT_PRODUCTS = [
+    {"sku": "hp-laptop-15", "name": "HP Laptop 15s-fq5111TU", "price": "₹ 42,999", "in_stock": True},
+    {"sku": "hp-pavilion-14", "name": "HP Pavilion Laptop 14-dv2014TU", "price": "₹ 64,999", "in_stock": True},
+    {"sku": "hp-victus-16", "name": "HP Victus Gaming Laptop 16-d1185TX", "price": "₹ 89,999", "in_stock": False},
+    {"sku": "hp-mouse-x200", "name": "HP X200 Wireless Mouse", "price": "₹ 699", "in_stock": True},
+    {"sku": "hp-mouse-150", "name": "HP 150 Wired Mouse", "price": "₹ 349", "in_stock": True},
+    {"sku": "hp-keyboard-k500f", "name": "HP K500F Gaming Keyboard", "price": "₹ 1,199", "in_stock": True},
+    {"sku": "hp-keyboard-230", "name": "HP 230 Wireless Mouse and Keyboard Combo", "price": "₹ 1,999", "in_stock": True},
+]
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+  .topNavigate_overlay_bg {{ position: fixed; inset: 0; background: rgba(0,0,0,.6); z-index: 900; }}
+  .loading-mask {{ position: fixed; inset: 0; background: rgba(255,255,255,.5); z-index: 950; }}
+  .simple-popup {{ position: fixed; top: 80px; right: 20px; background: #fff; padding: 20px; z-index: 800; }}
+  #onetrust-banner-sdk {{ position: fixed; bottom: 0; left: 0; right: 0; background: #eee; padding: 20px; z-index: 1000; }}
+  li.product-item {{ height: 300px; }}
+</style></head>
+<body>
+{banner}
+<header>
+  <form id="search_mini_form" action="{search_path}" method="get">
+    <input id="search" type="text" name="q" value="{query}">
+  </form>
+</header>
+<main>{content}</main>
+<script>
+  document.addEventListener('click', function (e) {{
+    if (e.target.id === 'onetrust-accept-btn-handler') {{
+      document.cookie = 'OptanonAlertBoxClosed=' + new Date().toISOString() + '; path=/';
+      document.getElementById('onetrust-banner-sdk').remove();
+    }}
+  }});
+</script>
+{scripts}
+</body></html>
+"""
+
+BANNER = """<div id="onetrust-banner-sdk">We use cookies.
+  <button id="onetrust-accept-btn-handler">Accept All Cookies</button></div>"""
+
+TILE_JS = """
+function tile(p, i) {
+  return '<li class="product-item" data-position="' + (i + 1) + '">' +
+    '<a class="product-item-link" href="' + p.href + '">' + p.name + '</a>' +
+    '<span class="price">' + p.price + '</span>' +
+    '<div class="stock ' + (p.in_stock ? 'available' : 'unavailable') + '">' +
+    (p.in_stock ? 'In stock' : 'Out of stock') + '</div></li>';
+}
+"""
+
+LAZY_JS = """<script>%s
+  fetch(%s).then(function (r) { return r.json(); }).then(function (items) {
+    document.querySelector('ol.products').innerHTML = items.map(tile).join('');
+  });
+</script>"""
+
+PRODUCT_JS = """<script>
+  var overlay = %s;
+  document.getElementById('product_addtocart_form').addEventListener('submit', function (e) {
+    e.preventDefault();
+    var mask = document.createElement('div');
+    mask.className = 'loading-mask';
+    document.body.appendChild(mask);
+    fetch(this.action, {method: 'POST', body: new URLSearchParams(new FormData(this)), credentials: 'same-origin'})
+      .then(function (r) { return r.json(); })
+      .then(function (res) {
+        mask.remove();
+        var popup = document.createElement('div');
+        popup.className = 'simple-popup';
+        // Like the live store's confirmation: a close control next to "View Cart"
+        popup.innerHTML = '<button class="modal-close" type="button" aria-label="close">&times;</button>' +
+          '<p>' + res.message + '</p>' +
+          '<button class="action primary view-cart simple-popup-view-cart" type="button">View Cart</button>';
+        popup.querySelector('.modal-close').addEventListener('click', function () { popup.remove(); });
+        popup.querySelector('.view-cart').addEventListener('click', function () { location.href = '%s'; });
+        document.body.appendChild(popup);
+        if (overlay !== null) {
+          var bg = document.createElement('div');
+          bg.className = 'topNavigate_overlay_bg';
+          document.body.appendChild(bg);
+          if (overlay > 0) { setTimeout(function () { bg.remove(); }, overlay * 1000); }
+        }
+      });
+  });
+</script>"""
+
+
+class StubStore:
+    """In-process HP store stand-in running on a background thread.
+
+    latency     -- seconds added per endpoint (see ENDPOINTS)
+    jitter      -- extra uniform random delay in [0, jitter) on every request
+    lazy_products -- render listing/search tiles from a JSON call instead of inline
+    overlay     -- None for no overlay after add-to-cart, seconds it stays up,
+                   or 0 to keep it until something removes it
+    """
+
+    def __init__(self, products=None, latency=None, jitter=0.0, lazy_products=False,
+                 overlay=None, cookie_banner=True, seed=0):
+        self.products = list(products or DEFAULT_PRODUCTS)
+        self.latency = dict.fromkeys(ENDPOINTS, 0.0)
+        self.latency.update(latency or {})
+        self.jitter = jitter
+        self.lazy_products = lazy_products
+        self.overlay = overlay
+        self.cookie_banner = cookie_banner
+        self.sessions = {}
+        self.hits = dict.fromkeys(ENDPOINTS, 0)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # -- lifecycle -------------------------------------------------------
+    def start(self, host="127.0.0.1", port=0):
+        class Handler(StubHandler):
+            store = self
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def origin(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self):
+        """Entry page, the equivalent of HPStorePage's live listing URL."""
+        return self.origin + LISTING_PATH
+
+    # -- behaviour -------------------------------------------------------
+    def delay(self, endpoint):
+        with self._lock:
+            self.hits[endpoint] += 1
+            extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+        seconds = self.latency.get(endpoint, 0.0) + extra
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def search(self, query):
+        words = query.lower().split()
+        return [p for p in self.products if all(w in p["name"].lower() for w in words)]
+
+    def product_by_sku(self, sku):
+        return next((p for p in self.products if p["sku"] == sku), None)
+
+    def session(self, sid):
+        with self._lock:
+            if sid not in self.sessions:
+                self.sessions[sid] = {"form_key": secrets.token_hex(8), "cart": []}
+            return self.sessions[sid]
+
+    def cart(self, sid):
+        return list(self.sessions.get(sid, {}).get("cart", []))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    store = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- helpers ---------------------------------------------------------
+    def _session(self):
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+        self.cookies = {k: v.value for k, v in cookies.items()}
+        self.sid = self.cookies.get("stub_session") or secrets.token_hex(8)
+        return self.store.session(self.sid)
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        state = self.store.session(self.sid)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Set-Cookie", f"stub_session={self.sid}; Path=/")
+        self.send_header("Set-Cookie", f"form_key={state['form_key']}; Path=/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _page(self, title, content, query="", scripts=""):
+        banner = BANNER if self.store.cookie_banner and "OptanonAlertBoxClosed" not in self.cookies else ""
+        return PAGE.format(
+            title=html.escape(title), banner=banner, search_path=SEARCH_PATH,
+            query=html.escape(query, quote=True), content=content, scripts=scripts,
+        )
+
+    def _tile_records(self, products):
+        return [dict(p, href=f"{PREFIX}/{p['sku']}.html") for p in products]
+
+    def _tiles(self, products, query):
+        if self.store.lazy_products:
+            api = f"{API_PATH}?q={quote(query)}"
+            return '<ol class="products"></ol>', LAZY_JS % (TILE_JS, json.dumps(api))
+        items = "".join(
+            f'<li class="product-item" data-position="{i + 1}">'
+            f'<a class="product-item-link" href="{html.escape(p["href"])}">{html.escape(p["name"])}</a>'
+            f'<span class="price">{html.escape(p["price"])}</span>'
+            f'<div class="stock {"available" if p["in_stock"] else "unavailable"}">'
+            f'{"In stock" if p["in_stock"] else "Out of stock"}</div></li>'
+            for i, p in enumerate(self._tile_records(products))
+        )
+        return f'<ol class="products">{items}</ol>', ""
+
+    # -- routes ----------------------------------------------------------
+    def do_GET(self):
+        state = self._session()
+        url = urlsplit(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+
+        if url.path in (LISTING_PATH, PREFIX, PREFIX + "/"):
+            self.store.delay("listing")
+            tiles, scripts = self._tiles(self.store.search("laptop"), "laptop")
+            content = ('<h1>Laptops</h1><button class="c-button stack white-c" type="button">Shop Now</button>'
+                       + tiles)
+            return self._send(200, self._page("HP Store - Personal Laptops", content, scripts=scripts))
+
+        if url.path == SEARCH_PATH:
+            self.store.delay("search")
+            tiles, scripts = self._tiles(self.store.search(query), query)
+            content = f'<h1 class="page-title">Search results for: \'{html.escape(query)}\'</h1>{tiles}'
+            return self._send(200, self._page(f"Search results for: '{query}'", content, query, scripts))
+
+        if url.path == API_PATH:
+            self.store.delay("api")
+            body = json.dumps(self._tile_records(self.store.search(query)))
+            return self._send(200, body, "application/json")
+
+        if url.path == CART_PATH:
+            self.store.delay("cart")
+            rows = "".join(
+                f'<tr class="item"><td><a class="stellar-title__small text-primary" '
+                f'href="{PREFIX}/{p["sku"]}.html">{html.escape(p["name"])}</a></td>'
+                f'<td class="price">{html.escape(p["price"])}</td></tr>'
+                for p in (self.store.product_by_sku(s) for s in state["cart"]) if p
+            )
+            content = f'<h1 class="page-title">Shopping Cart</h1><table id="shopping-cart-table">{rows}</table>'
+            return self._send(200, self._page("Shopping Cart", content))
+
+        if url.path.startswith(PREFIX + "/") and url.path.endswith(".html"):
+            product = self.store.product_by_sku(url.path[len(PREFIX) + 1:-len(".html")])
+            if product:
+                self.store.delay("product")
+                overlay = "null" if self.store.overlay is None else json.dumps(self.store.overlay)
+                content = (
+                    f'<h1 class="page-title"><span class="base">{html.escape(product["name"])}</span></h1>'
+                    f'<span class="price">{html.escape(product["price"])}</span>'
+                    f'<form id="product_addtocart_form" action="{ADD_PATH}" method="post">'
+                    f'<input type="hidden" name="product" value="{product["sku"]}">'
+                    f'<input type="hidden" name="form_key" value="{state["form_key"]}">'
+                    f'<button id="product-addtocart-button" type="submit">Add to Cart</button></form>'
+                )
+                scripts = PRODUCT_JS % (overlay, CART_PATH)
+                return self._send(200, self._page(product["name"], content, scripts=scripts))
+
+        self._send(404, self._page("404 Not Found", "<h1>Whoops, our bad...</h1>"))
+
+    def do_POST(self):
+        state = self._session()
+        if urlsplit(self.path).path != ADD_PATH:
+            return self._send(404, "{}", "application/json")
+        self.store.delay("add")
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        sku = form.get("product", [""])[0]
+        product = self.store.product_by_sku(sku)
+        if form.get("form_key", [""])[0] != state["form_key"] or not product:
+            body = {"success": False, "message": "Invalid Form Key. Please refresh the page."}
+            return self._send(400, json.dumps(body), "application/json")
+        state["cart"].append(sku)
+        body = {"success": True, "message": f"You added {product['name']} to your shopping cart.",
+                "cart_count": len(state["cart"])}
+        self._send(200, json.dumps(body), "application/json")
@@ -0,0 +1,161 @@
+"""Timeouts learned from how long waits actually took.
+
+The numbers page objects pass to their waits (10, 20, 25, 30s ...) are
+ceilings. TimeoutOracle remembers, per store origin and wait key (a step
+such as "add_to_cart", or step:locator for single-locator waits), the
+durations of recent successful waits in .hpshop/timeouts.json. Once a key has
+MIN_SAMPLES of them, its timeout becomes p95 * MARGIN + PAD seconds,
+never below FLOOR and never above the caller's number, so a broken page
+fails in a few seconds instead of the full ceiling. A learned timeout that
+expires is not trusted: the next BACKOFF waits on that key get the full
+ceiling again, and what they measure widens the learned value.
+
+A key whose last DEAD_AFTER full-length waits all timed out is treated as
+a dead locator: optional waits on it get FAIL_FAST seconds, and every
+PROBE_EVERY-th attempt still gets the full timeout so it can come back.
+Required waits never fail fast. HPSHOP_TIMEOUTS="key=seconds,..."
+pins a key; HPSHOP_ADAPTIVE_TIMEOUTS=0 turns the oracle off.
+"""
+import os
+import threading
+
+from selinum.utils.state import STATE_DIR, load_json, locked, save_json
+from selinum.utils.tracing import percentile
+
+ENABLED = os.environ.get("HPSHOP_ADAPTIVE_TIMEOUTS", "1") != "0"
+HISTORY_FILE = STATE_DIR / "timeouts.json"
+
+MIN_SAMPLES = 5
+WINDOW = 50
+MARGIN = 1.5
+PAD = 1.0
+FLOOR = 2.0
+DEAD_AFTER = 3
+FAIL_FAST = 1.0
+PROBE_EVERY = 5
+BACKOFF = 5
+
+
+def parse_overrides(spec):
+    # HPSHOP_TIMEOUTS="add_to_cart=15,clickable:search=5"
+    overrides = {}
+    for part in (spec or "").split(","):
+        key, _, seconds = part.rpartition("=")
+        if key.strip() and seconds:
+            overrides[key.strip()] = float(seconds)
+    return overrides
+
+
+class TimeoutOracle:
+    """History is {scope: {key: entry}}; scope is the store origin, so durations
+    learned against the local stand-in never shorten waits on the live store."""
+
+    def __init__(self, path=HISTORY_FILE, overrides=None):
+        self.path = path
+        self.overrides = parse_overrides(os.environ.get("HPSHOP_TIMEOUTS")) if overrides is None else overrides
+        self.history = self._load()
+        self.lock = threading.Lock()
+        self.touched = set()
+        self.adapted = 0
+        self.fail_fast = 0
+        self.backoffs = 0
+        self.saved_seconds = 0.0
+
+    def _load(self):
+        data = load_json(self.path, {})
+        # Entries written before history was scoped by origin are dropped
+        return {scope: keys for scope, keys in data.items()
+                if isinstance(keys, dict) and all(isinstance(e, dict) for e in keys.values())}
+
+    def _entry(self, scope, key):
+        self.touched.add((scope, key))
+        return self.history.setdefault(scope or "", {}).setdefault(key, {})
+
+    def timeout(self, key, default, scope=None, required=True):
+        """The timeout to use for key on scope (the store origin); default is the caller's ceiling.
+
+        Only optional waits (required=False) fail fast on a dead locator: a
+        required step keeps at least its learned timeout."""
+        if key in self.overrides:
+            return self.overrides[key]
+        with self.lock:
+            entry = self._entry(scope, key)
+            chosen = default
+            if entry.get("timeouts", 0) >= DEAD_AFTER and not required:
+                entry["probes"] = entry.get("probes", 0) + 1
+                if entry["probes"] % PROBE_EVERY:
+                    chosen = min(default, FAIL_FAST)
+                    self.fail_fast += 1
+            elif entry.get("backoff"):
+                entry["backoff"] -= 1
+            elif len(entry.get("ok", [])) >= MIN_SAMPLES:
+                learned = max(FLOOR, percentile(entry["ok"], 95) * MARGIN + PAD)
+                if learned < default:
+                    chosen = learned
+                    self.adapted += 1
+            return chosen
+
+    def observe(self, key, seconds, ok, used=None, default=None, scope=None):
+        """Record a finished wait; used/default are what timeout() handed out and the ceiling.
+
+        Only a wait that ran its full ceiling and still timed out counts
+        towards DEAD_AFTER; one cut short by a learned or fail-fast timeout
+        says nothing about whether the locator is dead. A learned timeout
+        cut short is a censored sample instead: the wait might have
+        succeeded with more time, so the key backs off to the ceiling."""
+        with self.lock:
+            entry = self._entry(scope, key)
+            if ok:
+                entry["ok"] = (entry.get("ok", []) + [round(seconds, 3)])[-WINDOW:]
+                entry["timeouts"] = 0
+                entry["probes"] = 0
+                return
+            if used is not None and default is not None and used < default:
+                self.saved_seconds += default - used
+                if entry.get("timeouts", 0) < DEAD_AFTER:
+                    entry["backoff"] = BACKOFF
+                    self.backoffs += 1
+                return
+            entry["timeouts"] = entry.get("timeouts", 0) + 1
+
+    def save(self):
+        """Write the entries this process touched, merged into what other workers saved."""
+        with self.lock, locked(self.path):
+            on_disk = self._load()
+            for scope, key in self.touched:
+                entry = self.history.get(scope or "", {}).get(key)
+                if entry:
+                    on_disk.setdefault(scope or "", {})[key] = entry
+            save_json(self.path, on_disk)
+            self.touched.clear()
+
+    def dead_keys(self):
+        return sorted(f"{scope} {key}".strip() for scope, keys in self.history.items()
+                      for key, e in keys.items() if e.get("timeouts", 0) >= DEAD_AFTER)
+
+    def summary(self):
+        if not (self.adapted or self.fail_fast or self.backoffs):
+            return []
+        lines = [f"learned timeouts used: {self.adapted}, fail-fast waits: {self.fail_fast}, "
+                 f"learned timeouts that expired and backed off: {self.backoffs}, "
+                 f"time saved on timed-out waits: {self.saved_seconds:.1f}s"]
+        lines += [f"dead: {key}" for key in self.dead_keys()]
+        return lines
+
+
+_oracle = None
+
+
+def get_oracle():
+    global _oracle
+    if _oracle is None:
+        _oracle = TimeoutOracle()
+    return _oracle
+
+
+def session_summary():
+    """Persist what this session learned and describe it (nothing when no wait asked)."""
+    if _oracle is None:
+        return []
+    _oracle.save()
+    return _oracle.summary()
@@ -0,0 +1,218 @@
+"""Nested timing spans for page-object steps.
+
+@traced wraps the public methods of a page-object class. While a Tracer is
+active on the current thread every call becomes a span carrying its wall
+time, the WebDriver commands it sent and how that time splits into waits
+(wait_* / push_wait / resolve_first methods), sleeps (time.sleep) and the
+rest ("action"). Spans are written as Chrome trace-event JSON, viewable in
+chrome://tracing or ui.perfetto.dev, and collected per step for the session
+p50/p95/p99 summary. HPSHOP_TRACE=0 turns it off.
+"""
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+from selinum.utils.state import STATE_DIR
+
+TRACE_ENABLED = os.environ.get("HPSHOP_TRACE", "1") != "0"
+TRACE_DIR = STATE_DIR / "traces"
+WAIT_PREFIXES = ("wait_", "push_wait", "resolve_first")
+
+_local = threading.local()
+_real_sleep = time.sleep
+# Tracers active on any thread; time.sleep is only patched while there are some
+_active_tracers = 0
+
+# step name -> [(seconds, commands)] across the session, filled by finish()
+_step_stats = defaultdict(list)
+_session_events = []
+_session_origin = time.perf_counter()
+_stats_lock = threading.Lock()
+
+
+def current():
+    return getattr(_local, "tracer", None)
+
+
+def current_step(default=None):
+    """Name of the outermost traced step running on this thread, e.g. "HPStorePage.add_to_cart"."""
+    tracer = current()
+    if tracer is not None and tracer.stack:
+        return tracer.stack[0]["name"]
+    return default
+
+
+def _traced_sleep(seconds):
+    tracer = current()
+    if tracer is None:
+        return _real_sleep(seconds)
+    span = tracer.begin("time.sleep", "sleep")
+    try:
+        return _real_sleep(seconds)
+    finally:
+        tracer.end(span)
+
+
+class Tracer:
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+        self.stack = []
+        self.commands = 0
+        # (step name, seconds, commands) for every finished non-sleep span
+        self.samples = []
+        self.origin = time.perf_counter()
+        self.tid = threading.get_ident()
+        self.active = False
+
+    def activate(self):
+        global _active_tracers
+        _local.tracer = self
+        if not self.active:
+            self.active = True
+            with _stats_lock:
+                _active_tracers += 1
+                time.sleep = _traced_sleep
+        return self
+
+    def deactivate(self):
+        global _active_tracers
+        while self.stack:
+            self.end(self.stack[-1])
+        if current() is self:
+            _local.tracer = None
+        if self.active:
+            self.active = False
+            with _stats_lock:
+                _active_tracers -= 1
+                if not _active_tracers:
+                    time.sleep = _real_sleep
+
+    def on_command(self, command, params, seconds):
+        if threading.get_ident() == self.tid:
+            self.commands += 1
+
+    def begin(self, name, category):
+        span = {"name": name, "cat": category, "start": time.perf_counter(),
+                "commands": self.commands, "wait": 0.0, "sleep": 0.0}
+        self.stack.append(span)
+        return span
+
+    def end(self, span):
+        # Unwind anything a raised exception left open above this span
+        while self.stack and self.stack[-1] is not span:
+            self.end(self.stack[-1])
+        if self.stack:
+            self.stack.pop()
+        duration = time.perf_counter() - span["start"]
+        wait = duration if span["cat"] == "wait" else span["wait"]
+        sleep = duration if span["cat"] == "sleep" else span["sleep"]
+        if self.stack:
+            self.stack[-1]["wait"] += wait
+            self.stack[-1]["sleep"] += sleep
+        commands = self.commands - span["commands"]
+        self.events.append({
+            "name": span["name"], "cat": span["cat"], "ph": "X", "pid": os.getpid(), "tid": self.tid,
+            "ts": round((span["start"] - self.origin) * 1e6), "dur": round(duration * 1e6),
+            "args": {"commands": commands, "wait_ms": round(wait * 1000, 1), "sleep_ms": round(sleep * 1000, 1),
+                     "action_ms": round(max(0.0, duration - wait - sleep) * 1000, 1)},
+        })
+        if span["cat"] != "sleep":
+            self.samples.append((span["name"], duration, commands))
+
+    def trace(self):
+        meta = {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": self.tid, "args": {"name": self.name}}
+        return {"traceEvents": [meta] + sorted(self.events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+
+
+def traced(cls):
+    """Class decorator: turn every public method defined on `cls` into a span."""
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attr):
+            continue
+        category = "wait" if name.startswith(WAIT_PREFIXES) else "action"
+        setattr(cls, name, _span(f"{cls.__name__}.{name}", category, attr))
+    return cls
+
+
+def _span(name, category, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        tracer = current()
+        if tracer is None:
+            return fn(*args, **kwargs)
+        span = tracer.begin(name, category)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            tracer.end(span)
+    return wrapper
+
+
+def _file_name(nodeid):
+    return nodeid.replace("/", "_").replace("::", "_").replace(" ", "_") + ".json"
+
+
+def finish(tracer, attach=True):
+    """Write the test's trace file, attach it to allure and add it to the session trace and summary.
+
+    Only tracers handed to finish() (the step_trace fixture's) count towards
+    the session; a Tracer used on its own stays private."""
+    if not tracer.events:
+        return None
+    with _stats_lock:
+        for name, seconds, commands in tracer.samples:
+            _step_stats[name].append((seconds, commands))
+    data = tracer.trace()
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    path = TRACE_DIR / _file_name(tracer.name)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if attach:
+        try:
+            import allure
+            allure.attach(json.dumps(data, indent=1), name="trace.json", attachment_type=allure.attachment_type.JSON)
+        except Exception:
+            pass
+    # Each test gets its own row in the merged session trace
+    offset = round((tracer.origin - _session_origin) * 1e6)
+    with _stats_lock:
+        _session_events.extend(dict(e, ts=e.get("ts", 0) + offset, tid=tracer.name) for e in data["traceEvents"])
+    return path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted sequence."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+def write_session_trace():
+    if not _session_events:
+        return None
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    path = TRACE_DIR / "session.json"
+    path.write_text(json.dumps({"traceEvents": _session_events, "displayTimeUnit": "ms"}), encoding="utf-8")
+    return path
+
+
+def session_summary(top=15):
+    """Per-step percentiles, slowest p95 first."""
+    rows = []
+    for name, samples in _step_stats.items():
+        seconds = [s for s, _ in samples]
+        rows.append((percentile(seconds, 95), name, seconds, samples))
+    rows.sort(reverse=True)
+    lines = []
+    for p95, name, seconds, samples in rows[:top]:
+        commands = sum(c for _, c in samples) / len(samples)
+        lines.append(f"{name}: n={len(samples)} p50 {percentile(seconds, 50) * 1000:.0f} ms, "
+                     f"p95 {p95 * 1000:.0f} ms, p99 {percentile(seconds, 99) * 1000:.0f} ms, "
+                     f"{commands:.1f} commands/call")
+    return lines
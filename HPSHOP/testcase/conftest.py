@@ -11,12 +11,22 @@ if PROJECT_ROOT not in sys.path:
 
 # Try to reuse fixtures from selinum.conftest if available
 try:
-    from selinum.conftest import driver, ss  # noqa: F401
+    from selinum.conftest import (  # noqa: F401
+        browser_pool, driver, ss, stub_store, store_url, http_cache_store, http_cache_session,
+        resource_monitor, resource_report, screenshot_writer, step_trace, trace_report,
+        command_profile, command_report, events, startup_report, session_state_report,
+        cart_batch, product_index_report, timeout_report, flow_report, locator_cache_writer,
+    )
 except Exception:
     # Fallback fixtures for CI
     import pytest
     from selenium import webdriver
 
+    try:
+        from selinum.utils.resource_policy import PROFILE, ResourcePolicy
+    except Exception:
+        PROFILE = None
+
     @pytest.fixture(scope="function")
     def driver():
         options = webdriver.ChromeOptions()
@@ -43,6 +53,9 @@ except Exception:
             "profile.default_content_setting_values.cookies": 1,
             "profile.default_content_setting_values.javascript": 1,
         }
+        # HPSHOP_RESOURCE_PROFILE=functional-fast skips images (see selinum/utils/resource_policy.py)
+        if PROFILE:
+            prefs.update(ResourcePolicy.from_profile(PROFILE).chrome_prefs())
         options.add_experimental_option("prefs", prefs)
 
         drv = webdriver.Chrome(options=options)
@@ -101,3 +114,19 @@ except Exception:
                 return str(path)
 
         return SSHelper()
+
+
+def pytest_report_collectionfinish(config, start_path, items):
+    try:
+        from selinum.utils.excel_reader import describe_load_stats
+    except Exception:
+        return []
+    return describe_load_stats()
+
+
+def pytest_terminal_summary(terminalreporter):
+    try:
+        from selinum.utils import report
+    except Exception:
+        return
+    report.write_sections(terminalreporter)
@@ -0,0 +1,129 @@
+# testcase/test_async_browser.py
+import asyncio
+import json
+import queue
+
+import pytest
+
+from Pages.hpstore_async import AsyncHPStorePage, run_flows
+from selinum.utils import cdp
+from selinum.utils.async_browser import AsyncBrowser
+from selinum.utils.stub_store import StubStore
+
+
+class FakeSession:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, method, callback):
+        self.handlers.setdefault(method, []).append(callback)
+
+    def fire(self, method, params, session_id):
+        for callback in self.handlers.get(method, ()):
+            callback(params, session_id)
+
+
+def test_events_reach_only_the_waiting_tab():
+    async def scenario():
+        session = FakeSession()
+        browser = AsyncBrowser(session)
+        first = browser.expect("Page.loadEventFired", "tab-1")
+        second = browser.expect("Page.loadEventFired", "tab-2")
+        session.fire("Page.loadEventFired", {"timestamp": 1}, "tab-2")
+        assert await asyncio.wait_for(second, 1) == {"timestamp": 1}
+        assert not first.done()
+        session.fire("Page.loadEventFired", {"timestamp": 2}, "tab-1")
+        assert await asyncio.wait_for(first, 1) == {"timestamp": 2}
+        assert len(session.handlers["Page.loadEventFired"]) == 1
+
+    asyncio.run(scenario())
+
+
+class FakeWebSocket:
+    """Answers every command through the reader thread; 'Fail.*' methods get a CDP error."""
+
+    def __init__(self, url, **kwargs):
+        self.inbox = queue.Queue()
+        self.sent = []
+
+    def send(self, text):
+        message = json.loads(text)
+        self.sent.append(message)
+        if message["method"].startswith("Silent."):
+            return
+        if message["method"].startswith("Fail."):
+            reply = {"id": message["id"], "error": {"message": "no such method"}}
+        else:
+            reply = {"id": message["id"], "result": {"echo": message["params"], "session": message.get("sessionId")}}
+        self.inbox.put(json.dumps(reply))
+
+    def recv(self):
+        message = self.inbox.get()
+        if message is None:
+            raise ConnectionError("closed")
+        return message
+
+    def close(self):
+        self.inbox.put(None)
+
+
+def test_send_async_resolves_errors_and_times_out(monkeypatch):
+    monkeypatch.setattr(cdp.websocket, "create_connection", FakeWebSocket)
+    session = cdp.CDPSession("ws://fake")
+
+    async def scenario():
+        replies = await asyncio.gather(*(session.send_async("Runtime.evaluate", {"n": n}, "tab-1") for n in range(5)))
+        assert [r["echo"]["n"] for r in replies] == list(range(5))
+        assert {r["session"] for r in replies} == {"tab-1"}
+        with pytest.raises(cdp.CDPError, match="no such method"):
+            await session.send_async("Fail.now")
+        with pytest.raises(cdp.CDPError, match="timed out"):
+            await session.send_async("Silent.never", timeout=0.1)
+
+    try:
+        asyncio.run(scenario())
+        assert session._pending == {}
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def browser(request):
+    try:
+        return request.getfixturevalue("driver")
+    except Exception as e:
+        pytest.skip(f"no browser available: {e}")
+
+
+def test_async_page_steps_against_the_stub_store(browser):
+    async def scenario(url):
+        async with AsyncBrowser.for_driver(browser) as tabs:
+            page = await AsyncHPStorePage.open(tabs, url)
+            await page.open_site()
+            await page.accept_cookies()
+            await page.search_product("HP X200")
+            products = await page.get_products()
+            assert products[0]["name"] == "HP X200 Wireless Mouse"
+            selected = await page.select_first_product(products)
+            assert await page.get_product_name_detail_page() == selected
+            await page.add_to_cart()
+            await page.open_cart()
+            assert await page.verify_cart_product(f" {selected} ") == [selected]
+
+    with StubStore() as store:
+        asyncio.run(scenario(store.url))
+
+
+def test_run_flows_keeps_each_tab_in_its_own_cart(browser):
+    async def scenario(url):
+        async with AsyncBrowser.for_driver(browser) as tabs:
+            return await run_flows(tabs, url, ["HP X200", "HP 150", "HP K500F"], concurrency=2)
+
+    with StubStore() as store:
+        results = asyncio.run(scenario(store.url))
+        carts = sorted(s["cart"] for s in store.sessions.values() if s["cart"])
+    assert [r["error"] for r in results] == [None, None, None]
+    assert [r["selected"] for r in results] == ["HP X200 Wireless Mouse", "HP 150 Wired Mouse",
+                                                "HP K500F Gaming Keyboard"]
+    # every flow ran in its own browser context, so no cart holds another flow's product
+    assert carts == [["hp-keyboard-k500f"], ["hp-mouse-150"], ["hp-mouse-x200"]]
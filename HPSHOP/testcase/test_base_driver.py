@@ -0,0 +1,93 @@
+# testcase/test_base_driver.py
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from base import base_driver
+from base.base_driver import BaseDriver
+from selinum.utils.locator_cache import LocatorCache
+from selinum.utils import timeouts
+
+
+class FakeDriver:
+    """Answers execute_script from a list of results; async scripts fail or answer as configured."""
+
+    def __init__(self, results=(), async_results=None):
+        self.results = list(results)
+        self.async_results = async_results
+        self.scripts = []
+        self.async_scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        return self.results.pop(0) if self.results else None
+
+    def execute_async_script(self, script, *args):
+        self.async_scripts.append((script, args))
+        if self.async_results is None:
+            raise WebDriverException("javascript error: async scripts unsupported")
+        return self.async_results.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def no_oracle(monkeypatch):
+    monkeypatch.setattr(timeouts, "ENABLED", False)
+
+
+def test_wait_until_returns_as_soon_as_the_condition_holds():
+    page = BaseDriver(FakeDriver([False, None, "ready"]))
+    assert page.wait_until("ready", lambda d: d.execute_script("check"), timeout=5, poll=0.01) == "ready"
+    assert len(page.driver.scripts) == 3
+    step, seconds, ok = page.wait_timings[0]
+    assert step == "ready" and ok and seconds < 1
+
+
+def test_wait_until_timeout_raises_only_when_required():
+    page = BaseDriver(FakeDriver())
+    assert page.wait_until("never", lambda d: False, timeout=0.2, poll=0.05, required=False) is None
+    with pytest.raises(TimeoutException):
+        page.wait_until("never", lambda d: False, timeout=0.2, poll=0.05)
+    assert [(step, ok) for step, _, ok in page.wait_timings] == [("never", False), ("never", False)]
+
+
+def test_push_wait_falls_back_to_polling_when_async_scripts_fail(monkeypatch):
+    monkeypatch.setattr(base_driver, "PUSH_WAITS", True)
+    driver = FakeDriver([None, "https://www.hp.com/cart"])
+    page = BaseDriver(driver)
+    assert page.wait_for_url_change("https://www.hp.com/", timeout=5) == "https://www.hp.com/cart"
+    assert len(driver.async_scripts) == 3
+    script, args = driver.scripts[-1]
+    assert script == base_driver.POLL_JS % base_driver.URL_CHANGED_FN and args == (["https://www.hp.com/"],)
+
+
+def test_push_wait_returns_the_pushed_value(monkeypatch):
+    monkeypatch.setattr(base_driver, "PUSH_WAITS", True)
+    driver = FakeDriver(async_results=[None, "https://www.hp.com/cart"])
+    page = BaseDriver(driver)
+    # the first call ran out its chunk without the condition holding and is re-armed
+    assert page.wait_for_url_change("https://www.hp.com/", timeout=5) == "https://www.hp.com/cart"
+    assert len(driver.async_scripts) == 2 and driver.scripts == []
+
+
+def test_resolve_first_returns_the_match_and_remembers_the_winner(monkeypatch, tmp_path):
+    monkeypatch.setattr(base_driver, "PUSH_WAITS", True)
+    cache = LocatorCache(tmp_path / "locators.json")
+    monkeypatch.setattr(base_driver, "get_locator_cache", lambda: cache)
+    locators = [(By.CSS_SELECTOR, "h1.title"), (By.TAG_NAME, "h1")]
+    driver = FakeDriver(async_results=[[1, "element", "HP Mouse"], [0, "element", "HP Mouse"]])
+    page = BaseDriver(driver)
+
+    assert page.resolve_first("product_title", locators, timeout=5, text=True) == (
+        "element", "HP Mouse", (By.TAG_NAME, "h1"))
+    page.resolve_first("product_title", locators, timeout=5, text=True)
+    # the winner of the first call is checked first by the second one
+    candidates, opts = driver.async_scripts[-1][1][0]
+    assert candidates == [[By.TAG_NAME, "h1"], [By.CSS_SELECTOR, "h1.title"]]
+    assert opts == {"visible": True, "enabled": False, "text": True}
+
+
+def test_resolve_first_without_a_match_is_empty_when_optional(monkeypatch, tmp_path):
+    monkeypatch.setattr(base_driver, "PUSH_WAITS", False)
+    monkeypatch.setattr(base_driver, "get_locator_cache", lambda: LocatorCache(tmp_path / "locators.json"))
+    page = BaseDriver(FakeDriver())
+    assert page.resolve_first("view_cart", [(By.ID, "view-cart")], timeout=0.2, required=False) == (None, "", None)
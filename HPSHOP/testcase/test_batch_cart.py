@@ -0,0 +1,83 @@
+# testcase/test_batch_cart.py
+# Batch bookkeeping and the one-pass cart check, driven by fake pages (no browser).
+from Pages.hpstore import HPStorePage
+from selinum.utils import event_log
+from selinum.utils.batch_cart import CartBatch, run_cart_batch
+
+
+class FakePage:
+    def __init__(self, cart, fail=()):
+        self.cart = cart
+        self.fail = fail
+        self.calls = []
+
+    def open_site(self):
+        self.calls.append("open_site")
+
+    def accept_cookies(self):
+        self.calls.append("accept_cookies")
+
+    def add_products_to_cart(self, names, over_http=False):
+        return [{"error": "no results"} if n in self.fail else {"selected": n.upper()} for n in names]
+
+    def open_cart_page(self):
+        self.calls.append("open_cart_page")
+
+    def verify_cart_products(self, expected):
+        remaining, matched, missing = list(self.cart), [], []
+        for n in expected:
+            if n in remaining:
+                remaining.remove(n)
+                matched.append(n)
+            else:
+                missing.append(n)
+        return {"matched": matched, "missing": missing, "cart": self.cart}
+
+
+def test_run_cart_batch_reports_each_product():
+    page = FakePage(cart=["A", "B"], fail=("d",))
+    results = run_cart_batch(page, ["a", "b", "c", "d"])
+    assert [r["status"] for r in results] == ["matched", "matched", "missing", "error"]
+    assert page.calls == ["open_site", "accept_cookies", "open_cart_page"]
+
+
+def test_cart_batch_chunks_sessions_and_caches():
+    acquired, released = [], []
+    pages = []
+
+    def factory(drv):
+        pages.append(FakePage(cart=["A", "B", "C"]))
+        return pages[-1]
+
+    batch = CartBatch(lambda: acquired.append(1) or len(acquired), released.append, factory, size=2)
+    names = ["a", "b", "c"]
+    assert batch.result_for(0, names)["status"] == "matched"
+    assert batch.result_for(2, names)["status"] == "matched"
+    assert batch.sessions == 2 and released == [1, 2]
+    assert "3 products in 2 browser sessions" in batch.summary()[0]
+
+
+def test_cart_batch_marks_chunk_failed_when_session_breaks():
+    class Broken(FakePage):
+        def open_site(self):
+            raise RuntimeError("browser died")
+
+    batch = CartBatch(lambda: object(), lambda drv: None, lambda drv: Broken(cart=[]), size=5)
+    result = batch.result_for(0, ["a", "b"])
+    assert result["status"] == "error" and "browser died" in result["detail"]
+
+
+def test_verify_cart_products_counts_duplicates():
+    page = HPStorePage.__new__(HPStorePage)
+    page.events = event_log.EventLog()
+    page.get_cart_product_names = lambda: ["HP X200 Wireless Mouse", "HP 150 Wired Mouse"]
+    check = page.verify_cart_products(["HP X200 Wireless Mouse", "HP X200 Wireless Mouse ", "HP 150 Wired Mouse"])
+    assert check["matched"] == ["HP X200 Wireless Mouse", "HP 150 Wired Mouse"]
+    assert check["missing"] == ["HP X200 Wireless Mouse "]
+
+
+def test_duplicate_rows_keep_separate_outcomes():
+    # The sheet lists "a" twice but the cart only holds it once
+    batch = CartBatch(lambda: object(), lambda drv: None, lambda drv: FakePage(cart=["A"]), size=5)
+    names = ["a", "b", "a"]
+    assert [batch.result_for(row, names)["status"] for row in range(3)] == ["matched", "missing", "missing"]
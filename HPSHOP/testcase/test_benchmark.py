@@ -0,0 +1,33 @@
+# testcase/test_benchmark.py
+from selinum.utils import benchmark
+
+
+def test_summarize_in_milliseconds():
+    stats = benchmark.summarize([0.1, 0.2, 0.3, 0.4])
+    assert stats["n"] == 4
+    assert stats["p50"] == 200
+    assert stats["max"] == 400
+
+
+def test_regressions_respect_threshold_and_noise_floor():
+    baseline = {"add_to_cart": {"p50": 200.0, "p95": 300.0}, "open_cart": {"p50": 10.0, "p95": 12.0}}
+    results = {
+        "add_to_cart": {"p50": 260.0, "p95": 320.0},  # p50 +30%, p95 within threshold
+        "open_cart": {"p50": 20.0, "p95": 25.0},  # doubled, but under the noise floor
+        "new_step": {"p50": 1.0, "p95": 1.0},
+    }
+    found = benchmark.regressions(results, baseline, threshold=0.2, noise_ms=20)
+    assert found == ["add_to_cart p50: 200 -> 260 ms (+30%)"]
+
+
+def test_isolate_state_switches_off_cross_run_learning(monkeypatch):
+    from selinum.utils import locator_cache, product_index, session_state, timeouts
+    for module in (session_state, product_index, timeouts):
+        monkeypatch.setattr(module, "ENABLED", True)
+    monkeypatch.setattr(locator_cache, "_cache", None)
+    monkeypatch.setenv("HPSHOP_LOCATOR_CACHE", "1")
+
+    benchmark.isolate_state()
+    assert not (session_state.ENABLED or product_index.ENABLED or timeouts.ENABLED)
+    assert locator_cache.get_locator_cache().data is None
+    monkeypatch.setattr(locator_cache, "_cache", None)
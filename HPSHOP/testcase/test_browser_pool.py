@@ -0,0 +1,101 @@
+# testcase/test_browser_pool.py
+from selinum.utils.browser_pool import BrowserPool, RESET_STORAGE_TYPES
+
+
+class FakeDriver:
+    def __init__(self, origin="https://www.hp.com"):
+        self.origin = origin
+        self.window_handles = ["tab-0"]
+        self.current_window_handle = "tab-0"
+        self.cdp = []
+        self.healthy = True
+        self.quit_called = False
+        self.switch_to = self
+        self.opened = 0
+
+    def execute_script(self, script, *args):
+        if not self.healthy:
+            raise RuntimeError("browser crashed")
+        return 1 if script == "return 1" else self.origin
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def new_window(self, kind):
+        self.opened += 1
+        handle = f"tab-{self.opened}"
+        self.window_handles.append(handle)
+        self.current_window_handle = handle
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.quit_called = True
+
+
+class Factory:
+    def __init__(self):
+        self.made = []
+
+    def __call__(self):
+        self.made.append(FakeDriver())
+        return self.made[-1]
+
+
+def test_release_resets_state_and_acquire_reuses_it():
+    factory = Factory()
+    pool = BrowserPool(factory=factory, size=1, init_scripts=["hide()"])
+    drv = pool.acquire()
+    assert pool.cold_starts == 1 and drv.cdp == [("Page.addScriptToEvaluateOnNewDocument", {"source": "hide()"})]
+
+    drv.cdp.clear()
+    pool.release(drv)
+    # the old tab is gone, cookies and per-origin storage are cleared, the HTTP cache is kept
+    assert drv.window_handles == ["tab-1"]
+    commands = [cmd for cmd, _ in drv.cdp]
+    assert "Network.clearBrowserCookies" in commands
+    assert "Network.clearBrowserCache" not in commands
+    assert ("Storage.clearDataForOrigin",
+            {"origin": "https://www.hp.com", "storageTypes": RESET_STORAGE_TYPES}) in drv.cdp
+    assert commands[-1] == "Page.addScriptToEvaluateOnNewDocument"
+
+    assert pool.acquire() is drv
+    assert pool.reuses == 1 and len(factory.made) == 1
+
+
+def test_unhealthy_idle_browser_is_recycled():
+    factory = Factory()
+    pool = BrowserPool(factory=factory, size=1, init_scripts=[])
+    drv = pool.acquire()
+    pool.release(drv)
+    drv.healthy = False
+
+    fresh = pool.acquire()
+    assert fresh is not drv and drv.quit_called
+    assert pool.recycled == 1 and pool.cold_starts == 2
+
+
+def test_release_beyond_size_or_failed_reset_quits():
+    pool = BrowserPool(factory=Factory(), size=1, init_scripts=[])
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    assert pool.idle == [first] and second.quit_called
+
+    broken = pool.acquire()
+    broken.healthy = False
+    pool.release(broken)
+    assert broken.quit_called and pool.idle == [] and pool.recycled == 1
+
+
+def test_webdriver_flag_is_hidden_only_on_request(monkeypatch):
+    from selinum.utils import browser_pool
+    monkeypatch.setattr(browser_pool, "HIDE_WEBDRIVER", False)
+    assert BrowserPool(factory=Factory(), size=1).acquire().cdp == []
+    monkeypatch.setattr(browser_pool, "HIDE_WEBDRIVER", True)
+    assert BrowserPool(factory=Factory(), size=1).acquire().cdp == [
+        ("Page.addScriptToEvaluateOnNewDocument", {"source": browser_pool.HIDE_WEBDRIVER_JS})]
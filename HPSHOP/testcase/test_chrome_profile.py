@@ -0,0 +1,29 @@
+# testcase/test_chrome_profile.py
+import os
+
+from selinum.utils import chrome_profile
+
+
+def test_clone_copies_profile_without_locks(tmp_path):
+    template = tmp_path / "template"
+    (template / "Default").mkdir(parents=True)
+    (template / "Default" / "Preferences").write_text("{}")
+    (template / "Local State").write_text("{}")
+    os.symlink("host-1234", template / "SingletonLock")
+
+    copy = tmp_path / "copy"
+    copy.mkdir()
+    chrome_profile.clone_tree(template, copy)
+    chrome_profile._strip_locks(copy)
+
+    assert (copy / "Default" / "Preferences").read_text() == "{}"
+    assert (copy / "Local State").exists()
+    assert not os.path.lexists(copy / "SingletonLock")
+    assert os.path.lexists(template / "SingletonLock")
+
+
+def test_startup_flags_and_profile_dir_are_applied(tmp_path):
+    from selenium import webdriver
+    options = chrome_profile.apply(webdriver.ChromeOptions(), tmp_path)
+    assert "--no-first-run" in options.arguments
+    assert f"--user-data-dir={tmp_path}" in options.arguments
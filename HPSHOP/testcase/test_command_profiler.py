@@ -0,0 +1,38 @@
+# testcase/test_command_profiler.py
+import pytest
+
+from selinum.utils import command_profiler, tracing
+
+
+@pytest.fixture(autouse=True)
+def isolated_tracing(monkeypatch):
+    # The spans below must not show up in the session's step timings
+    monkeypatch.setattr(tracing, "_step_stats", tracing.defaultdict(list))
+    monkeypatch.setattr(tracing, "_session_events", [])
+
+
+def test_flags_n_plus_one_and_redundant_lookups():
+    profile = command_profiler.CommandProfile("test")
+    tracer = tracing.Tracer("test").activate()
+    try:
+        span = tracer.begin("HPStorePage.get_products", "action")
+        for i in range(6):
+            profile.on_command("getElementText", {"id": f"tile-{i}"}, 0.002)
+        for _ in range(3):
+            profile.on_command("findElement", {"using": "css selector", "value": "h1"}, 0.001)
+        tracer.end(span)
+        profile.on_command("getTitle", {}, 0.001)
+    finally:
+        tracer.deactivate()
+
+    assert profile.count == 10
+    assert profile.by_step == {"HPStorePage.get_products": 9, command_profiler.NO_STEP: 1}
+    kinds = {(kind, step) for kind, step, _, _ in profile.findings()}
+    assert kinds == {("N+1", "HPStorePage.get_products"), ("redundant lookup", "HPStorePage.get_products")}
+
+
+def test_quiet_step_is_not_flagged():
+    profile = command_profiler.CommandProfile("test")
+    profile.on_command("getElementText", {"id": "a"}, 0.001)
+    profile.on_command("findElement", {"using": "id", "value": "search"}, 0.001)
+    assert profile.findings() == []
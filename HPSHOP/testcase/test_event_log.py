@@ -0,0 +1,25 @@
+# testcase/test_event_log.py
+import json
+
+from selinum.utils.event_log import EventLog
+
+
+def test_buffer_is_bounded_but_sink_keeps_everything(tmp_path):
+    path = tmp_path / "test.jsonl"
+    log = EventLog(path, maxlen=3)
+    for i in range(10):
+        log.info(f"event {i}", step="HPStorePage.get_products")
+    log.close()
+
+    assert log.messages() == ["event 7", "event 8", "event 9"]
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 10 and records[0]["step"] == "HPStorePage.get_products"
+    assert len(log.render().splitlines()) == 10
+
+
+def test_messages_are_not_interpreted(tmp_path):
+    log = EventLog(tmp_path / "test.jsonl")
+    log.warning("Product `HP ${x}` not found")
+    log.close()
+    assert log.render(min_level="warning").endswith("[WARNING] Product `HP ${x}` not found")
+    assert log.render(min_level="error") == ""
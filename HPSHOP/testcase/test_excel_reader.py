@@ -0,0 +1,41 @@
+# testcase/test_excel_reader.py
+import openpyxl
+import pytest
+
+from selinum.utils import excel_reader
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "products.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.append(["product", "quantity"])
+    ws.append(["HP Mouse", 2])
+    ws.append([None, None])
+    ws.append([" HP Keyboard ", 1])
+    wb.save(path)
+    return path
+
+
+def test_reads_columns_and_records(workbook):
+    assert excel_reader.read_column(workbook, header=True) == ["HP Mouse", "HP Keyboard"]
+    assert excel_reader.read_columns(workbook, cols=(1, 2), header=True) == [["HP Mouse", "2"], ["HP Keyboard", "1"]]
+    records = excel_reader.read_records(workbook, types={"quantity": int})
+    assert records == [{"product": "HP Mouse", "quantity": 2}, {"product": " HP Keyboard ", "quantity": 1}]
+
+
+def test_second_load_comes_from_sidecar(workbook, monkeypatch):
+    excel_reader.read_column(workbook, header=True)
+    monkeypatch.setattr(excel_reader, "_parse_columns", lambda *a: pytest.fail("parsed again"))
+    assert excel_reader.read_column(workbook, header=True) == ["HP Mouse", "HP Keyboard"]
+    assert excel_reader.load_stats[-1]["cached"] is True
+
+
+def test_changed_file_invalidates_cache(workbook):
+    excel_reader.read_column(workbook, header=True)
+    wb = openpyxl.load_workbook(workbook)
+    wb["Sheet1"].append(["HP Laptop", 1])
+    wb.save(workbook)
+    assert excel_reader.read_column(workbook, header=True)[-1] == "HP Laptop"
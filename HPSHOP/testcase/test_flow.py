@@ -0,0 +1,136 @@
+# testcase/test_flow.py
+# Checkpoint/resume bookkeeping, driven by a fake page (no browser).
+import pytest
+
+from selinum.utils import event_log, flow
+from selinum.utils.flow import CartFlow
+
+PRODUCT = "HP X200 Wireless Mouse"
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(flow, "stats", {"flows": 0, "retries": 0, "skipped": 0,
+                                        "saved_seconds": 0.0, "failed_steps": {}})
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = "about:blank"
+        self.cookies = []
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def refresh(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, fail=None):
+        self.driver = FakeDriver()
+        self.events = event_log.EventLog()
+        self.calls = []
+        # step name -> how many times it fails before working
+        self.fail = dict(fail or {})
+
+    def _step(self, name, url=None):
+        self.calls.append(name)
+        if self.fail.get(name):
+            self.fail[name] -= 1
+            raise RuntimeError(f"{name} flaked")
+        if url:
+            self.driver.current_url = url
+
+    def open_site(self):
+        self._step("open_site", "https://store.hp.com/")
+        self.driver.cookies = [{"name": "stub_session", "value": "s1", "path": "/"}]
+
+    def accept_cookies(self):
+        self._step("accept_cookies")
+
+    def open_product(self, name):
+        self._step("open_product", "https://store.hp.com/hp-mouse-x200.html")
+        return PRODUCT
+
+    def add_to_cart(self):
+        self._step("add_to_cart")
+
+    def wait_for_network_idle(self):
+        pass
+
+    def open_cart(self):
+        self._step("open_cart", "https://store.hp.com/checkout/cart/")
+
+    def open_cart_page(self):
+        self._step("open_cart_page", "https://store.hp.com/checkout/cart/")
+
+    def verify_cart_product(self, name):
+        self._step("verify_cart")
+
+
+def test_retry_resumes_from_last_checkpoint():
+    page = FakePage(fail={"open_cart": 1})
+    state = CartFlow(page, "HP X200", retries=2).run()
+    assert state == {"product": PRODUCT, "cart": [PRODUCT]}
+    assert page.calls == ["open_site", "accept_cookies", "open_product", "add_to_cart",
+                          "open_cart", "open_cart_page", "verify_cart"]
+    # back on the product page the add_to_cart checkpoint was taken on
+    assert page.driver.visited == ["https://store.hp.com/hp-mouse-x200.html"]
+    assert flow.stats["retries"] == 1
+
+
+def test_lost_cookies_are_restored_from_the_checkpoint():
+    page = FakePage(fail={"verify_cart": 1})
+    original = page.verify_cart_product
+
+    def verify(name):
+        if page.fail["verify_cart"]:
+            page.driver.cookies = []
+        original(name)
+
+    page.verify_cart_product = verify
+    CartFlow(page, "HP X200", retries=1).run()
+    assert [c["name"] for c in page.driver.cookies] == ["stub_session"]
+    assert page.driver.visited == ["https://store.hp.com/checkout/cart/"]
+
+
+def test_restored_cookies_keep_domain_expiry_and_flags():
+    parent = {"name": "form_key", "value": "k", "path": "/", "domain": ".hp.com", "secure": True,
+              "httpOnly": True, "expiry": 1900000000.0, "sameSite": "Lax", "size": 9}
+    assert flow.restorable(parent) == {"name": "form_key", "value": "k", "path": "/", "domain": ".hp.com",
+                                       "secure": True, "httpOnly": True, "expiry": 1900000000,
+                                       "sameSite": "Lax"}
+    # host-only cookies stay host-only
+    host_only = {"name": "stub_session", "value": "s1", "path": "/", "domain": "store.hp.com", "httpOnly": False}
+    assert flow.restorable(host_only) == {"name": "stub_session", "value": "s1", "path": "/", "httpOnly": False}
+
+
+def test_add_that_landed_is_not_repeated(monkeypatch):
+    class FakeCart:
+        def cart_items(self):
+            return [PRODUCT]
+
+    monkeypatch.setattr(flow.HttpCart, "from_driver", classmethod(lambda cls, driver: FakeCart()))
+    page = FakePage(fail={"add_to_cart": 1})
+    state = CartFlow(page, "HP X200", retries=1).run()
+    assert page.calls.count("add_to_cart") == 1
+    assert state["cart"] == [PRODUCT]
+    assert flow.stats["skipped"] == 1
+
+
+def test_retry_cap_per_step():
+    page = FakePage(fail={"verify_cart": 5})
+    with pytest.raises(RuntimeError):
+        CartFlow(page, "HP X200", retries=2).run()
+    assert page.calls.count("verify_cart") == 3
+    assert page.calls.count("open_site") == 1
+    assert flow.stats["failed_steps"] == {"verify_cart": 1}
@@ -1,6 +1,7 @@
 # testcase/test_hpstore.py
 import os
 import inspect
+import time
 import pytest
 from selenium.webdriver.support.ui import WebDriverWait
 
@@ -23,28 +24,9 @@ if HPStorePage is None:
         "Could not import HPStorePage. Tried:\n" f"{msgs}\n\nEnsure hpstore.py defines `HPStorePage`."
     )
 
-# Import excel reader
-try:
-    from selinum.utils.excel_reader import read_column
-except Exception:
-    # fallback minimal excel reader if needed (requires openpyxl)
-    try:
-        import openpyxl
-
-        def read_column(file_path, sheet_name="Sheet1", col=1, header=False):
-            wb = openpyxl.load_workbook(file_path, data_only=True)
-            sheet = wb[sheet_name]
-            start = 2 if header else 1
-            vals = []
-            for row in sheet.iter_rows(min_row=start, values_only=True):
-                v = row[col - 1]
-                if v is None:
-                    continue
-                vals.append(str(v).strip())
-            return vals
-
-    except Exception as e:
-        raise ImportError("Couldn't import selinum.utils.excel_reader and openpyxl fallback failed.") from e
+# Import excel reader (streams the sheet and caches it next to the file)
+from selinum.utils.excel_reader import read_column
+from selinum.utils import http_cart, batch_cart, product_index, flow
 
 # Find products.xlsx
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -70,15 +52,20 @@ def call_method(obj, name, *args, **kwargs):
 
 
 @pytest.mark.parametrize("product_name", products)
-def test_hp_store_cart_excel(driver, ss, product_name):
+@pytest.mark.skipif(batch_cart.BATCH, reason="HPSHOP_BATCH=1 runs the sheet through test_hp_store_cart_batch")
+def test_hp_store_cart_excel(driver, ss, store_url, product_name):
     # instantiate HPStorePage; pass WebDriverWait if constructor requires it
     try:
         sig = inspect.signature(HPStorePage.__init__)
         params = list(sig.parameters.keys())
+        # point the page object at the live store or the local stand-in
+        extra = {"url": store_url} if "url" in params else {}
+        if "timeout" in params:
+            extra["timeout"] = 10
         if "wait" in params or "timeout" in params:
-            hp = HPStorePage(driver, WebDriverWait(driver, 10))
+            hp = HPStorePage(driver, WebDriverWait(driver, 10), **extra)
         else:
-            hp = HPStorePage(driver)
+            hp = HPStorePage(driver, **extra)
     except Exception:
         # fallback tries both forms
         try:
@@ -86,6 +73,11 @@ def test_hp_store_cart_excel(driver, ss, product_name):
         except TypeError:
             hp = HPStorePage(driver, WebDriverWait(driver, 10))
 
+    # step retries: run the flow as checkpointed steps that resume instead of starting over
+    if flow.ENABLED and not http_cart.HYBRID:
+        flow.CartFlow(hp, product_name, on_step=lambda step: ss.take(f"{step}_{product_name}")).run()
+        return
+
     # start: open home -> try open_homepage else open_site
     if hasattr(hp, "open_homepage"):
         call_method(hp, "open_homepage")
@@ -102,35 +94,57 @@ def test_hp_store_cart_excel(driver, ss, product_name):
     if hasattr(hp, "accept_cookies"):
         call_method(hp, "accept_cookies")
 
-    # navigate to shop (optional)
-    if hasattr(hp, "click_shop_now"):
-        call_method(hp, "click_shop_now")
-        ss.take(f"after_click_shop_{product_name}")
-
-    # search product
-    call_method(hp, "search_product", product_name)
-    ss.take(f"after_search_{product_name}")
-
-    # get products and assert
-    products_list = call_method(hp, "get_products")
-    assert products_list, "No products returned from search"
+    # hybrid mode: the cart is filled over HTTP, only the cart check goes through the UI
+    if http_cart.HYBRID and hasattr(hp, "add_to_cart_over_http"):
+        selected_product = call_method(hp, "add_to_cart_over_http", product_name)
+        call_method(hp, "open_cart_page")
+        ss.take(f"cart_opened_{product_name}")
+        call_method(hp, "verify_cart_product", selected_product)
+        return
 
-    # select product
-    if hasattr(hp, "select_first_product"):
-        selected_product = call_method(hp, "select_first_product", products_list)
-    elif hasattr(hp, "select_product"):
-        selected_product = call_method(hp, "select_product", products_list[0])
+    # product index: straight to the product page when this query was resolved before
+    indexed = product_index.usable() and product_index.lookup(store_url, product_name)
+    if indexed and hasattr(hp, "open_product"):
+        selected_product = call_method(hp, "open_product", product_name)
+        ss.take(f"product_page_{product_name}")
     else:
-        raise AttributeError("No selection method found (select_first_product/select_product).")
+        search_started = time.perf_counter()
+
+        # navigate to shop (optional)
+        if hasattr(hp, "click_shop_now"):
+            call_method(hp, "click_shop_now")
+            ss.take(f"after_click_shop_{product_name}")
+
+        # search product
+        call_method(hp, "search_product", product_name)
+        ss.take(f"after_search_{product_name}")
+
+        # get products and assert
+        products_list = call_method(hp, "get_products")
+        assert products_list, "No products returned from search"
+
+        # select product
+        if hasattr(hp, "select_first_product"):
+            selected_product = call_method(hp, "select_first_product", products_list)
+        elif hasattr(hp, "select_product"):
+            selected_product = call_method(hp, "select_product", products_list[0])
+        else:
+            raise AttributeError("No selection method found (select_first_product/select_product).")
 
-    # product detail
-    if hasattr(hp, "switch_to_product_window"):
-        call_method(hp, "switch_to_product_window")
+        # product detail
+        if hasattr(hp, "switch_to_product_window"):
+            call_method(hp, "switch_to_product_window")
 
-    if hasattr(hp, "get_product_name_detail_page"):
-        call_method(hp, "get_product_name_detail_page")
+        detail_title = ""
+        if hasattr(hp, "get_product_name_detail_page"):
+            detail_title = call_method(hp, "get_product_name_detail_page")
 
-    ss.take(f"product_page_{product_name}")
+        ss.take(f"product_page_{product_name}")
+
+        # remember where this search led so the next run can go straight there
+        if hasattr(hp, "remember_product") and detail_title:
+            call_method(hp, "remember_product", product_name, selected_product, detail_title,
+                        time.perf_counter() - search_started)
 
     # add to cart
     call_method(hp, "add_to_cart")
@@ -155,3 +169,11 @@ def test_hp_store_cart_excel(driver, ss, product_name):
         raise AttributeError("No cart verification method found (verify_cart_product/is_product_in_cart).")
 
     ss.take(f"end_test_{product_name}")
+
+
+@pytest.mark.skipif(not batch_cart.BATCH, reason="batch mode is off (HPSHOP_BATCH=1)")
+@pytest.mark.parametrize("row, product_name", list(enumerate(products)), ids=products)
+def test_hp_store_cart_batch(cart_batch, row, product_name):
+    # the first row runs the batches for the whole sheet, the rest read the cached outcome
+    result = cart_batch.result_for(row, products)
+    assert result["status"] == "matched", f"{product_name}: {result['status']} {result['detail']}"
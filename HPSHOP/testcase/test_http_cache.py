@@ -0,0 +1,44 @@
+# testcase/test_http_cache.py
+import zlib
+
+from selinum.utils.http_cache import HttpCacheStore, request_key
+
+
+def test_request_key_ignores_only_cache_busters():
+    base = request_key("GET", "https://www.hp.com/api/cart?b=2&a=1")
+    assert request_key("GET", "https://www.hp.com/api/cart?a=1&b=2&_=1700000000") == base
+    assert request_key("GET", "https://www.hp.com/api/cart?a=1&b=2#top") == base
+    # t / ts are real parameters on many endpoints
+    assert request_key("GET", "https://www.hp.com/api/cart?a=1&b=2&t=5") != base
+    assert request_key("GET", "https://www.hp.com/api/cart?a=1&b=2&t=5", ignored={"t"}) == base
+    assert request_key("POST", "https://www.hp.com/api/cart?a=1&b=2") != base
+    assert (request_key("POST", "https://www.hp.com/api/cart", '{"sku": 1}')
+            != request_key("POST", "https://www.hp.com/api/cart", '{"sku": 2}'))
+
+
+def test_identical_bodies_are_stored_once_compressed(tmp_path):
+    store = HttpCacheStore(root=tmp_path)
+    body = b"body { color: red; }" * 100
+    store.put("k1", "https://a/site.css", 200, [], body)
+    store.put("k2", "https://b/site.css?v=2", 200, [], body)
+    assert store.new_objects == 1 and store.deduplicated == 1
+
+    objects = list((tmp_path / "objects").rglob("*"))
+    stored = [p for p in objects if p.is_file()]
+    assert len(stored) == 1 and stored[0].stat().st_size < len(body)
+    assert zlib.decompress(stored[0].read_bytes()) == body
+    entry, replayed = store.get("k2")
+    assert replayed == body and entry["url"] == "https://b/site.css?v=2"
+    assert store.get("missing") is None
+
+
+def test_save_merges_indexes_recorded_by_other_workers(tmp_path):
+    first, second = HttpCacheStore(root=tmp_path), HttpCacheStore(root=tmp_path)
+    first.put("home", "https://www.hp.com/", 200, [], b"home")
+    second.put("cart", "https://www.hp.com/cart", 200, [], b"cart")
+    first.save()
+    second.save()
+
+    reloaded = HttpCacheStore(root=tmp_path)
+    assert set(reloaded.index) == {"home", "cart"}
+    assert reloaded.get("home")[1] == b"home"
@@ -0,0 +1,91 @@
+# testcase/test_http_cart.py
+# Hybrid mode's HTTP half runs against the local store stand-in.
+import pytest
+
+from selinum.utils.http_cart import HttpCart, HttpCartError, parse_set_cookie
+from selinum.utils.stub_store import StubStore
+
+
+@pytest.fixture
+def store():
+    with StubStore() as s:
+        yield s
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cookies = []
+        self.deleted = []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def delete_cookie(self, name):
+        self.deleted.append(name)
+
+
+def test_adds_first_search_result_in_its_session(store):
+    cart = HttpCart(store.url)
+    selected = cart.add_product("HP X200")
+
+    assert selected == "HP X200 Wireless Mouse"
+    assert store.cart(cart.cookies["stub_session"]) == ["hp-mouse-x200"]
+    assert cart.cart_items() == ["HP X200 Wireless Mouse"]
+
+    driver = FakeDriver()
+    assert cart.write_back(driver) == 2
+    assert {c["name"] for c in driver.cookies} == {"stub_session", "form_key"}
+
+
+def test_reuses_the_browser_session(store):
+    browser = HttpCart(store.url)
+    browser.search("HP")
+    cart = HttpCart(store.url, cookies=browser.cookies)
+    cart.add_product("HP 150")
+    assert store.cart(browser.cookies["stub_session"]) == ["hp-mouse-150"]
+    assert cart.write_back(FakeDriver()) == 0
+
+
+def test_no_results_is_an_error(store):
+    with pytest.raises(HttpCartError):
+        HttpCart(store.url).add_product("no such thing")
+
+
+def test_set_cookie_attributes_are_kept():
+    cookie = parse_set_cookie("PHPSESSID=abc; expires=Wed, 21 Oct 2037 07:28:00 GMT; Max-Age=3600; "
+                              "Domain=.hp.com; Path=/in-en; Secure; HttpOnly; SameSite=lax", now=1000)
+    assert cookie == {"name": "PHPSESSID", "value": "abc", "path": "/in-en", "domain": ".hp.com",
+                      "secure": True, "httpOnly": True, "sameSite": "Lax", "expiry": 4600}
+    assert parse_set_cookie("a=1; Expires=Thu, 01 Jan 1970 00:01:40 GMT")["expiry"] == 100
+    assert parse_set_cookie("form_key=xyz") == {"name": "form_key", "value": "xyz", "path": "/"}
+    assert parse_set_cookie("form_key=xyz; Domain=hp.com")["domain"] == ".hp.com"
+
+
+class FakeResponse:
+    def __init__(self, set_cookies):
+        self.set_cookies = set_cookies
+        self.headers = self
+
+    def getlist(self, name):
+        return self.set_cookies
+
+
+class FakePool:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def request(self, method, url, body=None, headers=None):
+        return self.responses.pop(0)
+
+
+def test_write_back_keeps_parent_domain_and_applies_deletions():
+    pool = FakePool(FakeResponse(["private_content_version=v2; Domain=.hp.com; Path=/; HttpOnly",
+                                  "mage-messages=; Max-Age=0; Path=/"]))
+    cart = HttpCart("https://www.hp.com/in-en/shop", {"private_content_version": "v1", "mage-messages": "x"},
+                    pool=pool)
+    cart._request("GET", "/")
+    driver = FakeDriver()
+    assert cart.write_back(driver) == 2
+    assert driver.cookies == [{"name": "private_content_version", "value": "v2", "path": "/",
+                               "domain": ".hp.com", "httpOnly": True}]
+    assert driver.deleted == ["mage-messages"] and "mage-messages" not in cart.cookies
@@ -0,0 +1,59 @@
+# testcase/test_locator_cache.py
+from selenium.webdriver.common.by import By
+
+from selinum.utils.locator_cache import LocatorCache
+
+LOCATORS = [(By.TAG_NAME, "h1"), (By.CSS_SELECTOR, "span.base"), (By.XPATH, "//h1")]
+
+
+def test_winner_is_tried_first_in_later_runs(tmp_path):
+    path = tmp_path / "locators.json"
+    cache = LocatorCache(path)
+    cache.record("product_title", (By.CSS_SELECTOR, "span.base"))
+    assert not path.exists()
+    cache.save()
+
+    later = LocatorCache(path)
+    assert later.order("product_title", LOCATORS)[0] == (By.CSS_SELECTOR, "span.base")
+    assert later.order("add_to_cart", LOCATORS) == LOCATORS
+
+
+def test_repeated_wins_are_counted(tmp_path):
+    cache = LocatorCache(tmp_path / "locators.json")
+    cache.record("view_cart", LOCATORS[0])
+    cache.record("view_cart", LOCATORS[0])
+    assert cache.data["view_cart"] == {"locator": list(LOCATORS[0]), "wins": 2}
+    cache.record("view_cart", LOCATORS[2])
+    assert cache.data["view_cart"] == {"locator": list(LOCATORS[2]), "wins": 1}
+
+
+def test_save_merges_with_other_workers(tmp_path):
+    path = tmp_path / "locators.json"
+    first, second = LocatorCache(path), LocatorCache(path)
+    first.record("view_cart", LOCATORS[0])
+    first.record("product_title", LOCATORS[1])
+    second.record("view_cart", LOCATORS[0])
+    second.record("view_cart", LOCATORS[0])
+    first.save()
+    second.save()
+
+    merged = LocatorCache(path).data
+    assert merged["view_cart"] == {"locator": list(LOCATORS[0]), "wins": 3}
+    assert merged["product_title"] == {"locator": list(LOCATORS[1]), "wins": 1}
+
+
+def _save_wins(args):
+    path, wins = args
+    cache = LocatorCache(path)
+    for _ in range(wins):
+        cache.record("view_cart", LOCATORS[0])
+    cache.save()
+
+
+def test_parallel_saves_do_not_lose_wins(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = str(tmp_path / "locators.json")
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_save_wins, [(path, 1)] * 16))
+    assert LocatorCache(path).data["view_cart"]["wins"] == 16
@@ -0,0 +1,88 @@
+# testcase/test_parallel.py
+from selinum.utils.parallel import Scheduler
+
+pytest_plugins = ["pytester"]
+
+
+def test_longest_first_assignment():
+    durations = {"a": 10, "b": 8, "c": 3, "d": 2}
+    sched = Scheduler(["d", "c", "b", "a"], durations, workers=2)
+    assert list(sched.queues[0]) == ["a", "d"]
+    assert list(sched.queues[1]) == ["b", "c"]
+
+
+def test_idle_worker_steals_from_busiest_tail():
+    durations = {"a": 10, "b": 1, "c": 1, "d": 1}
+    sched = Scheduler(["a", "b", "c", "d"], durations, workers=2)
+    assert list(sched.queues[1]) == ["b", "c", "d"]
+    assert sched.next(0) == "a"
+    assert sched.next(0) == "d"
+    assert sched.steals == 1
+    assert [sched.next(1), sched.next(1), sched.next(1)] == ["b", "c", None]
+
+
+def test_unknown_items_use_average_duration():
+    sched = Scheduler(["known", "new"], {"known": 4.0}, workers=1)
+    assert sched.estimate["new"] == 4.0
+    assert [sched.next(0), sched.next(0), sched.next(0)] == ["known", "new", None]
+
+
+class FakeScheduler:
+    def __init__(self, ids):
+        self.ids = list(ids)
+        self.handed_out = []
+        self.records = {}
+
+    def next(self, worker):
+        if not self.ids:
+            return None
+        self.handed_out.append(self.ids[0])
+        return self.ids.pop(0)
+
+    def record(self, nodeid, outcome, duration, worker):
+        self.records[nodeid] = outcome
+
+
+def test_worker_fetches_lazily_and_reports_unknown_ids(pytester, monkeypatch):
+    from selinum.utils import parallel
+
+    pytester.makepyfile(test_w="""
+        import pytest
+
+        setups = []
+
+        @pytest.fixture(scope="module")
+        def browser():
+            setups.append(1)
+            return len(setups)
+
+        def test_a(browser):
+            assert browser == 1
+
+        def test_b(browser):
+            assert browser == 1
+    """)
+    sched = FakeScheduler(["test_w.py::test_a", "test_w.py::test_gone", "test_w.py::test_b"])
+    monkeypatch.setattr(parallel, "_scheduler", sched)
+    monkeypatch.setenv(parallel.WORKER_ENV, "0")
+    result = pytester.runpytest_inprocess(plugins=[parallel])
+    # the module fixture survives between tests and the unknown id does not crash the loop
+    result.assert_outcomes(passed=2)
+    assert sched.records == {"test_w.py::test_a": "passed", "test_w.py::test_gone": "error",
+                             "test_w.py::test_b": "passed"}
+
+
+def test_collect_ignores_verbosity_flags(pytester):
+    from selinum.utils import parallel
+
+    pytester.makepyfile(test_c="""
+        import pytest
+
+        @pytest.mark.parametrize("name", ["HP Mouse", "HP Keyboard"])
+        def test_cart(name):
+            pass
+    """)
+    expected = ["test_c.py::test_cart[HP Mouse]", "test_c.py::test_cart[HP Keyboard]"]
+    assert parallel.collect(["-q", "test_c.py"]) == expected
+    assert parallel.collect(["-qq", "test_c.py"]) == expected
+    assert parallel.collect(["-v", "test_c.py"]) == expected
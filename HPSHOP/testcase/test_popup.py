@@ -0,0 +1,63 @@
+# testcase/test_popup.py
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from Pages.hpstore import CART_OVERLAY_POPUPS
+from selinum.utils import popup
+from selinum.utils.stub_store import StubStore
+
+
+class FakeDriver:
+    def __init__(self, handled):
+        self.handled = handled
+        self.scripts = []
+        self.switch_to = self
+
+    @property
+    def alert(self):
+        raise popup.NoAlertPresentException()
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        return self.handled
+
+
+def test_one_script_call_covers_every_known_popup():
+    driver = FakeDriver([{"name": "top_navigate_overlay", "frame": None}, {"name": "no_thanks", "frame": "0"}])
+    result = popup.dismiss_known_popups(driver)
+    assert [h["name"] for h in result["handled"]] == ["top_navigate_overlay", "no_thanks"]
+    assert len(driver.scripts) == 1
+    script, (popups, generic) = driver.scripts[0]
+    assert popups == popup.KNOWN_POPUPS and generic is None
+    assert result["seconds"] >= 0
+
+
+def test_nothing_to_dismiss():
+    result = popup.dismiss_known_popups(FakeDriver([]))
+    assert result["handled"] == []
+
+
+@pytest.fixture
+def browser(request):
+    try:
+        return request.getfixturevalue("driver")
+    except Exception as e:
+        pytest.skip(f"no browser available: {e}")
+
+
+def test_cart_sweep_keeps_the_view_cart_confirmation(browser):
+    # Runs SWEEP_JS against the stand-in store's real add-to-cart DOM
+    with StubStore(overlay=0) as store:
+        browser.get(store.origin + "/in-en/default/hp-mouse-x200.html")
+        button = browser.find_element(By.ID, "product-addtocart-button")
+        browser.execute_script("arguments[0].click();", button)
+        WebDriverWait(browser, 10).until(lambda d: d.find_elements(By.CSS_SELECTOR, ".topNavigate_overlay_bg"))
+
+        result = popup.dismiss_known_popups(browser, popups=CART_OVERLAY_POPUPS)
+        assert [h["name"] for h in result["handled"]] == ["top_navigate_overlay"]
+        assert browser.find_element(By.CSS_SELECTOR, ".simple-popup .view-cart").is_displayed()
+
+        # The full sweep clicks the confirmation's close button, taking "View Cart" with it
+        popup.dismiss_known_popups(browser)
+        assert not browser.find_elements(By.CSS_SELECTOR, ".simple-popup .view-cart")
@@ -0,0 +1,102 @@
+# testcase/test_product_index.py
+import time
+
+import pytest
+
+from Pages.hpstore import HPStorePage
+from selinum.utils import event_log, product_index
+
+STORE = "https://store.hp.com/in-en/default/personal-laptops.html"
+PRODUCT_URL = "https://store.hp.com/in-en/default/hp-x200-wireless-mouse.html"
+
+
+@pytest.fixture(autouse=True)
+def index_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(product_index, "INDEX_FILE", tmp_path / "product-index.json")
+    monkeypatch.setattr(product_index, "stats", {"hits": 0, "misses": 0, "recorded": 0,
+                                                 "invalidated": [], "saved_seconds": 0.0})
+
+
+class FakeDriver:
+    def __init__(self):
+        self.visited = []
+        self.current_url = STORE
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+
+def _page(titles):
+    """HPStorePage without a browser; the search path lands on PRODUCT_URL."""
+    page = HPStorePage.__new__(HPStorePage)
+    page.driver = FakeDriver()
+    page.url = STORE
+    page.events = event_log.EventLog()
+    page.searches = 0
+
+    def search(name):
+        page.searches += 1
+
+    def select(products):
+        page.driver.current_url = PRODUCT_URL
+        return products[0]["name"]
+
+    page.search_product = search
+    page.get_products = lambda: [{"name": "HP X200 Wireless Mouse"}]
+    page.select_first_product = select
+    page.switch_to_product_window = lambda: None
+    page.get_product_name_detail_page = lambda: titles.pop(0)
+    return page
+
+
+def test_entries_are_keyed_by_origin_and_normalised_query():
+    product_index.record(STORE, "HP  X200 ", PRODUCT_URL, "HP X200 Wireless Mouse", "HP X200 Mouse", 3.0)
+    assert product_index.lookup(STORE, "hp x200")["url"] == PRODUCT_URL
+    assert product_index.lookup("http://127.0.0.1:8000/", "hp x200") is None
+    assert product_index.lookup(STORE, "hp x200", now=time.time() + product_index.TTL + 1) is None
+    assert product_index.lookup(STORE, "hp x200") is None
+
+
+def test_open_product_records_then_navigates_directly():
+    page = _page(["HP X200 Mouse"])
+    assert page.open_product("HP X200") == "HP X200 Wireless Mouse"
+    assert page.searches == 1
+
+    page = _page(["HP X200 Mouse"])
+    assert page.open_product("HP X200") == "HP X200 Wireless Mouse"
+    assert page.searches == 0 and page.driver.visited == [PRODUCT_URL]
+    assert product_index.stats["hits"] == 1
+
+
+def test_title_mismatch_falls_back_to_search_and_rerecords():
+    product_index.record(STORE, "HP X200", PRODUCT_URL, "HP X200 Wireless Mouse", "Old title", 3.0)
+    page = _page(["Page not found", "HP X200 Mouse"])
+    assert page.open_product("HP X200") == "HP X200 Wireless Mouse"
+    assert page.searches == 1
+    assert product_index.lookup(STORE, "HP X200")["title"] == "HP X200 Mouse"
+    assert "title changed" in product_index.stats["invalidated"][0]
+
+
+def test_force_search_skips_the_index(monkeypatch):
+    monkeypatch.setattr(product_index, "FORCE_SEARCH", True)
+    product_index.record(STORE, "HP X200", PRODUCT_URL, "HP X200 Wireless Mouse", "HP X200 Mouse", 3.0)
+    page = _page(["HP X200 Mouse"])
+    page.open_product("HP X200")
+    assert page.searches == 1 and page.driver.visited == []
+
+
+def test_parallel_writers_merge_their_entries():
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_record_in_worker, [(str(product_index.INDEX_FILE), n) for n in range(8)]))
+    for n in range(8):
+        assert product_index.lookup(STORE, f"HP {n}")["url"].endswith(f"/{n}.html")
+
+
+def _record_in_worker(args):
+    path, n = args
+    from pathlib import Path
+    product_index.INDEX_FILE = Path(path)
+    product_index.record(STORE, f"HP {n}", f"https://store.hp.com/{n}.html", f"HP {n}", f"HP {n}", 1.0)
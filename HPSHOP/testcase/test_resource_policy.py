@@ -0,0 +1,44 @@
+# testcase/test_resource_policy.py
+import pytest
+
+from selinum.utils import resource_policy
+from selinum.utils.resource_policy import ResourcePolicy, describe
+
+
+def test_should_block_by_type_pattern_and_party():
+    fast = ResourcePolicy.from_profile("functional-fast")
+    assert fast.should_block("https://www.hp.com/img/laptop.png", "Image")
+    assert fast.should_block("https://www.googletagmanager.com/gtm.js", "Script")
+    assert not fast.should_block("https://www.hp.com/app.js", "Script")
+    assert not fast.should_block("data:image/png;base64,AAAA", "Image")
+
+    minimal = ResourcePolicy.from_profile("minimal")
+    assert minimal.should_block("https://cdn.example.net/lib.js", "Script")
+    assert not minimal.should_block("https://store.hp.com/app.js", "Script")
+    # the page itself is never blocked as third party
+    assert not minimal.should_block("https://login.example.net/", "Document")
+
+
+def test_from_profile_applies_overrides_and_rejects_unknown_names():
+    full = ResourcePolicy.from_profile("full-fidelity")
+    assert not full.needs_interception and full.block_patterns == []
+    assert full.chrome_prefs() == {"profile.managed_default_content_settings.images": 1}
+
+    custom = ResourcePolicy.from_profile("functional-fast", block_types=["Media"])
+    assert custom.block_types == {"Media"} and custom.needs_interception
+    assert ResourcePolicy.from_profile("functional-fast").chrome_prefs() == {
+        "profile.managed_default_content_settings.images": 2}
+    with pytest.raises(ValueError, match="Unknown resource profile"):
+        ResourcePolicy.from_profile("turbo")
+
+
+def test_describe_compares_against_the_full_fidelity_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(resource_policy, "BASELINE_FILE", tmp_path / "baseline.json")
+    full = {"requests": 120, "blocked": 0, "bytes": 4 * 1024 * 1024, "page_load": 2.5}
+    fast = {"requests": 40, "blocked": 80, "bytes": 1024 * 1024, "page_load": 1.0}
+
+    assert "saved" not in describe("t::cart", "functional-fast", fast)
+    assert describe("t::cart", "full-fidelity", full) == (
+        "t::cart [full-fidelity]: 120 requests, 4096 KB, 0 blocked, page load 2500 ms")
+    assert describe("t::cart", "functional-fast", fast).endswith(
+        "| saved 80 requests, 3072 KB; page load 2500 -> 1000 ms")
@@ -0,0 +1,67 @@
+# testcase/test_screenshot_store.py
+import io
+import os
+import time
+
+import pytest
+
+from selinum.utils import screenshot_store
+from selinum.utils.screenshot_store import ScreenshotStore
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+
+def _page(cart_line):
+    """A mostly blank page whose only difference is a short line of small text."""
+    image = Image.new("RGB", (800, 600), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 800, 60), fill="navy")
+    draw.text((40, 300), cart_line, fill="black")
+    out = io.BytesIO()
+    image.save(out, "PNG")
+    return out.getvalue()
+
+
+def test_frame_differing_only_in_small_text_is_kept(tmp_path):
+    store = ScreenshotStore(tmp_path, fmt="png")
+    before, after = _page("Cart: HP X200 Wireless Mouse"), _page("Error: item out of stock")
+    # the two frames are perceptually close, which is what made this dangerous
+    assert bin(screenshot_store.dhash(Image.open(io.BytesIO(before))) ^
+               screenshot_store.dhash(Image.open(io.BytesIO(after)))).count("1") <= 2
+
+    folder = tmp_path / "test_cart_run"
+    store.save(before, folder / "01_add.png")
+    kept = store.save(after, folder / "02_error.png")
+
+    assert kept == after
+    assert (folder / "02_error.png").read_bytes() == after
+    assert store.duplicates == 0 and store.similar == 1
+
+
+def test_identical_frames_share_one_blob(tmp_path):
+    store = ScreenshotStore(tmp_path, fmt="png")
+    frame = _page("same")
+    store.save(frame, tmp_path / "t" / "01.png")
+    store.save(frame, tmp_path / "t" / "02.png")
+    assert store.duplicates == 1
+    assert len(list((tmp_path / "_blobs").iterdir())) == 1
+
+
+def test_perceptual_dedupe_is_opt_in(tmp_path):
+    store = ScreenshotStore(tmp_path, fmt="png", phash_distance=2)
+    store.save(_page("Cart: HP X200 Wireless Mouse"), tmp_path / "t" / "01.png")
+    store.save(_page("Error: item out of stock"), tmp_path / "t" / "02.png")
+    assert store.duplicates == 1
+
+
+def test_retention_trims_the_manifest(tmp_path):
+    store = ScreenshotStore(tmp_path, fmt="png")
+    store.save(_page("old"), tmp_path / "old_run" / "01.png")
+    store.save(_page("new"), tmp_path / "new_run" / "01.png")
+    week_ago = time.time() - 8 * 86400
+    os.utime(tmp_path / "old_run", (week_ago, week_ago))
+
+    assert store.enforce_retention(max_age_days=7) == 1
+    lines = store.manifest.read_text().splitlines()
+    assert len(lines) == 1 and "new_run" in lines[0]
@@ -0,0 +1,103 @@
+# testcase/test_screenshot_writer.py
+import base64
+import threading
+import time
+
+from selinum.utils import screenshot
+from selinum.utils.screenshot import ScreenshotWriter
+
+
+class FakeStore:
+    ext = fmt = "png"
+
+    def __init__(self, delay=0.0, fail_on=()):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.saved = []
+
+    def save(self, png, filepath):
+        time.sleep(self.delay)
+        if filepath in self.fail_on:
+            raise OSError("disk full")
+        self.saved.append((filepath, png))
+        return png
+
+    def summary(self):
+        return []
+
+
+def _frame(n):
+    return base64.b64encode(f"frame-{n}".encode()).decode()
+
+
+def test_flush_waits_for_every_frame():
+    store = FakeStore(delay=0.01)
+    writer = ScreenshotWriter(maxsize=4, store=store)
+    for n in range(6):
+        writer.submit(_frame(n), f"f{n}.png")
+    writer.flush()
+    assert [p for p, _ in store.saved] == [f"f{n}.png" for n in range(6)]
+    assert store.saved[0][1] == b"frame-0"
+    assert writer.written == 6
+
+
+def test_full_queue_blocks_the_caller():
+    release = threading.Event()
+
+    class Stuck(FakeStore):
+        def save(self, png, filepath):
+            release.wait(5)
+            return super().save(png, filepath)
+
+    writer = ScreenshotWriter(maxsize=1, store=Stuck())
+    writer.submit(_frame(0), "a.png")   # taken by the writer thread
+    writer.submit(_frame(1), "b.png")   # fills the queue
+    threading.Timer(0.2, release.set).start()
+    writer.submit(_frame(2), "c.png")   # has to wait for room
+    writer.flush()
+    assert writer.blocked_seconds >= 0.1
+    assert writer.written == 3
+
+
+def test_failed_writes_are_counted_not_raised():
+    writer = ScreenshotWriter(maxsize=2, store=FakeStore(fail_on=("bad.png",)))
+    writer.submit(_frame(0), "bad.png")
+    writer.submit(_frame(1), "good.png")
+    writer.flush()
+    assert (writer.written, writer.failed) == (1, 1)
+    assert "written: 1, failed: 1" in writer.summary()
+
+
+class DiskStore(FakeStore):
+    def save(self, png, filepath):
+        time.sleep(self.delay)
+        if filepath.name.endswith("_bad.png"):
+            raise OSError("disk full")
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_bytes(png)
+        return png
+
+
+class FakeDriver:
+    def get_screenshot_as_base64(self):
+        return _frame(0)
+
+
+def test_frames_are_attached_through_the_public_api_once_written(tmp_path, monkeypatch):
+    attached = []
+    monkeypatch.setattr(screenshot, "SCREENSHOT_ROOT", tmp_path)
+    monkeypatch.setattr(screenshot, "_writer", ScreenshotWriter(store=DiskStore(delay=0.05)))
+    monkeypatch.setattr(screenshot.allure.attach, "file",
+                        lambda source, name, **kw: attached.append((open(source, "rb").read(), name, kw)))
+
+    screenshot.take_screenshot(FakeDriver(), "t::cart", "home", 1)
+    screenshot.take_screenshot(FakeDriver(), "t::cart", "bad", 2, attach_allure=False)
+    assert attached == []
+    assert screenshot.attach_screenshots() == 1
+    (data, name, kw), = attached
+    assert data == b"frame-0" and name.endswith("_01_home.png")
+    assert kw == screenshot.ATTACHMENT_TYPES["png"]
+    # a frame is attached once, and frames that never reached the disk are left out
+    assert screenshot.attach_screenshots() == 0
+    screenshot.take_screenshot(FakeDriver(), "t::cart", "bad", 3)
+    assert screenshot.attach_screenshots() == 0
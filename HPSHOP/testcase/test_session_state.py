@@ -0,0 +1,78 @@
+# testcase/test_session_state.py
+import time
+
+import pytest
+
+from selinum.utils import session_state
+
+URL = "https://store.hp.com/in-en/default/personal-laptops.html"
+
+
+class FakeDriver:
+    def __init__(self, consent=True, banner=False):
+        self.consent = consent
+        self.banner = banner
+
+    def get_cookies(self):
+        cookies = [{"name": "PHPSESSID", "value": "cart-session", "domain": "store.hp.com", "path": "/"}]
+        if self.consent:
+            cookies.insert(0, {"name": "OptanonAlertBoxClosed", "value": "2026-01-01", "domain": ".hp.com",
+                               "path": "/"})
+        return cookies
+
+    def execute_script(self, script):
+        if script == session_state.BANNER_VISIBLE_JS:
+            return self.banner
+        return {"local": {"consent": "yes", "mage-cache-storage": "{\"cart\":{}}"}, "session": {}}
+
+
+@pytest.fixture(autouse=True)
+def state_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_state, "STATE_FILE", tmp_path / "session-state.json")
+    monkeypatch.setattr(session_state, "stats", {"snapshots": 0, "restores": 0, "failed": 0,
+                                                  "invalidated": [], "saved_seconds": 0.0})
+
+
+def test_snapshot_keeps_consent_but_not_cart_state():
+    assert session_state.snapshot(FakeDriver(), URL, 2.5)
+    snap = session_state.load(URL)
+    assert [c["name"] for c in snap["cookies"]] == ["OptanonAlertBoxClosed"]
+    assert snap["local"] == {"consent": "yes"}
+    assert snap["origin"] == "https://store.hp.com"
+
+
+def test_snapshot_is_dropped_on_origin_change_and_ttl():
+    session_state.snapshot(FakeDriver(), URL, 2.5)
+    assert session_state.load("http://127.0.0.1:8000/in-en/default/personal-laptops.html") is None
+    assert not session_state.STATE_FILE.exists()
+
+    session_state.snapshot(FakeDriver(), URL, 2.5)
+    assert session_state.load(URL, now=time.time() + session_state.TTL + 1) is None
+    assert len(session_state.stats["invalidated"]) == 2
+
+
+def test_verify_counts_saved_time_or_invalidates():
+    session_state.snapshot(FakeDriver(), URL, 2.5)
+    snap = session_state.load(URL)
+    assert session_state.verify(FakeDriver(), snap)
+    assert session_state.stats["saved_seconds"] == 2.5
+
+    snap["cookies"].append({"name": "OptanonConsent", "value": "x"})
+    assert not session_state.verify(FakeDriver(), snap)
+    assert session_state.load(URL) is None
+
+
+def test_snapshot_needs_the_consent_cookie():
+    # Clicked, but the banner's script has not set its cookie yet
+    assert not session_state.snapshot(FakeDriver(consent=False), URL, 1.0)
+    assert session_state.load(URL) is None
+    assert not session_state.wait_for_consent(FakeDriver(consent=False), timeout=0.2, poll=0.05)
+    assert session_state.wait_for_consent(FakeDriver(), timeout=0.2)
+
+
+def test_verify_fails_while_the_banner_is_shown():
+    session_state.snapshot(FakeDriver(), URL, 2.5)
+    snap = session_state.load(URL)
+    assert not session_state.verify(FakeDriver(banner=True), snap)
+    assert session_state.stats["invalidated"] == ["restore failed, consent banner still shown"]
+    assert session_state.load(URL) is None
@@ -0,0 +1,63 @@
+# testcase/test_stub_store.py
+# The local store stand-in is plain HTTP, so it can be checked without a browser.
+import json
+import time
+import urllib.request
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+
+import pytest
+
+from selinum.utils.stub_store import StubStore, ADD_PATH, CART_PATH, SEARCH_PATH
+
+
+@pytest.fixture
+def store():
+    with StubStore() as s:
+        yield s
+
+
+def _opener():
+    jar = CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar)), jar
+
+
+def test_pages_carry_page_object_hooks(store):
+    opener, _ = _opener()
+    listing = opener.open(store.url).read().decode()
+    assert 'id="search"' in listing
+    assert "Accept All Cookies" in listing
+    assert "c-button stack white-c" in listing
+
+    results = opener.open(store.origin + SEARCH_PATH + "?q=HP+Mouse").read().decode()
+    assert results.count('class="product-item-link"') == 3
+
+    product = opener.open(store.origin + "/in-en/default/hp-mouse-x200.html").read().decode()
+    assert 'id="product-addtocart-button"' in product
+    assert "view-cart" in product
+
+
+def test_add_to_cart_needs_session_form_key(store):
+    opener, jar = _opener()
+    opener.open(store.url).read()
+    form_key = next(c.value for c in jar if c.name == "form_key")
+
+    bad = urlencode({"product": "hp-mouse-150", "form_key": "nope"}).encode()
+    with pytest.raises(urllib.error.HTTPError):
+        opener.open(store.origin + ADD_PATH, bad)
+
+    good = urlencode({"product": "hp-mouse-150", "form_key": form_key}).encode()
+    assert json.loads(opener.open(store.origin + ADD_PATH, good).read())["cart_count"] == 1
+
+    cart = opener.open(store.origin + CART_PATH).read().decode()
+    assert "stellar-title__small text-primary" in cart
+    assert "HP 150 Wired Mouse" in cart
+
+
+def test_endpoint_latency_is_applied(store):
+    store.latency["search"] = 0.2
+    opener, _ = _opener()
+    start = time.perf_counter()
+    opener.open(store.origin + SEARCH_PATH + "?q=HP").read()
+    assert time.perf_counter() - start >= 0.2
+    assert store.hits["search"] == 1
@@ -0,0 +1,90 @@
+# testcase/test_timeouts.py
+import pytest
+
+from selinum.utils import timeouts
+from selinum.utils.timeouts import TimeoutOracle
+
+
+@pytest.fixture
+def oracle(tmp_path):
+    return TimeoutOracle(path=tmp_path / "timeouts.json", overrides={})
+
+
+def test_ceiling_until_enough_samples_then_learned(oracle):
+    for _ in range(timeouts.MIN_SAMPLES - 1):
+        assert oracle.timeout("add_to_cart", 30) == 30
+        oracle.observe("add_to_cart", 2.0, True)
+    oracle.observe("add_to_cart", 2.0, True)
+    assert oracle.timeout("add_to_cart", 30) == 2.0 * timeouts.MARGIN + timeouts.PAD
+    # never above the caller's number, never below the floor
+    assert oracle.timeout("add_to_cart", 3) == 3
+    for _ in range(timeouts.WINDOW):
+        oracle.observe("fast", 0.01, True)
+    assert oracle.timeout("fast", 30) == timeouts.FLOOR
+
+
+def test_dead_locator_fails_fast_but_is_probed(oracle):
+    for _ in range(timeouts.DEAD_AFTER):
+        used = oracle.timeout("view_cart", 20, required=False)
+        oracle.observe("view_cart", used, False, used, 20)
+    issued = [oracle.timeout("view_cart", 20, required=False) for _ in range(timeouts.PROBE_EVERY)]
+    assert issued.count(timeouts.FAIL_FAST) == timeouts.PROBE_EVERY - 1 and issued[-1] == 20
+    assert oracle.dead_keys() == ["view_cart"]
+    # a required wait on the same key still gets its full timeout
+    assert oracle.timeout("view_cart", 20) == 20
+
+    oracle.observe("view_cart", 4.0, True)
+    assert oracle.timeout("view_cart", 20, required=False) == 20
+    assert oracle.dead_keys() == []
+
+
+def test_timeouts_cut_short_are_not_evidence_of_death(oracle):
+    for _ in range(timeouts.MIN_SAMPLES):
+        oracle.observe("product_tiles", 1.0, True)
+    learned = oracle.timeout("product_tiles", 25)
+    for _ in range(timeouts.DEAD_AFTER + 1):
+        oracle.observe("product_tiles", learned, False, learned, 25)
+        oracle.observe("product_tiles", timeouts.FAIL_FAST, False, timeouts.FAIL_FAST, 25)
+    assert oracle.dead_keys() == []
+    assert oracle.timeout("product_tiles", 25, required=False) == 25
+
+
+def test_expired_learned_timeout_backs_off_and_widens(oracle):
+    for _ in range(timeouts.MIN_SAMPLES):
+        oracle.observe("product_tiles", 2.0, True)
+    learned = oracle.timeout("product_tiles", 25)
+    assert learned == 2.0 * timeouts.MARGIN + timeouts.PAD
+    # a slow day: the learned timeout expires before the tiles show up
+    oracle.observe("product_tiles", learned, False, learned, 25)
+    issued = []
+    for _ in range(timeouts.BACKOFF):
+        issued.append(oracle.timeout("product_tiles", 25))
+        oracle.observe("product_tiles", 6.0, True)
+    assert issued == [25] * timeouts.BACKOFF
+    # what the full-ceiling waits measured is learned again
+    assert oracle.timeout("product_tiles", 25) == 6.0 * timeouts.MARGIN + timeouts.PAD
+
+
+def test_stub_store_history_does_not_shorten_live_waits(tmp_path):
+    path = tmp_path / "timeouts.json"
+    stub, live = "http://127.0.0.1:8000", "https://www.hp.com"
+    oracle = TimeoutOracle(path=path, overrides={})
+    for _ in range(timeouts.WINDOW):
+        oracle.observe("product_tiles", 0.01, True, scope=stub)
+    assert oracle.timeout("product_tiles", 25, scope=stub) == timeouts.FLOOR
+    oracle.save()
+
+    reloaded = TimeoutOracle(path=path, overrides={})
+    assert reloaded.timeout("product_tiles", 25, scope=stub) == timeouts.FLOOR
+    assert reloaded.timeout("product_tiles", 25, scope=live) == 25
+
+
+def test_overrides_win_and_history_persists(tmp_path):
+    path = tmp_path / "timeouts.json"
+    oracle = TimeoutOracle(path=path, overrides=timeouts.parse_overrides("clickable:search=5, add_to_cart=12"))
+    assert oracle.timeout("clickable:search", 10) == 5
+    assert oracle.timeout("add_to_cart", 30) == 12
+    for _ in range(timeouts.MIN_SAMPLES):
+        oracle.observe("product_tiles", 1.0, True)
+    oracle.save()
+    assert TimeoutOracle(path=path, overrides={}).timeout("product_tiles", 25) < 25
@@ -0,0 +1,66 @@
+# testcase/test_tracing.py
+import time
+
+from selinum.utils import commands, tracing
+
+
+@tracing.traced
+class Page:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def wait_for_thing(self):
+        time.sleep(0.02)
+
+    def step(self):
+        self.driver.execute("findElement", {})
+        self.wait_for_thing()
+        time.sleep(0.01)
+
+
+class FakeDriver:
+    def execute(self, command, params=None):
+        return {"value": None}
+
+
+def test_spans_nest_and_split_wait_sleep_action():
+    driver = FakeDriver()
+    tracer = tracing.Tracer("test").activate()
+    commands.add_listener(driver, tracer.on_command)
+    try:
+        Page(driver).step()
+    finally:
+        tracer.deactivate()
+        commands.remove_listener(driver, tracer.on_command)
+
+    events = {e["name"]: e for e in tracer.trace()["traceEvents"] if e["ph"] == "X" and e["cat"] != "sleep"}
+    step, wait = events["Page.step"], events["Page.wait_for_thing"]
+    assert step["ts"] <= wait["ts"] and wait["ts"] + wait["dur"] <= step["ts"] + step["dur"]
+    assert step["args"]["commands"] == 1
+    assert step["args"]["wait_ms"] >= 20 and step["args"]["sleep_ms"] >= 10
+    assert wait["cat"] == "wait"
+
+
+def test_untraced_calls_and_percentiles():
+    Page(FakeDriver()).step()  # no active tracer: plain call
+    assert tracing.percentile([0.3, 0.1, 0.2], 50) == 0.2
+    assert tracing.percentile([1, 2, 3, 4], 99) == 4
+
+
+def test_only_finished_tracers_feed_the_session(monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing, "_step_stats", tracing.defaultdict(list))
+    monkeypatch.setattr(tracing, "_session_events", [])
+    monkeypatch.setattr(tracing, "TRACE_DIR", tmp_path)
+    real_sleep = time.sleep
+
+    tracer = tracing.Tracer("test").activate()
+    assert time.sleep is not real_sleep
+    try:
+        Page(FakeDriver()).step()
+    finally:
+        tracer.deactivate()
+    assert time.sleep is real_sleep
+    assert tracing.session_summary() == []
+
+    tracing.finish(tracer, attach=False)
+    assert [line.split(":")[0] for line in tracing.session_summary()] == ["Page.step", "Page.wait_for_thing"]